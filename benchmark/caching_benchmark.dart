@@ -0,0 +1,30 @@
+// Caching hot paths: LRU lookups and evictions, memoized calls.
+//
+//     dart run benchmark/caching_benchmark.dart
+
+import 'package:saropa_dart_utils/caching/lru_cache.dart';
+import 'package:saropa_dart_utils/caching/memoize_sync_utils.dart';
+
+import 'harness.dart';
+
+void main(List<String> args) {
+  // A full cache of 1,000 entries: hits promote, misses on `set` evict.
+  final LruCache<int, int> cache = LruCache<int, int>(1000);
+  for (int i = 0; i < 1000; i++) {
+    cache.set(i, i);
+  }
+  int next = 1000;
+  int probe = 0;
+
+  final int Function(int) square = memoize1<int, int>((int n) => n * n);
+
+  runBenchmarks(args, <String, BenchmarkCase>{
+    'lru_get_hit': () => cache.get(probe = (probe + 7) % 1000),
+    'lru_set_evict': () {
+      cache.set(next, next);
+      next++;
+      return next;
+    },
+    'memoize1_hit': () => square(probe = (probe + 1) % 64),
+  });
+}
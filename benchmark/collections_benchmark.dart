@@ -0,0 +1,34 @@
+// Collection structures: trie prefix search, bounded top-K selection.
+//
+//     dart run benchmark/collections_benchmark.dart
+
+import 'package:saropa_dart_utils/collections/top_k_heap_utils.dart';
+import 'package:saropa_dart_utils/collections/trie_utils.dart';
+
+import 'harness.dart';
+
+void main(List<String> args) {
+  // 5,000 keys over a small alphabet so prefixes share deep paths.
+  final List<String> keys = <String>[
+    for (int i = 0; i < 5000; i++) (i * 7919).toRadixString(5),
+  ];
+  final TrieUtils trie = TrieUtils();
+  for (final String key in keys) {
+    trie.insert(key);
+  }
+  final List<double> values = <double>[
+    for (int i = 0; i < 10000; i++) ((i * 2654435761) % 100003).toDouble(),
+  ];
+
+  runBenchmarks(args, <String, BenchmarkCase>{
+    'trie_insert_5k': () {
+      final TrieUtils fresh = TrieUtils();
+      for (final String key in keys) {
+        fresh.insert(key);
+      }
+      return fresh;
+    },
+    'trie_keys_with_prefix': () => trie.keysWithPrefix('12'),
+    'top_k_10_of_10k': () => topKIndices<double>(values, 10, (double v) => v),
+  });
+}
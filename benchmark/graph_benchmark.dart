@@ -0,0 +1,27 @@
+// Graph algorithms on a fixed pseudo-random sparse graph.
+//
+//     dart run benchmark/graph_benchmark.dart
+
+import 'package:saropa_dart_utils/graph/dijkstra_utils.dart';
+import 'package:saropa_dart_utils/graph/graph_utils.dart';
+
+import 'harness.dart';
+
+/// [nodes] nodes with [degree] outgoing edges each; deterministic so every run
+/// (and every baseline) measures the same graph.
+WeightedAdjacency _graph(int nodes, int degree) => <List<(int, double)>>[
+  for (int u = 0; u < nodes; u++)
+    <(int, double)>[
+      for (int e = 1; e <= degree; e++) ((u * 31 + e * 17) % nodes, ((u + e) % 9 + 1).toDouble()),
+    ],
+];
+
+void main(List<String> args) {
+  final WeightedAdjacency small = _graph(200, 4);
+  final WeightedAdjacency large = _graph(2000, 4);
+
+  runBenchmarks(args, <String, BenchmarkCase>{
+    'dijkstra_200': () => dijkstraDistances(small, 0),
+    'dijkstra_2000': () => dijkstraDistances(large, 0),
+  });
+}
@@ -0,0 +1,99 @@
+// Minimal micro-benchmark harness driven by scripts/benchmark.py. Each
+// `*_benchmark.dart` file in this directory calls [runBenchmarks] from `main`
+// with its named cases:
+//
+//     dart run benchmark/caching_benchmark.dart --warmup 5 --samples 20
+//
+// Output is one JSON object per case on stdout, which the Python runner parses
+// line by line:
+//
+//     {"name": "lru_get_hit", "unit": "us", "iterations": 4096, "samples": [...]}
+//
+// Each sample is the mean microseconds per call over `iterations` calls; the
+// iteration count is calibrated once per case so a sample takes roughly
+// [targetSampleMicros], long enough that timer resolution is noise. Warmup
+// samples run the same loop first so the JIT has compiled the hot path before
+// anything is recorded (AOT builds simply repeat the work).
+//
+// Benchmarks import individual lib/ files, never the package barrel: the
+// barrel pulls in Flutter, which the plain Dart VM cannot load.
+
+import 'dart:convert';
+
+/// Wall time one sample should take once calibrated.
+const int targetSampleMicros = 20000;
+
+/// Upper bound on calls per sample, for cases too fast to time otherwise.
+const int _maxIterations = 1 << 24;
+
+/// One benchmarked call. The return value is folded into a sink so the
+/// compiler cannot discard the work as dead code.
+typedef BenchmarkCase = Object? Function();
+
+int _sink = 0;
+
+/// Runs every case in [cases] (filtered by `--filter SUBSTRING`) and prints its
+/// samples as one JSON line. Honors `--warmup N` and `--samples N`.
+void runBenchmarks(List<String> args, Map<String, BenchmarkCase> cases) {
+  final int warmup = _intArg(args, '--warmup', 5);
+  final int samples = _intArg(args, '--samples', 20);
+  final String? filter = _stringArg(args, '--filter');
+  for (final MapEntry<String, BenchmarkCase> entry in cases.entries) {
+    if (filter != null && !entry.key.contains(filter)) continue;
+    final int iterations = _calibrate(entry.value);
+    for (int i = 0; i < warmup; i++) {
+      _measure(entry.value, iterations);
+    }
+    final List<double> recorded = <double>[
+      for (int i = 0; i < samples; i++) _measure(entry.value, iterations),
+    ];
+    print(
+      jsonEncode(<String, Object>{
+        'name': entry.key,
+        'unit': 'us',
+        'iterations': iterations,
+        'samples': recorded,
+      }),
+    );
+  }
+  // Reading the sink keeps it (and so every case's result) observable.
+  if (_sink == -1) print('sink: $_sink');
+}
+
+/// Doubles the call count until a loop takes a quarter of the target, then
+/// scales it to the full target.
+int _calibrate(BenchmarkCase body) {
+  int iterations = 1;
+  while (true) {
+    final Stopwatch watch = Stopwatch()..start();
+    for (int i = 0; i < iterations; i++) {
+      _sink ^= body().hashCode;
+    }
+    final int elapsed = watch.elapsedMicroseconds;
+    if (elapsed >= targetSampleMicros ~/ 4 || iterations >= _maxIterations) {
+      if (elapsed == 0) return _maxIterations;
+      final int scaled = (iterations * targetSampleMicros / elapsed).ceil();
+      return scaled.clamp(1, _maxIterations);
+    }
+    iterations *= 2;
+  }
+}
+
+/// Mean microseconds per call over [iterations] calls.
+double _measure(BenchmarkCase body, int iterations) {
+  final Stopwatch watch = Stopwatch()..start();
+  for (int i = 0; i < iterations; i++) {
+    _sink ^= body().hashCode;
+  }
+  return watch.elapsedMicroseconds / iterations;
+}
+
+int _intArg(List<String> args, String flag, int fallback) {
+  final String? value = _stringArg(args, flag);
+  return value == null ? fallback : int.parse(value);
+}
+
+String? _stringArg(List<String> args, String flag) {
+  final int at = args.indexOf(flag);
+  return at >= 0 && at + 1 < args.length ? args[at + 1] : null;
+}
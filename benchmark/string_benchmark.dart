@@ -0,0 +1,20 @@
+// String transforms: edit distance and slug generation.
+//
+//     dart run benchmark/string_benchmark.dart
+
+import 'package:saropa_dart_utils/string/levenshtein_utils.dart';
+import 'package:saropa_dart_utils/string/string_slug_extensions.dart';
+
+import 'harness.dart';
+
+void main(List<String> args) {
+  const String title = '  The Quick Brown Fox -- Jumps over_the LAZY dog! (2026 edition)  ';
+  const String a = 'performance regression in the hot path';
+  const String b = 'performance regressions on a hot paths';
+
+  runBenchmarks(args, <String, BenchmarkCase>{
+    'levenshtein_distance_40': () => LevenshteinUtils.distance(a, b),
+    'levenshtein_ratio_40': () => LevenshteinUtils.ratio(a, b),
+    'to_slug': () => title.toSlug(),
+  });
+}
@@ -1,17 +1,21 @@
 #!/usr/bin/env python3
 """
-Organize loose report files into YYYY.MM/YYYY.MM.DD/ subfolders, then prune
-empty directories.
+Organize loose report files into YYYY.MM/YYYY.MM.DD/ subfolders, then apply
+the report store's compression and retention policy.
 
 Run:
-  python reports/organize_reports.py
+  python reports/organize_reports.py [--compress-after-days 7]
+      [--delete-after-days 180] [--max-mb 100] [--codec gzip|xz]
 
-Imports the shared organizer from the contacts repo so move/prune logic stays
-in one place across all Saropa projects.
+The move step imports the shared organizer from the contacts repo so move/prune
+logic stays in one place across all Saropa projects. Without that checkout the
+move step is skipped with a note; compression, retention and the report index
+(scripts/modules/report_store.py) are self-contained and always run.
 """
 
 from __future__ import annotations
 
+import argparse
 import importlib.util
 import sys
 from pathlib import Path
@@ -26,15 +30,16 @@ _SHARED_MODULE_PATH = (
     / "reports_organizer.py"
 )
 
+# The report store lives with the publish tooling.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from modules import report_store  # noqa: E402
+
 
 def _load_shared_organizer():
+    """The contacts repo's organizer module, or None when it is not checked out."""
     if not _SHARED_MODULE_PATH.is_file():
-        print(
-            f"ERROR: Shared organizer not found at {_SHARED_MODULE_PATH}\n"
-            "Make sure the contacts repo is cloned alongside this project.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+        return None
     spec = importlib.util.spec_from_file_location(
         "reports_organizer",
         _SHARED_MODULE_PATH,
@@ -46,9 +51,8 @@ def _load_shared_organizer():
     return module
 
 
-def main() -> int:
-    mod = _load_shared_organizer()
-    reports_root = Path(__file__).resolve().parent
+def _organize(mod, reports_root: Path) -> None:
+    """Run the shared move/prune step."""
     project_root = reports_root.parent
 
     # _cache holds SDK export caches — not report output, so skip it.
@@ -70,6 +74,54 @@ def main() -> int:
         f"\nDone. Moved {moved} file(s), skipped {skipped} file(s), "
         f"removed {removed} empty folder(s).",
     )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Organize and prune reports/.")
+    parser.add_argument(
+        "--compress-after-days",
+        type=float,
+        default=report_store.COMPRESS_AFTER_DAYS,
+    )
+    parser.add_argument(
+        "--delete-after-days",
+        type=float,
+        default=report_store.DELETE_AFTER_DAYS,
+    )
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        default=report_store.MAX_TOTAL_BYTES / (1024 * 1024),
+        help="total size budget for stored reports",
+    )
+    parser.add_argument("--codec", choices=sorted(report_store.CODECS), default="gzip")
+    args = parser.parse_args(argv)
+
+    reports_root = Path(__file__).resolve().parent
+
+    mod = _load_shared_organizer()
+    if mod is None:
+        print(
+            f"Note: shared organizer not found at {_SHARED_MODULE_PATH}; "
+            "skipping the move step (clone the contacts repo alongside this "
+            "project to enable it)."
+        )
+    else:
+        _organize(mod, reports_root)
+
+    result = report_store.maintain(
+        reports_root,
+        compress_after_days=args.compress_after_days,
+        delete_after_days=args.delete_after_days,
+        max_total_bytes=int(args.max_mb * 1024 * 1024),
+        codec=args.codec,
+    )
+    print(
+        f"Retention: scanned {result.scanned} report(s), compressed "
+        f"{result.compressed}, deleted {result.deleted}, freed "
+        f"{result.freed_bytes / 1024:.0f} KiB, pruned {result.pruned_dirs} "
+        "empty folder(s)."
+    )
     return 0
 
 
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Report public-API changes between two git revisions and the semver bump they need.
+
+Usage:
+    python scripts/api_diff.py v1.6.2 [HEAD] [--limit 20]
+
+Both trees are read from git objects (no checkout); see modules/api_diff.py.
+The suggested bump is relative to the version in pubspec.yaml. Exits 1 when
+the diff contains a breaking change, so it can gate a release.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from modules import api_diff
+from modules import version_changelog as vc
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", help="older revision, e.g. v1.6.2")
+    parser.add_argument("head", nargs="?", default="HEAD", help="newer revision (default HEAD)")
+    parser.add_argument("--limit", type=int, default=20, help="symbols listed per section")
+    args = parser.parse_args(argv)
+
+    project_dir = Path(__file__).resolve().parent.parent
+    try:
+        diff = api_diff.diff_revisions(project_dir, args.base, args.head)
+    except ValueError as exc:
+        print(exc)
+        return 2
+    for line in api_diff.report_lines(diff, args.limit):
+        print(line)
+    version = vc.get_version_from_pubspec(project_dir / "pubspec.yaml")
+    print(f"\nSuggested bump from {version}: {api_diff.suggest_bump(diff, version)}")
+    return 1 if diff.breaking else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
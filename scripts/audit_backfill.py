@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Backfill per-release audit totals from every `v*` tag, without checkouts.
+
+Usage:
+    python scripts/audit_backfill.py [--tags "v*"] [--jobs N]
+                                     [--output reports/audit_backfill.csv]
+
+Prints one row per tag (size and per-category finding counts) and writes the
+same table as CSV. Per-blob results are cached, so re-running after a new
+release only analyzes the files that changed. See modules/audit_backfill.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from modules import audit_backfill
+
+# Short column headers for the terminal table (the CSV keeps the full names).
+_SHORT = {
+    "files": "files",
+    "lines": "lines",
+    "public_symbols": "public",
+    "Missing doc headers": "no-doc",
+    "Sparse code comments": "sparse",
+    "Empty catch blocks": "empty-catch",
+    "Loop performance smells": "loops",
+    "Hoistable allocations": "allocs",
+    "Sequential awaits": "awaits",
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tags", default="v*", help='tag pattern (default "v*")')
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--output", type=Path, help="CSV path (default reports/audit_backfill.csv)")
+    args = parser.parse_args(argv)
+
+    project_dir = Path(__file__).resolve().parent.parent
+    tags = audit_backfill.release_tags(project_dir, args.tags)
+    if not tags:
+        print(f"No tags match {args.tags!r}.")
+        return 1
+
+    started = time.perf_counter()
+    totals, analyzed = audit_backfill.backfill(project_dir, tags, args.jobs)
+    elapsed = time.perf_counter() - started
+
+    columns = audit_backfill.columns()
+    cells = [("tag", "date", *(_SHORT[c] for c in columns))]
+    cells += [
+        (row.tag, row.date, *(str(row.counts.get(c, 0)) for c in columns)) for row in totals
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(cells[0]))]
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+    output = args.output or project_dir / "reports" / "audit_backfill.csv"
+    audit_backfill.write_csv(output, totals)
+    print(f"\n{len(totals)} tags, {analyzed} blobs analyzed ({elapsed:.1f}s); wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
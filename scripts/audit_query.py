@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Query the audit history database written by every publish audit run.
+
+Usage:
+    python scripts/audit_query.py trend [--category NAME] [--limit 20]
+    python scripts/audit_query.py first-seen PATTERN
+    python scripts/audit_query.py fixed-in PATTERN
+    python scripts/audit_query.py new-since VERSION
+    python scripts/audit_query.py timings [--limit 10]
+
+PATTERN is a SQL LIKE pattern over the finding key (file path plus the detail
+text with numbers masked as "#"), e.g. "%string_utils.dart%".
+
+`new-since` lists findings in the latest run that were absent from the
+release baseline (the last run at tag vVERSION's commit, or at an ancestor of
+it) and exits 1 when there are any, so it can gate a release on "no new
+findings since the last tag". With no baseline it exits 2 instead of passing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from modules import audit_history
+
+
+def _print_rows(headers: tuple[str, ...], rows: list[tuple]) -> None:
+    """Print rows as a left-aligned text table."""
+    cells = [headers] + [tuple("" if v is None else str(v) for v in row) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for row in cells:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    trend = sub.add_parser("trend", help="finding counts per run")
+    trend.add_argument("--category", help='e.g. "Sparse code comments"')
+    trend.add_argument("--limit", type=int, default=20, help="most recent N runs")
+    sub.add_parser("first-seen", help="run where a finding first appeared").add_argument(
+        "pattern"
+    )
+    sub.add_parser("fixed-in", help="run where a finding disappeared").add_argument(
+        "pattern"
+    )
+    sub.add_parser("new-since", help="findings new since a version").add_argument(
+        "version"
+    )
+    timings = sub.add_parser("timings", help="average / max seconds per check")
+    timings.add_argument("--limit", type=int, default=10, help="most recent N runs")
+    args = parser.parse_args(argv)
+
+    project_dir = Path(__file__).resolve().parent.parent
+    if not audit_history.db_path(project_dir).exists():
+        print("No audit history yet; run the publish audit first.")
+        return 1
+
+    with audit_history.connect(project_dir) as conn:
+        if args.command == "trend":
+            _print_rows(
+                ("run", "started", "version", "sha", "category", "count"),
+                [
+                    (run, started, version, (sha or "")[:12], category, count)
+                    for run, started, version, sha, category, count in audit_history.trend(
+                        conn, args.category, args.limit
+                    )
+                ],
+            )
+        elif args.command == "first-seen":
+            _print_rows(
+                ("category", "finding", "run", "started", "version"),
+                audit_history.first_seen(conn, args.pattern),
+            )
+        elif args.command == "fixed-in":
+            _print_rows(
+                ("category", "finding", "last seen", "fixed run", "started", "version"),
+                audit_history.fixed_in(conn, args.pattern),
+            )
+        elif args.command == "new-since":
+            rows = audit_history.new_since_version(conn, project_dir, args.version)
+            if rows is None:
+                print(
+                    f"No baseline for {args.version}: tag v{args.version} is missing or "
+                    "no audit run was recorded at or before it."
+                )
+                return 2
+            if not rows:
+                print(f"No new findings since {args.version}.")
+                return 0
+            _print_rows(("category", "finding"), rows)
+            print(f"\n{len(rows)} new finding(s) since {args.version}.")
+            return 1
+        elif args.command == "timings":
+            _print_rows(
+                ("check", "avg s", "max s"),
+                [
+                    (name, f"{avg:.2f}", f"{peak:.2f}")
+                    for name, avg, peak in audit_history.check_timings(conn, args.limit)
+                ],
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
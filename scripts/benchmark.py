@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Run the Dart micro-benchmarks in benchmark/ and compare them to a baseline.
+
+Usage:
+    python scripts/benchmark.py [NAME ...] [--filter CASE] [--aot]
+        [--warmup 5] [--samples 20] [--baseline VERSION] [--save]
+        [--alpha 0.01] [--min-change 0.05]
+
+NAME limits the run to benchmark files (e.g. "caching" for
+benchmark/caching_benchmark.dart); --filter limits it to cases whose name
+contains CASE. --aot builds each file with `dart compile exe` first, which
+gives steadier numbers than the JIT at the cost of a compile per file.
+
+Results are compared to the baseline for --baseline VERSION, or by default the
+most recently recorded baseline of another version (see
+scripts/modules/benchmarks.py); either way only a baseline recorded in the
+same mode (JIT, or AOT with --aot) is used. Regressions against a baseline
+from another machine are reported but do not fail the run. --save records
+this run as the baseline for the current pubspec version in
+benchmark/baselines.json.
+
+Exit codes: 0 = no regression, 1 = at least one significant regression,
+2 = a benchmark failed to build or run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from modules import benchmarks
+from modules import run as run_mod
+from modules import version_changelog as vc
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmark files to run (default: all)")
+    parser.add_argument("--filter", help="only cases whose name contains this")
+    parser.add_argument("--aot", action="store_true", help="run AOT-compiled executables")
+    parser.add_argument("--warmup", type=int, default=benchmarks.WARMUP)
+    parser.add_argument("--samples", type=int, default=benchmarks.SAMPLES)
+    parser.add_argument("--baseline", metavar="VERSION", help="baseline version to compare to")
+    parser.add_argument(
+        "--save", action="store_true", help="record this run as the current version's baseline"
+    )
+    parser.add_argument("--alpha", type=float, default=benchmarks.ALPHA)
+    parser.add_argument(
+        "--min-change",
+        type=float,
+        default=benchmarks.MIN_CHANGE,
+        help="smallest median change that counts (0.05 = 5%%)",
+    )
+    args = parser.parse_args(argv)
+
+    project_dir = Path(__file__).resolve().parent.parent
+    if not run_mod.command_exists("dart"):
+        print("dart not found on PATH.")
+        return 2
+    files = benchmarks.discover(project_dir, args.names)
+    if not files:
+        print(f"No benchmarks found in {project_dir / benchmarks.BENCHMARK_DIR}.")
+        return 2
+    version = vc.get_version_from_pubspec(project_dir / "pubspec.yaml")
+
+    def on_result(result: benchmarks.BenchmarkResult) -> None:
+        print(f"  {result.name}: median {result.median:.3f} {result.unit}/call")
+
+    mode = "aot" if args.aot else "jit"
+    print(f"Running {len(files)} benchmark file(s) ({mode}, {args.samples} samples)...")
+    results, failures = benchmarks.run_all(
+        project_dir,
+        files,
+        warmup=args.warmup,
+        samples=args.samples,
+        case_filter=args.filter,
+        aot=args.aot,
+        on_result=on_result,
+    )
+    for path, tail in failures:
+        print(f"\n{path.name} failed:")
+        print("\n".join(tail))
+
+    baselines = benchmarks.load_baselines(project_dir)
+    selected = benchmarks.select_baseline(baselines, args.baseline, current=version, mode=mode)
+    regressions = 0
+    if selected is None:
+        wanted = f" ({args.baseline})" if args.baseline else ""
+        print(f"\nNo {mode} baseline to compare against{wanted}.")
+    else:
+        base_version, entry = selected
+        print(
+            f"\nCompared to {base_version} (recorded {entry.get('recorded', '?')}, "
+            f"{entry.get('mode', '?')}):"
+        )
+        if not benchmarks.same_machine(entry):
+            print(
+                f"  Note: baseline taken on '{entry.get('machine')}', this is "
+                f"'{benchmarks.machine_id()}'; regressions are shown but not counted."
+            )
+        comparisons = benchmarks.compare(
+            entry,
+            results,
+            args.alpha,
+            args.min_change,
+            report_missing=not (args.names or args.filter),
+        )
+        print("\n".join(benchmarks.format_comparisons(comparisons)))
+        if benchmarks.same_machine(entry):
+            regressions = sum(1 for c in comparisons if c.verdict == "regression")
+
+    if args.save and results and not failures:
+        path = benchmarks.save_baseline(project_dir, version, results, mode)
+        print(f"\nBaseline for {version} saved to {path}.")
+    elif args.save:
+        print("\nBaseline not saved: nothing ran cleanly.")
+
+    if failures:
+        return 2
+    if regressions:
+        print(f"\n{regressions} significant regression(s).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,295 @@
 #!/usr/bin/env python3
-"""Script to log Git commits within a specific date range."""
+"""Log Git commits to a text report and a JSON Lines file, incrementally.
 
-import os
+The first run streams every commit since `--since` (default 2024-10-01) and
+remembers the newest SHA it wrote. Later runs fetch only `<last SHA>..HEAD` and
+append, so the cost tracks new commits, not the whole history. If the saved
+SHA is no longer an ancestor of HEAD (history was rewritten), the report is
+rebuilt from scratch.
+
+`git log -z` output is read from a pipe record by record, never held whole. A
+long first-run range is split into `--chunk-days` windows fetched in parallel
+(`--jobs`), then stitched back together in commit order.
+
+Outputs (in `--output-dir`, default reports/git_report/):
+    commit_details.log       "<sha> <subject>" line, then the body, oldest first
+    commit_details.jsonl     one JSON object per commit (sha, date, author,
+                             subject, body)
+    commit_details.state.json  last processed SHA and the range start
+
+Usage:
+    python scripts/git_report.py [--since 2024-10-01] [--rebuild]
+                                 [--chunk-days 90] [--jobs 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
 import subprocess
-from datetime import datetime, timedelta
+import sys
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
+from modules import atomic_file
+
+DEFAULT_SINCE = "2024-10-01"
+LOG_NAME = "commit_details.log"
+JSONL_NAME = "commit_details.jsonl"
+STATE_NAME = "commit_details.state.json"
+
+# Field separator inside one record (ASCII unit separator); `-z` terminates
+# each record with NUL. Neither can appear in a commit message in practice.
+_FIELD_SEP = "\x1f"
+_PRETTY = "%H%x1f%aI%x1f%an%x1f%s%x1f%b"
+# Bytes read from the pipe per chunk while splitting on NUL.
+_READ_SIZE = 64 * 1024
+
+
+def iter_commits(repo: Path, rev_args: list[str]) -> Iterator[dict[str, str]]:
+    """Yield one dict per commit from a streaming `git log -z --reverse`.
+
+    `rev_args` is the revision range / date filter (e.g. `["abc..HEAD"]` or
+    `["--since=...", "--until=..."]`). Commits come oldest first so a later
+    incremental run can simply append.
+    """
+    cmd = ["git", "log", "-z", "--reverse", f"--pretty=format:{_PRETTY}", *rev_args]
+    with subprocess.Popen(
+        cmd,
+        cwd=repo,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as proc:
+        assert proc.stdout is not None
+        pending = ""
+        while True:
+            chunk = proc.stdout.read(_READ_SIZE)
+            if not chunk:
+                break
+            pending += chunk
+            *records, pending = pending.split("\0")
+            for record in records:
+                yield _parse_record(record)
+        if pending.strip():
+            yield _parse_record(pending)
+        stderr = proc.stderr.read() if proc.stderr else ""
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+
+def _parse_record(record: str) -> dict[str, str]:
+    """Split one `-z` record into its named fields."""
+    sha, when, author, subject, body = (record.split(_FIELD_SEP, 4) + [""] * 5)[:5]
+    return {
+        "sha": sha.strip(),
+        "date": when,
+        "author": author,
+        "subject": subject,
+        "body": body.rstrip("\n"),
+    }
+
+
+def _text_entry(commit: dict[str, str]) -> str:
+    """The classic report shape: `<sha> <subject>` then the body."""
+    return f"{commit['sha']} {commit['subject']}\n{commit['body']}\n"
+
+
+def _write_commits(
+    commits: Iterator[dict[str, str]], log_handle, jsonl_handle
+) -> tuple[int, str | None]:
+    """Stream commits into both outputs. Returns (count, last_sha)."""
+    count = 0
+    last_sha = None
+    for commit in commits:
+        log_handle.write(_text_entry(commit))
+        jsonl_handle.write(json.dumps(commit, ensure_ascii=False) + "\n")
+        count += 1
+        last_sha = commit["sha"]
+    return count, last_sha
+
 
-def main():
-    # Get the directory where the script is located
-    script_dir = Path(__file__).parent.resolve()
+def _date_chunks(since: date, until: date, chunk_days: int) -> list[tuple[date, date]]:
+    """Split [since, until) into consecutive windows of at most `chunk_days`."""
+    chunks = []
+    start = since
+    while start < until:
+        end = min(start + timedelta(days=chunk_days), until)
+        chunks.append((start, end))
+        start = end
+    return chunks
 
-    # Set the working directory to the parent directory of the script's directory
-    working_dir = script_dir.parent
-    os.chdir(working_dir)
 
-    # Define the start date and end date (tomorrow's date)
-    start_date = "2024-10-01"  # Adjust the start date as needed
-    end_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+def _fetch_chunk(repo: Path, window: tuple[date, date], spool_dir: Path) -> Path:
+    """Stream one date window of history into a spool file (JSON Lines)."""
+    start, end = window
+    spool = spool_dir / f"{start.isoformat()}.jsonl"
+    # Explicit midnight boundaries: git completes a bare date with the current
+    # time of day, evaluated when each worker's process starts, which would
+    # leave gaps between adjacent windows (and skip the start of `--since`).
+    rev_args = [f"--since={start.isoformat()}T00:00:00", f"--until={end.isoformat()}T00:00:00"]
+    with spool.open("w", encoding="utf-8") as handle:
+        for commit in iter_commits(repo, rev_args):
+            handle.write(json.dumps(commit, ensure_ascii=False) + "\n")
+    return spool
 
-    # Print the date range
-    print(f"Fetching commits from {start_date} to {end_date}")
 
-    # Define output filename
-    output_file = f"commit_details_{start_date}-{end_date}.log"
+def _iter_spools(spools: list[Path]) -> Iterator[dict[str, str]]:
+    """Replay spooled windows in order, dropping commits seen at a boundary.
 
-    # Run the Git log command with the date range filter
+    `--since`/`--until` are both inclusive at the second, so a commit stamped
+    exactly on a window edge can appear in two adjacent windows.
+    """
+    seen: set[str] = set()
+    for spool in spools:
+        with spool.open(encoding="utf-8") as handle:
+            for line in handle:
+                commit = json.loads(line)
+                if commit["sha"] in seen:
+                    continue
+                seen.add(commit["sha"])
+                yield commit
+
+
+def _is_ancestor(repo: Path, sha: str) -> bool:
+    """True when `sha` still exists and is reachable from HEAD."""
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", sha, "HEAD"],
+        cwd=repo,
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def _load_state(path: Path) -> dict:
     try:
-        result = subprocess.run(
-            [
-                "git", "log",
-                f"--since={start_date}",
-                f"--until={end_date}",
-                "--pretty=format:%H %s%n%b"
-            ],
-            capture_output=True,
-            text=True,
-            check=True
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(path: Path, state: dict) -> None:
+    """Write the state file atomically so a crash never leaves half a JSON."""
+    atomic_file.write_text(path, json.dumps(state, indent=2))
+
+
+def build_report(
+    repo: Path,
+    out_dir: Path,
+    since: str,
+    rebuild: bool = False,
+    chunk_days: int = 90,
+    jobs: int = 4,
+) -> tuple[int, bool]:
+    """Bring the report in `out_dir` up to date. Returns (new_commits, appended)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    log_path = out_dir / LOG_NAME
+    jsonl_path = out_dir / JSONL_NAME
+    state_path = out_dir / STATE_NAME
+    state = {} if rebuild else _load_state(state_path)
+
+    last_sha = state.get("last_sha")
+    incremental = (
+        bool(last_sha)
+        and state.get("since") == since
+        and log_path.exists()
+        and jsonl_path.exists()
+        and _is_ancestor(repo, last_sha)
+    )
+
+    if incremental:
+        print(f"Appending commits after {last_sha[:12]}")
+        with log_path.open("a", encoding="utf-8") as log_handle, jsonl_path.open(
+            "a", encoding="utf-8"
+        ) as jsonl_handle:
+            count, newest = _write_commits(
+                iter_commits(repo, [f"{last_sha}..HEAD"]), log_handle, jsonl_handle
+            )
+        if newest:
+            _save_state(state_path, {"last_sha": newest, "since": since})
+        return count, True
+
+    until = date.today() + timedelta(days=1)
+    print(f"Fetching commits from {since} to {until.isoformat()}")
+    windows = _date_chunks(date.fromisoformat(since), until, chunk_days)
+    with tempfile.TemporaryDirectory(dir=out_dir) as spool_dir, ThreadPoolExecutor(
+        max_workers=max(1, jobs)
+    ) as pool:
+        spools = list(
+            pool.map(lambda w: _fetch_chunk(repo, w, Path(spool_dir)), windows)
         )
+        with log_path.open("w", encoding="utf-8") as log_handle, jsonl_path.open(
+            "w", encoding="utf-8"
+        ) as jsonl_handle:
+            count, newest = _write_commits(
+                _iter_spools(spools), log_handle, jsonl_handle
+            )
+    # Pin the state to HEAD, not the newest dated commit: a commit with a
+    # future or skewed date must not be re-fetched by the next append.
+    head = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True
+    )
+    anchor = head.stdout.strip() if head.returncode == 0 else newest
+    if anchor:
+        _save_state(state_path, {"last_sha": anchor, "since": since})
+    return count, False
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since", default=DEFAULT_SINCE, help="range start (YYYY-MM-DD)")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="where the report lives (default: reports/git_report/)",
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="ignore saved state and start over"
+    )
+    parser.add_argument(
+        "--chunk-days", type=int, default=90, help="window size for a full fetch"
+    )
+    parser.add_argument("--jobs", type=int, default=4, help="parallel window fetches")
+    args = parser.parse_args(argv)
 
-        # Write output to file
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(result.stdout)
+    working_dir = Path(__file__).parent.resolve().parent
+    out_dir = args.output_dir or working_dir / "reports" / "git_report"
 
-        # Check if file has content
-        if os.path.exists(output_file):
-            if os.path.getsize(output_file) > 0:
-                print("Commits have been logged successfully.")
-            else:
-                print("No commits found in the specified date range.")
-        else:
-            print("Failed to create the commit details file.")
+    try:
+        datetime.strptime(args.since, "%Y-%m-%d")
+    except ValueError:
+        parser.error(f"--since must be YYYY-MM-DD, got {args.since!r}")
 
+    try:
+        count, appended = build_report(
+            working_dir,
+            out_dir,
+            args.since,
+            rebuild=args.rebuild,
+            chunk_days=max(1, args.chunk_days),
+            jobs=args.jobs,
+        )
     except subprocess.CalledProcessError as e:
         print(f"Git command failed: {e.stderr}")
+        return 1
     except FileNotFoundError:
         print("Git is not installed or not in PATH.")
+        return 1
+
+    if count:
+        verb = "Appended" if appended else "Logged"
+        print(f"{verb} {count} commit(s) to {out_dir / LOG_NAME}")
+    elif appended:
+        print("No new commits since the last run.")
+    else:
+        print("No commits found in the specified date range.")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
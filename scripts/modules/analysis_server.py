@@ -0,0 +1,377 @@
+"""Warm Dart analysis-server session over LSP, shared by the audit and step 6.
+
+`dart analyze` and `flutter analyze` start cold: every call re-resolves the
+whole package. A release runs the analyzer at least twice (audit section 2,
+then step 6) and once more per audit retry, so most of that time goes to
+re-analyzing files nobody touched.
+
+`session_for` starts `dart language-server` once per process and keeps it.
+The protocol is LSP over stdio: each message is a JSON-RPC body behind a
+`Content-Length` header. A reader thread collects `textDocument/publishDiagnostics`
+(the server pushes a file's full diagnostic list whenever it changes) and the
+Dart-specific `$/analyzerStatus` notifications, which say when analysis is
+running. Before each query `refresh` compares the mtimes of the package's Dart
+and config files with the last snapshot and reports only the differences
+through `workspace/didChangeWatchedFiles`, so after a one-file fix the server
+re-analyzes that file and its dependents instead of everything.
+
+Anything that goes wrong (no `dart` on PATH, the server failing to start,
+exiting, or missing the timeout) makes `session_for`/`refresh` return None,
+and callers fall back to the cold CLI they ran before.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import subprocess
+import threading
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import platform as platform_mod
+from . import run as run_mod
+
+# The first full analysis of a large package can take a few minutes on a slow
+# machine; later refreshes are usually seconds.
+STARTUP_TIMEOUT = 600.0
+REFRESH_TIMEOUT = 300.0
+REQUEST_TIMEOUT = 60.0
+# Analysis counts as finished once the server reports it idle and has sent
+# nothing for SETTLE_SECONDS (trailing diagnostics follow the status). A server
+# that never sends `$/analyzerStatus` is taken as idle after QUIET_SECONDS of
+# silence instead.
+SETTLE_SECONDS = 0.5
+QUIET_SECONDS = 5.0
+
+# LSP DiagnosticSeverity -> the analyzer CLI's severity buckets. Hints (4) are
+# rare from the Dart server; the CLI prints them as infos.
+_SEVERITIES = {1: "error", 2: "warning", 3: "info", 4: "info"}
+# Directories never scanned for changes: build output, tool state, VCS.
+_SKIP_DIRS = frozenset({".dart_tool", ".git", "build", "coverage", "reports", "node_modules"})
+# Non-Dart files whose edits change analysis results.
+_CONFIG_FILES = ("pubspec.yaml", "analysis_options.yaml", ".dart_tool/package_config.json")
+# workspace/didChangeWatchedFiles FileChangeType values.
+_CREATED, _CHANGED, _DELETED = 1, 2, 3
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """One analyzer diagnostic, positioned 1-based like the CLI output."""
+
+    severity: str  # error / warning / info
+    location: str  # project-relative path (file name when outside the project)
+    line: int
+    column: int
+    code: str
+    message: str
+
+    @property
+    def detail(self) -> str:
+        """Same "  file:line  CODE  message" shape as the CLI-based audit."""
+        return f"  {self.location}:{self.line}  {self.code}  {self.message}"
+
+
+class AnalysisSession:
+    """One running `dart language-server` for one package."""
+
+    def __init__(self, project_dir: Path) -> None:
+        self.project_dir = project_dir.resolve()
+        self._proc: subprocess.Popen | None = None
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._next_id = 0
+        self._responses: dict[int, dict] = {}
+        # file path -> diagnostics, replaced whole by each publishDiagnostics.
+        self._diagnostics: dict[Path, list[Diagnostic]] = {}
+        self._analyzing = True
+        self._status_seen = False
+        # Set when changes were sent and the server has not yet said it is
+        # analyzing them.
+        self._pending_change = False
+        self._last_message = time.monotonic()
+        self._snapshot: dict[Path, int] = {}
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Launch the server and wait for its first full analysis."""
+        try:
+            self._proc = subprocess.Popen(
+                ["dart", "language-server", "--client-id", "saropa-publish"],
+                cwd=self.project_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                shell=platform_mod.get_shell_mode(),
+            )
+        except OSError:
+            return False
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        root_uri = self.project_dir.as_uri()
+        initialized = self._request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": root_uri,
+                "workspaceFolders": [{"uri": root_uri, "name": self.project_dir.name}],
+                # No window.workDoneProgress: without it the server reports
+                # analysis state through `$/analyzerStatus`, which is simpler
+                # to follow than progress tokens.
+                "capabilities": {
+                    "workspace": {"didChangeWatchedFiles": {"dynamicRegistration": False}},
+                    "textDocument": {"publishDiagnostics": {}},
+                },
+            },
+            REQUEST_TIMEOUT,
+        )
+        if initialized is None:
+            self.close()
+            return False
+        self._notify("initialized", {})
+        self._snapshot = self._scan()
+        if not self._wait_idle(STARTUP_TIMEOUT):
+            self.close()
+            return False
+        return True
+
+    def close(self) -> None:
+        """Ask the server to shut down, killing it if it does not exit."""
+        proc = self._proc
+        if proc is None:
+            return
+        if proc.poll() is None:
+            self._request("shutdown", None, 5.0)
+            self._notify("exit", None)
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self._proc = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    # -- queries --------------------------------------------------------------
+
+    def refresh(self, timeout: float = REFRESH_TIMEOUT) -> list[Diagnostic] | None:
+        """Report on-disk changes since the last call, then return diagnostics.
+
+        Returns None when the server has died or analysis did not finish in
+        `timeout`; the caller should then use the CLI.
+        """
+        if not self.alive:
+            return None
+        current = self._scan()
+        changes = [
+            {"uri": path.as_uri(), "type": _DELETED}
+            for path in self._snapshot.keys() - current.keys()
+        ]
+        for path, mtime in current.items():
+            previous = self._snapshot.get(path)
+            if previous is None:
+                changes.append({"uri": path.as_uri(), "type": _CREATED})
+            elif previous != mtime:
+                changes.append({"uri": path.as_uri(), "type": _CHANGED})
+        self._snapshot = current
+        if changes:
+            with self._cond:
+                self._pending_change = True
+                self._last_message = time.monotonic()
+            self._notify("workspace/didChangeWatchedFiles", {"changes": changes})
+        if not self._wait_idle(timeout):
+            return None
+        with self._cond:
+            found = [d for diags in self._diagnostics.values() for d in diags]
+        found.sort(key=lambda d: (d.location, d.line, d.column))
+        return found
+
+    def _scan(self) -> dict[Path, int]:
+        """mtime of every Dart source and analysis config file in the package."""
+        found: dict[Path, int] = {}
+        for root, dirs, files in os.walk(self.project_dir):
+            dirs[:] = [d for d in dirs if d not in _SKIP_DIRS and not d.startswith(".")]
+            for name in files:
+                if name.endswith(".dart"):
+                    path = Path(root) / name
+                    try:
+                        found[path] = path.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        for rel in _CONFIG_FILES:
+            path = self.project_dir / rel
+            try:
+                found[path] = path.stat().st_mtime_ns
+            except OSError:
+                continue
+        return found
+
+    def _wait_idle(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if not self.alive:
+                    return False
+                now = time.monotonic()
+                quiet = now - self._last_message
+                busy = self._analyzing or self._pending_change
+                if not busy and quiet >= SETTLE_SECONDS:
+                    return True
+                # No status at all, or none since our change (a file the
+                # server does not analyze): fall back to silence.
+                unreported = self._pending_change or not self._status_seen
+                if unreported and quiet >= QUIET_SECONDS:
+                    return True
+                if now >= deadline:
+                    return False
+                self._cond.wait(min(SETTLE_SECONDS / 2, deadline - now))
+
+    # -- protocol -------------------------------------------------------------
+
+    def _send(self, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        proc = self._proc
+        if proc is None or proc.stdin is None:
+            return
+        # The reader thread answers server requests, so writes are serialized.
+        with self._send_lock:
+            try:
+                proc.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+                proc.stdin.flush()
+            except OSError:
+                pass  # Server gone; `alive` turns False and callers fall back.
+
+    def _notify(self, method: str, params: object) -> None:
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def _request(self, method: str, params: object, timeout: float) -> dict | None:
+        with self._cond:
+            self._next_id += 1
+            request_id = self._next_id
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while request_id not in self._responses:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.alive:
+                    return None
+                self._cond.wait(remaining)
+            response = self._responses.pop(request_id)
+        return None if "error" in response else response
+
+    def _read_loop(self) -> None:
+        proc = self._proc
+        assert proc is not None and proc.stdout is not None
+        stream = proc.stdout
+        while True:
+            length = None
+            while True:
+                header = stream.readline()
+                if not header:
+                    with self._cond:
+                        self._cond.notify_all()  # EOF: wake waiters to see !alive.
+                    return
+                header = header.strip()
+                if not header:
+                    break
+                name, _, value = header.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value.strip())
+            if length is None:
+                continue
+            try:
+                message = json.loads(stream.read(length))
+            except ValueError:
+                continue
+            self._dispatch(message)
+
+    def _dispatch(self, message: dict) -> None:
+        method = message.get("method")
+        if method is not None and "id" in message:
+            # Server-to-client request (capability registration, config
+            # lookups). Answer with an empty result so the server never waits.
+            params = message.get("params") or {}
+            result = (
+                [None] * len(params.get("items", []))
+                if method == "workspace/configuration"
+                else None
+            )
+            self._send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+            return
+        with self._cond:
+            self._last_message = time.monotonic()
+            if method is None:
+                self._responses[message.get("id")] = message
+            elif method == "textDocument/publishDiagnostics":
+                params = message["params"]
+                path = _uri_path(params["uri"])
+                self._diagnostics[path] = [
+                    self._diagnostic(path, d) for d in params.get("diagnostics", [])
+                ]
+            elif method == "$/analyzerStatus":
+                self._status_seen = True
+                self._pending_change = False
+                self._analyzing = bool(message["params"].get("isAnalyzing"))
+            self._cond.notify_all()
+
+    def _diagnostic(self, path: Path, raw: dict) -> Diagnostic:
+        start = raw.get("range", {}).get("start", {})
+        try:
+            location = str(path.relative_to(self.project_dir))
+        except ValueError:
+            location = path.name
+        return Diagnostic(
+            severity=_SEVERITIES.get(raw.get("severity", 1), "info"),
+            location=location,
+            line=start.get("line", 0) + 1,
+            column=start.get("character", 0) + 1,
+            # The CLI's machine format prints codes upper-case; matching it
+            # keeps audit-history finding identities stable across both paths.
+            code=str(raw.get("code", "")).upper(),
+            message=raw.get("message", "").strip(),
+        )
+
+
+def _uri_path(uri: str) -> Path:
+    parsed = urllib.parse.urlparse(uri)
+    return Path(urllib.request.url2pathname(parsed.path))
+
+
+_sessions: dict[Path, AnalysisSession | None] = {}
+
+
+def session_for(project_dir: Path) -> AnalysisSession | None:
+    """The warm session for `project_dir`, starting it on first use.
+
+    A failed start is remembered, so later callers in the same process go
+    straight to the CLI instead of paying the startup timeout again.
+    """
+    key = project_dir.resolve()
+    if key in _sessions:
+        session = _sessions[key]
+        return session if session is not None and session.alive else None
+    session = None
+    if run_mod.command_exists("dart"):
+        session = AnalysisSession(key)
+        if not session.start():
+            session = None
+    _sessions[key] = session
+    return session
+
+
+def diagnostics(project_dir: Path) -> list[Diagnostic] | None:
+    """Current diagnostics from the warm session, or None to use the CLI."""
+    session = session_for(project_dir)
+    return session.refresh() if session is not None else None
+
+
+@atexit.register
+def _close_all() -> None:
+    for session in _sessions.values():
+        if session is not None:
+            session.close()
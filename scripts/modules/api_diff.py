@@ -0,0 +1,229 @@
+"""Public-API diff between two revisions, read straight from git objects.
+
+"What public API changed since v1.6.2?" decides the semver bump. Answering it
+by checking out the old tree is slow and disturbs the working copy, so every
+`lib/**/*.dart` blob at both revisions is streamed through ONE persistent
+`git cat-file --batch` process (one `ls-tree` per revision lists the blobs),
+and the audit's own declaration parser (`audit.public_declarations`) runs on
+the text in memory. Blobs shared by both revisions are parsed once.
+
+A symbol is keyed by its enclosing type and name (`StringUtils.truncate`,
+top-level functions by name alone), so moving a file is not an API change.
+Its value is the multiset of parameter counts seen for that key (overloads and
+same-named extension members on one type collapse into one key).
+
+Classification, from the parser's view (names and parameter counts only):
+    removed symbol / fewer parameters  -> breaking
+    added symbol / more parameters     -> additive (a new parameter is assumed
+                                          optional; the report says to check)
+Pre-1.0 versions follow the Dart convention: a breaking change bumps minor.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import audit
+from . import version_changelog as vc
+from .member_index import SpanIndex
+
+# The barrel only re-exports.
+_BARREL = "lib/saropa_dart_utils.dart"
+
+# symbol key -> parameter counts
+Api = dict[str, Counter]
+
+
+class BlobReader:
+    """A persistent `git cat-file --batch` pipe.
+
+    Requests are written from a feeder thread while replies are read, so a
+    long batch never deadlocks on a full pipe buffer.
+    """
+
+    def __init__(self, repo: Path) -> None:
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read_many(self, object_ids: list[str]) -> Iterator[tuple[str, bytes | None]]:
+        """Yield `(object_id, content)` in request order; None for a missing object."""
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        stdin, stdout = self._proc.stdin, self._proc.stdout
+
+        def feed() -> None:
+            for object_id in object_ids:
+                stdin.write(f"{object_id}\n".encode("ascii"))
+            stdin.flush()
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        for object_id in object_ids:
+            header = stdout.readline().split()
+            # "<sha> <type> <size>" or "<name> missing"
+            if len(header) != 3:
+                yield object_id, None
+                continue
+            content = stdout.read(int(header[2]))
+            stdout.read(1)  # trailing LF
+            yield object_id, content
+        feeder.join()
+
+    def close(self) -> None:
+        if self._proc.stdin is not None:
+            self._proc.stdin.close()
+        self._proc.wait()
+
+    def __enter__(self) -> BlobReader:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+def dart_blobs(repo: Path, rev: str) -> dict[str, str] | None:
+    """`{lib path: blob sha}` for every Dart file at `rev`; None for an unknown rev."""
+    result = subprocess.run(
+        ["git", "ls-tree", "-r", "-z", "--full-tree", rev, "--", "lib"],
+        cwd=repo,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    blobs: dict[str, str] = {}
+    for entry in result.stdout.decode("utf-8").split("\0"):
+        # "<mode> blob <sha>\t<path>"
+        meta, _, path = entry.partition("\t")
+        parts = meta.split()
+        if len(parts) == 3 and parts[1] == "blob" and path.endswith(".dart") and path != _BARREL:
+            blobs[path] = parts[2]
+    return blobs
+
+
+def file_api(text: str) -> Api:
+    """Public symbols declared in one file's text."""
+    owners = SpanIndex(audit.type_ranges(text))
+    api: Api = {}
+    for name, params, line in audit.public_declarations(text):
+        owner = owners.find(line)
+        # A type's own declaration line is inside its span; key it by name.
+        key = f"{owner[2]}.{name}" if owner and owner[0] != line else name
+        api.setdefault(key, Counter())[params] += 1
+    return api
+
+
+def _merge(target: Api, source: Api) -> None:
+    for key, counts in source.items():
+        target.setdefault(key, Counter()).update(counts)
+
+
+def load_apis(repo: Path, revs: Iterable[str]) -> dict[str, Api]:
+    """Public API at each revision, all blobs read through one pipe."""
+    trees: dict[str, dict[str, str]] = {}
+    for rev in revs:
+        blobs = dart_blobs(repo, rev)
+        if blobs is None:
+            raise ValueError(f"unknown revision: {rev}")
+        trees[rev] = blobs
+    unique = sorted({sha for blobs in trees.values() for sha in blobs.values()})
+    parsed: dict[str, Api] = {}
+    with BlobReader(repo) as reader:
+        for sha, content in reader.read_many(unique):
+            if content is not None:
+                parsed[sha] = file_api(content.decode("utf-8", errors="replace"))
+    apis: dict[str, Api] = {}
+    for rev, blobs in trees.items():
+        api: Api = {}
+        for sha in blobs.values():
+            _merge(api, parsed.get(sha, {}))
+        apis[rev] = api
+    return apis
+
+
+@dataclass
+class ApiDiff:
+    """Public symbols added, removed and re-parameterized between two revisions."""
+
+    base: str
+    head: str
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # (key, base param counts, head param counts)
+    fewer_params: list[tuple[str, list[int], list[int]]] = field(default_factory=list)
+    more_params: list[tuple[str, list[int], list[int]]] = field(default_factory=list)
+
+    @property
+    def breaking(self) -> bool:
+        return bool(self.removed or self.fewer_params)
+
+    @property
+    def additive(self) -> bool:
+        return bool(self.added or self.more_params)
+
+
+def compare(base_api: Api, head_api: Api, base: str, head: str) -> ApiDiff:
+    """Diff two API maps."""
+    diff = ApiDiff(base=base, head=head)
+    for key in sorted(base_api.keys() | head_api.keys()):
+        old, new = base_api.get(key), head_api.get(key)
+        if old is None:
+            diff.added.append(key)
+        elif new is None:
+            diff.removed.append(key)
+        elif old != new:
+            change = (key, sorted(old.elements()), sorted(new.elements()))
+            # A shorter or dropped overload breaks callers; extra parameters
+            # (or an extra overload) are assumed optional.
+            if min(new) < min(old) or sum(old.values()) > sum(new.values()):
+                diff.fewer_params.append(change)
+            else:
+                diff.more_params.append(change)
+    return diff
+
+
+def diff_revisions(repo: Path, base: str, head: str = "HEAD") -> ApiDiff:
+    """Public-API diff from `base` to `head` (both git revisions)."""
+    apis = load_apis(repo, [base, head])
+    return compare(apis[base], apis[head], base, head)
+
+
+def suggest_bump(diff: ApiDiff, version: str) -> str:
+    """Suggested bump ("patch", "minor" or "major") for the release after `version`."""
+    major = vc.parse_version(version)[0]
+    if diff.breaking:
+        return "major" if major >= 1 else "minor"
+    if diff.additive:
+        return "minor" if major >= 1 else "patch"
+    return "patch"
+
+
+def report_lines(diff: ApiDiff, limit: int = 20) -> list[str]:
+    """Human-readable summary of `diff`, longest lists truncated to `limit`."""
+    lines = [
+        f"Public API {diff.base} -> {diff.head}: "
+        f"{len(diff.added)} added, {len(diff.removed)} removed, "
+        f"{len(diff.fewer_params)} fewer params, {len(diff.more_params)} more params"
+    ]
+    sections = (
+        ("Removed", list(diff.removed)),
+        ("Fewer parameters", [f"{k} {a} -> {b}" for k, a, b in diff.fewer_params]),
+        ("More parameters (check they are optional)", [f"{k} {a} -> {b}" for k, a, b in diff.more_params]),
+        ("Added", list(diff.added)),
+    )
+    for title, items in sections:
+        if not items:
+            continue
+        lines.append(f"  {title}:")
+        lines.extend(f"    {item}" for item in items[:limit])
+        if len(items) > limit:
+            lines.append(f"    ... and {len(items) - limit} more")
+    return lines
@@ -0,0 +1,58 @@
+"""Atomic file writes: a temp file beside the target, then `os.replace`.
+
+Writing beside the target keeps the replace on one filesystem, so it is
+atomic: a crash mid-write never leaves a truncated CHANGELOG.md, report or
+cache. `tempfile.mkstemp` creates its file as 0600, which `os.replace` would
+carry over to the target; the temp file therefore takes the target's current
+mode, or the umask default (0666 & ~umask) for a new file, before the replace.
+The temp file is removed if anything fails.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# os.umask can only be read by setting it; do that once, single-threaded, at
+# import time rather than per write.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _prepare(path: Path, tmp: str) -> None:
+    if path.exists():
+        shutil.copymode(path, tmp)
+    else:
+        os.chmod(tmp, 0o666 & ~_UMASK)
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    """Replace `path` with `data` atomically, keeping its permission bits."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        _prepare(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def write_text(path: Path, text: str, newline: str | None = None) -> None:
+    """Replace `path` with UTF-8 `text` atomically, keeping its permission bits.
+
+    `newline` is passed to `open`: None translates "\\n" to the platform line
+    ending, "\\n" writes it as is.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline=newline) as handle:
+            handle.write(text)
+        _prepare(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -1,21 +1,36 @@
 """
-Publish audit phase: coverage, analyzer, docs, recursion, try/catch, quality checks.
+Publish audit phase: coverage (plus opt-in measured line coverage), analyzer,
+docs, recursion, try/catch, quality checks, churn x complexity hotspots, near-duplicate methods, loop performance smells,
+per-call allocations of expensive objects, sequential awaits, benchmark coverage,
+findings by member.
 
 Writes a single report to reports/yyyymmdd/yyyymmdd_HHMMSS_publish_audit.txt
-and returns a dict of findings (category -> count) for the caller to display.
+(through `report_store`, which skips repeats and applies retention) and returns
+a dict of findings (category -> count) for the caller to display.
 """
 
 from __future__ import annotations
 
 import re
+import sqlite3
+import time
 from collections import defaultdict
-from datetime import datetime
 from pathlib import Path
 
-from . import duplicate_classes
+from . import analysis_server
+from . import audit_history
+from . import benchmarks
+from . import clones
+from . import hotspots
+from . import lcov
+from . import member_index
+from . import perf_smells
 from . import platform as platform_mod
+from . import report_store
 from . import run as run_mod
+from . import symbols
 from . import ui
+from . import version_changelog as vc
 from .colors import Color
 
 
@@ -338,28 +353,48 @@ def _is_nonpublic_decl(lines_arr: list[str], line_1based: int, name: str) -> boo
     return False
 
 
-def _dartdoc_header_lines(lines_arr: list[str], decl_line_1based: int) -> int:
-    """Count the `///` dartdoc lines immediately above a declaration (skipping
-    blank lines, `//` comments, annotations, and multi-line signature
-    continuations). Used to credit header documentation toward a function's
-    explanation budget in the inline-comment check."""
-    count = 0
+def public_declarations(text: str) -> list[tuple[str, int, int]]:
+    """(name, param_count, line_1based) of each public declaration in `text`.
+
+    The audit's view of the public API (`_iter_decls` minus
+    `_is_nonpublic_decl`), shared with the CAPABILITIES.md fingerprint in
+    `capabilities`.
+    """
+    lines_arr = text.splitlines()
+    return [
+        (name, params, line)
+        for name, params, line in _iter_decls(text)
+        if not _is_nonpublic_decl(lines_arr, line, name)
+    ]
+
+
+def _header_comments(lines_arr: list[str], decl_line_1based: int) -> list[str]:
+    """The `///` and `//` comment lines immediately above a declaration
+    (stripped, bottom-up), skipping blank lines, annotations, and multi-line
+    signature continuations."""
+    comments: list[str] = []
     i = decl_line_1based - 2
     while i >= 0:
         stripped = lines_arr[i].strip()
-        if stripped.startswith("///"):
-            count += 1
+        if stripped.startswith("//"):
+            comments.append(stripped)
             i -= 1
         elif (
             stripped == ""
-            or stripped.startswith("//")
             or stripped.startswith("@")
             or stripped.endswith((")", ">", ","))
         ):
             i -= 1
         else:
             break
-    return count
+    return comments
+
+
+def _dartdoc_header_lines(lines_arr: list[str], decl_line_1based: int) -> int:
+    """Count the `///` dartdoc lines immediately above a declaration. Used to
+    credit header documentation toward a function's explanation budget in the
+    inline-comment check."""
+    return sum(1 for c in _header_comments(lines_arr, decl_line_1based) if c.startswith("///"))
 
 
 def _section(lines: list[str], title: str) -> list[str]:
@@ -418,18 +453,27 @@ def audit_coverage(project_dir: Path, lib_root: Path, test_root: Path) -> tuple[
             key = f"{lib_path.relative_to(project_dir)}::{m}"
             test_count_by_method[key] = sum(1 for b in all_blocks if m in b)
 
+    lines.append("Methods by number of unit test blocks that reference them (heuristic):")
+    lines.append("")
+    lines.extend(_histogram_lines(test_count_by_method.values(), "tests"))
+    lines.append("")
+    lines.append("Legend: red = 0 tests, yellow = 1-2, green = 3+")
+    return lines, test_count_by_method
+
+
+def _histogram_lines(counts, unit: str) -> list[str]:
+    """Bar chart of how many members have 0, 1, 2, ... references (15+ grouped)."""
     # Histogram: 0 -> n0, 1 -> n1, ...
     hist: dict[int, int] = defaultdict(int)
-    for c in test_count_by_method.values():
+    for c in counts:
         hist[c] += 1
 
-    max_tests = max(hist.keys()) if hist else 0
+    max_refs = max(hist.keys()) if hist else 0
     max_count = max(hist.values()) if hist else 0
     width = 40
-    lines.append("Methods by number of unit test blocks that reference them (heuristic):")
-    lines.append("")
+    lines: list[str] = []
     # Use # for bar so report file is ASCII-safe on Windows
-    for k in range(0, min(max_tests + 1, 15)):
+    for k in range(0, min(max_refs + 1, 15)):
         n = hist.get(k, 0)
         bar_len = int((n / max_count) * width) if max_count else 0
         bar = "#" * bar_len
@@ -439,13 +483,115 @@ def audit_coverage(project_dir: Path, lib_root: Path, test_root: Path) -> tuple[
             color_bar = _yellow(bar)
         else:
             color_bar = _green(bar)
-        lines.append(f"  {k:2} tests: {n:4} methods  {color_bar}")
-    if max_tests >= 15:
-        n_rest = sum(hist.get(k, 0) for k in range(15, max_tests + 1))
-        lines.append(f"  15+:        {n_rest:4} methods  (grouped)")
+        lines.append(f"  {k:2} {unit}: {n:4} methods  {color_bar}")
+    if max_refs >= 15:
+        n_rest = sum(hist.get(k, 0) for k in range(15, max_refs + 1))
+        lines.append(f"  {'15+:':<{len(unit) + 4}} {n_rest:4} methods  (grouped)")
+    return lines
+
+
+# -----------------------------------------------------------------------------
+# 1b. Line coverage (opt-in): flutter test --coverage
+# -----------------------------------------------------------------------------
+
+# Methods below this line coverage count as uncovered for the hot-method list.
+_LOW_COVERAGE_PERCENT = 50
+_UNCOVERED_HOT_SHOWN = 25
+# (label, lowest percent, bar color) buckets for the per-method histogram,
+# highest first.
+_COVERAGE_BUCKETS = (
+    ("100%", 100.0, _green),
+    ("80-99%", 80.0, _green),
+    ("50-79%", 50.0, _yellow),
+    ("1-49%", 0.01, _yellow),
+    ("0%", 0.0, _red),
+)
+
+
+def audit_line_coverage(
+    project_dir: Path, lib_root: Path
+) -> tuple[list[str], list[str]]:
+    """Per-method line coverage measured by `flutter test --coverage`.
+
+    Runs the suite with coverage on, then hands coverage/lcov.info to `lcov`,
+    which streams it record by record onto `_method_ranges` spans (cached by
+    tracefile hash). A tracefile older than this run (the suite crashed before
+    writing one) is not used. Methods under `_LOW_COVERAGE_PERCENT` are ranked
+    by missed lines times their churn from the hotspot index, so code that
+    changes often and is barely exercised comes first; without git history
+    they are ranked by missed lines alone. Informational, like section 1.
+    Returns (report_lines, ranked uncovered-method details).
+    """
+    if not run_mod.command_exists("flutter"):
+        return ["flutter not found on PATH; line coverage skipped."], []
+
+    lines: list[str] = []
+    lcov_path = project_dir / lcov.LCOV_RELATIVE_PATH
+    started = time.time()
+    progress = run_mod.ProgressLine()
+    result = run_mod.run_streaming(
+        ["flutter", "test", "--coverage"], project_dir, progress
+    )
+    progress.finish()
+    if result.returncode != 0:
+        lines.append(
+            f"flutter test exited {result.returncode}; coverage reflects the "
+            "tests that ran."
+        )
+    if not lcov_path.is_file() or lcov_path.stat().st_mtime < started:
+        lines.append(f"No fresh {lcov.LCOV_RELATIVE_PATH.as_posix()}; line coverage skipped.")
+        return lines, []
+
+    report = lcov.load_coverage(project_dir, _method_ranges, lcov_path)
+    if report is None:
+        return lines + ["Tracefile unreadable; line coverage skipped."], []
+    percent = 100.0 * report.lines_hit / report.lines_found if report.lines_found else 0.0
+    lines.append(
+        f"Executable lines hit: {report.lines_hit}/{report.lines_found} "
+        f"({percent:.1f}%) across {report.files_with_data} lib file(s); "
+        f"{report.files_without_data} lib file(s) never loaded by a test."
+    )
     lines.append("")
-    lines.append("Legend: red = 0 tests, yellow = 1-2, green = 3+")
-    return lines, test_count_by_method
+    lines.append("Methods by line coverage:")
+    counts = dict.fromkeys((label for label, _, _ in _COVERAGE_BUCKETS), 0)
+    for method in report.methods:
+        for label, floor, _ in _COVERAGE_BUCKETS:
+            if method.percent >= floor:
+                counts[label] += 1
+                break
+    max_count = max(counts.values(), default=0)
+    for label, _, color in _COVERAGE_BUCKETS:
+        n = counts[label]
+        bar = "#" * (int(n / max_count * 40) if max_count else 0)
+        lines.append(f"  {label:>7}: {n:4} methods  {color(bar)}")
+    lines.append("")
+
+    index = hotspots.load_churn_index(project_dir)
+    ranked: list[tuple[int, str]] = []
+    for method in report.methods:
+        if method.percent >= _LOW_COVERAGE_PERCENT:
+            continue
+        detail = (
+            f"  {method.file}:{method.line}  {method.name}  "
+            f"{method.covered}/{method.total} lines ({method.percent:.0f}%)"
+        )
+        churn = index.files.get(method.file) if index is not None else None
+        if index is None:
+            ranked.append((method.missed, detail))
+        elif churn is not None:
+            changed, _peak = churn.span_churn(method.line, method.end)
+            if changed:
+                ranked.append((method.missed * changed, f"{detail}, {changed} line changes"))
+    ranked.sort(key=lambda item: -item[0])
+    details = [detail for _score, detail in ranked]
+    if index is None:
+        lines.append("Least-covered methods (git history unavailable, by missed lines):")
+    else:
+        lines.append("Uncovered hot methods (missed lines x line changes):")
+    lines.extend(details[:_UNCOVERED_HOT_SHOWN] or ["  (none)"])
+    if len(details) > _UNCOVERED_HOT_SHOWN:
+        lines.append(f"  ... and {len(details) - _UNCOVERED_HOT_SHOWN} more")
+    return lines, details
 
 
 # -----------------------------------------------------------------------------
@@ -453,7 +599,7 @@ def audit_coverage(project_dir: Path, lib_root: Path, test_root: Path) -> tuple[
 # -----------------------------------------------------------------------------
 
 def audit_analyzer(
-    project_dir: Path,
+    project_dir: Path, warm: bool = True
 ) -> tuple[list[str], list[str], list[str], list[str]]:
     """Run dart analyze --format machine and bucket findings by severity.
 
@@ -465,21 +611,32 @@ def audit_analyzer(
 
     Machine format is pipe-delimited:
         SEVERITY|TYPE|CODE|FILE|LINE|COL|LENGTH|MESSAGE
+
+    With `warm`, the diagnostics come from the shared `analysis_server`
+    session instead, which re-analyzes only what changed since the last call
+    (an audit retry, or step 6 after the audit). The CLI is the fallback when
+    the session is unavailable.
     """
-    result = run_mod.run_capture(
-        ["dart", "analyze", "--format", "machine"], project_dir
-    )
     errors: list[str] = []
     warnings: list[str] = []
     infos: list[str] = []
-    for line in (result.stdout or "").splitlines():
+    buckets = {"error": errors, "warning": warnings, "info": infos}
+
+    found = analysis_server.diagnostics(project_dir) if warm else None
+    if found is not None:
+        for diagnostic in found:
+            buckets[diagnostic.severity].append(diagnostic.detail)
+        return _analyzer_report_lines(errors, warnings, infos), errors, warnings, infos
+
+    def on_line(line: str) -> None:
+        # Parsed as the analyzer prints, so the raw output is never held whole.
         if not line.strip():
-            continue
+            return
         parts = line.split("|")
         # Need all 8 machine-format fields to build a detail line; anything
-        # shorter is a malformed/partial line we skip rather than misparse.
+        # shorter is a malformed/partial line (or merged stderr) we skip.
         if len(parts) < 8:
-            continue
+            return
         sev = parts[0].strip()
         code = parts[2].strip()
         file_path = parts[3].strip()
@@ -498,13 +655,22 @@ def audit_analyzer(
             warnings.append(detail)
         elif sev == "INFO":
             infos.append(detail)
-    report_lines = [
+
+    run_mod.run_streaming(
+        ["dart", "analyze", "--format", "machine"], project_dir, on_line
+    )
+    return _analyzer_report_lines(errors, warnings, infos), errors, warnings, infos
+
+
+def _analyzer_report_lines(
+    errors: list[str], warnings: list[str], infos: list[str]
+) -> list[str]:
+    return [
         f"  Errors:   {len(errors)}",
         f"  Warnings: {len(warnings)}",
         f"  Info:     {len(infos)}",
         "",
     ]
-    return report_lines, errors, warnings, infos
 
 
 # -----------------------------------------------------------------------------
@@ -583,6 +749,86 @@ def _method_ranges(content: str) -> list[tuple[int, int, str]]:
     return filtered
 
 
+def _missing_doc_headers(label: str, content: str) -> list[str]:
+    """Public methods in one file with no `///` line above them.
+
+    `label` names the file in each detail (the audit uses the bare file name).
+    """
+    missing: list[str] = []
+    lines_arr = content.splitlines()
+    for start_line, end_line, name in _method_ranges(content):
+        # Non-public declarations are not part of the public API, so the
+        # dartdoc contract (enforced repo-wide by `public_member_api_docs`)
+        # does not require docs on them. This covers private members, private
+        # named constructors, and members of private types — together ~half
+        # the false positives in this check.
+        if _is_nonpublic_decl(lines_arr, start_line, name):
+            continue
+        # A constructor (name == enclosing type) is documented by the type's
+        # own dartdoc; `public_member_api_docs` does not require a separate
+        # doc on it, so neither should this check.
+        if name == _enclosing_type_name(lines_arr, start_line):
+            continue
+        doc_lines = []
+        is_override = False
+        # >0 while the walk is still unwinding a multi-line annotation or
+        # parameter list opened on a lower line (e.g. a `@Deprecated( ... )`
+        # whose message is split across several string-literal lines). Those
+        # interior lines neither start with `@` nor end with a bracket, so
+        # without depth tracking the walk hit the `else: break` below and
+        # falsely reported the dartdoc above the annotation as missing —
+        # which is exactly what happened to the deprecated `isNullOrEmpty` /
+        # `isNotNullOrEmpty` getters (multi-line `@Deprecated` message).
+        ann_paren_depth = 0
+        i = start_line - 2
+        while i >= 0 and i < len(lines_arr):
+            raw = lines_arr[i]
+            l = raw.strip()
+            # Count only structural parens (string/comment contents removed)
+            # so a `(` inside a doc message does not unbalance the depth.
+            bare = _strip_strings(_strip_line_comment(raw))
+            # Inside an unfinished annotation/arg list: skip every line until
+            # its opening `@Name(` / `(` brings the depth back to zero.
+            if ann_paren_depth > 0:
+                ann_paren_depth += bare.count(")") - bare.count("(")
+                if ann_paren_depth < 0:
+                    ann_paren_depth = 0
+                i -= 1
+                continue
+            if l.startswith("///"):
+                doc_lines.append(l)
+                i -= 1
+            # Skip blank lines, `//` comments, and annotations
+            # (`@override`, `@useResult`, `@Deprecated('msg')`, `@pragma(...)`)
+            # that legitimately appear between dartdoc and declaration.
+            # WHY: previously the walk aborted on `@useResult`, so well-documented
+            # getters like `anyTrue` (with 7 lines of `///` dartdoc above the
+            # `@useResult` line) were falsely reported as missing dartdoc.
+            elif l == "" or l.startswith("//") or l.startswith("@"):
+                if l.startswith("@override"):
+                    is_override = True
+                i -= 1
+            # Skip a multi-line signature continuation OR the closing line of
+            # a multi-line annotation: when a declaration's return type /
+            # parameter list spans several lines, or a `@Deprecated( ... )`
+            # message is split over multiple lines, the line just above ends
+            # with `)`, `>`, or `,`. Track paren depth so any interior lines
+            # above are skipped until the opener is reached.
+            # WHY: e.g. a record-returning function whose tuple type sits on
+            # its own line above the name — without this the walk stopped
+            # there and falsely reported the (present) dartdoc above as missing.
+            elif l.endswith((")", ">", ",")):
+                ann_paren_depth += bare.count(")") - bare.count("(")
+                i -= 1
+            else:
+                break
+        # Overrides (toString, operator==, hashCode, ...) inherit their
+        # supertype's documentation, so a missing `///` is not a defect.
+        if not doc_lines and not is_override:
+            missing.append(f"  {label}:{start_line}  {name}")
+    return missing
+
+
 def audit_doc_headers(lib_root: Path) -> tuple[list[str], list[str]]:
     """Check each method has at least one /// dartdoc line preceding it.
 
@@ -595,80 +841,10 @@ def audit_doc_headers(lib_root: Path) -> tuple[list[str], list[str]]:
     have ZERO doc lines.
     """
     missing: list[str] = []
-
     for lib_path in lib_root.rglob("*.dart"):
-        content = lib_path.read_text(encoding="utf-8")
-        lines_arr = content.splitlines()
-        for start_line, end_line, name in _method_ranges(content):
-            # Non-public declarations are not part of the public API, so the
-            # dartdoc contract (enforced repo-wide by `public_member_api_docs`)
-            # does not require docs on them. This covers private members, private
-            # named constructors, and members of private types — together ~half
-            # the false positives in this check.
-            if _is_nonpublic_decl(lines_arr, start_line, name):
-                continue
-            # A constructor (name == enclosing type) is documented by the type's
-            # own dartdoc; `public_member_api_docs` does not require a separate
-            # doc on it, so neither should this check.
-            if name == _enclosing_type_name(lines_arr, start_line):
-                continue
-            doc_lines = []
-            is_override = False
-            # >0 while the walk is still unwinding a multi-line annotation or
-            # parameter list opened on a lower line (e.g. a `@Deprecated( ... )`
-            # whose message is split across several string-literal lines). Those
-            # interior lines neither start with `@` nor end with a bracket, so
-            # without depth tracking the walk hit the `else: break` below and
-            # falsely reported the dartdoc above the annotation as missing —
-            # which is exactly what happened to the deprecated `isNullOrEmpty` /
-            # `isNotNullOrEmpty` getters (multi-line `@Deprecated` message).
-            ann_paren_depth = 0
-            i = start_line - 2
-            while i >= 0 and i < len(lines_arr):
-                raw = lines_arr[i]
-                l = raw.strip()
-                # Count only structural parens (string/comment contents removed)
-                # so a `(` inside a doc message does not unbalance the depth.
-                bare = _strip_strings(_strip_line_comment(raw))
-                # Inside an unfinished annotation/arg list: skip every line until
-                # its opening `@Name(` / `(` brings the depth back to zero.
-                if ann_paren_depth > 0:
-                    ann_paren_depth += bare.count(")") - bare.count("(")
-                    if ann_paren_depth < 0:
-                        ann_paren_depth = 0
-                    i -= 1
-                    continue
-                if l.startswith("///"):
-                    doc_lines.append(l)
-                    i -= 1
-                # Skip blank lines, `//` comments, and annotations
-                # (`@override`, `@useResult`, `@Deprecated('msg')`, `@pragma(...)`)
-                # that legitimately appear between dartdoc and declaration.
-                # WHY: previously the walk aborted on `@useResult`, so well-documented
-                # getters like `anyTrue` (with 7 lines of `///` dartdoc above the
-                # `@useResult` line) were falsely reported as missing dartdoc.
-                elif l == "" or l.startswith("//") or l.startswith("@"):
-                    if l.startswith("@override"):
-                        is_override = True
-                    i -= 1
-                # Skip a multi-line signature continuation OR the closing line of
-                # a multi-line annotation: when a declaration's return type /
-                # parameter list spans several lines, or a `@Deprecated( ... )`
-                # message is split over multiple lines, the line just above ends
-                # with `)`, `>`, or `,`. Track paren depth so any interior lines
-                # above are skipped until the opener is reached.
-                # WHY: e.g. a record-returning function whose tuple type sits on
-                # its own line above the name — without this the walk stopped
-                # there and falsely reported the (present) dartdoc above as missing.
-                elif l.endswith((")", ">", ",")):
-                    ann_paren_depth += bare.count(")") - bare.count("(")
-                    i -= 1
-                else:
-                    break
-            # Overrides (toString, operator==, hashCode, ...) inherit their
-            # supertype's documentation, so a missing `///` is not a defect.
-            if not doc_lines and not is_override:
-                missing.append(f"  {lib_path.name}:{start_line}  {name}")
+        missing.extend(
+            _missing_doc_headers(lib_path.name, lib_path.read_text(encoding="utf-8"))
+        )
 
     report_lines: list[str] = []
     if missing:
@@ -685,6 +861,19 @@ def audit_doc_headers(lib_root: Path) -> tuple[list[str], list[str]]:
 # 4. Recursion and bad code practices
 # -----------------------------------------------------------------------------
 
+def _empty_catches(label: str, content: str) -> list[str]:
+    """Methods in one file with an empty `catch (...) {}` block."""
+    issues: list[str] = []
+    lines_arr = content.splitlines()
+    for start_line, end_line, name in _method_ranges(content):
+        # Skip the declaration line; scan only the body.
+        body = "\n".join(lines_arr[start_line:end_line])
+        # Empty catch: catch (_) { } or catch (e) { } — swallows errors.
+        if re.search(r"catch\s*\([^)]+\)\s*\{\s*\}", body):
+            issues.append(f"  {label}:{start_line}  empty catch block: {name}")
+    return issues
+
+
 def audit_recursion_and_bad(lib_root: Path) -> tuple[list[str], list[str]]:
     """Flag genuine bad practices (empty catch blocks).
 
@@ -698,16 +887,8 @@ def audit_recursion_and_bad(lib_root: Path) -> tuple[list[str], list[str]]:
     """
     report_lines: list[str] = []
     issues: list[str] = []
-
     for lib_path in lib_root.rglob("*.dart"):
-        content = lib_path.read_text(encoding="utf-8")
-        lines_arr = content.splitlines()
-        for start_line, end_line, name in _method_ranges(content):
-            # Skip the declaration line; scan only the body.
-            body = "\n".join(lines_arr[start_line:end_line])
-            # Empty catch: catch (_) { } or catch (e) { } — swallows errors.
-            if re.search(r"catch\s*\([^)]+\)\s*\{\s*\}", body):
-                issues.append(f"  {lib_path.name}:{start_line}  empty catch block: {name}")
+        issues.extend(_empty_catches(lib_path.name, lib_path.read_text(encoding="utf-8")))
     if issues:
         report_lines.append("Empty catch blocks (errors silently swallowed):")
         report_lines.extend(issues[:30])
@@ -892,6 +1073,38 @@ def _count_constructs_and_comments(body: list[str]) -> tuple[int, int]:
     return constructs, comments
 
 
+def _sparse_comments(label: str, content: str) -> list[tuple[int, str]]:
+    """(shortfall, detail) for each under-commented method in one file."""
+    ranked: list[tuple[int, str]] = []
+    lines_arr = content.splitlines()
+    for start_line, end_line, name in _method_ranges(content):
+        # Skip the declaration line itself (index start_line-1); scan only
+        # the body so a signature's own keywords aren't miscounted.
+        body = lines_arr[start_line:end_line]
+        constructs, comments = _count_constructs_and_comments(body)
+        # Trivial methods are exempt from the inline-comment requirement.
+        if constructs < _MIN_CONSTRUCTS_FOR_COMMENT:
+            continue
+        # Credit the dartdoc header toward the WHY budget: the project policy
+        # is "comment WHY", and for cohesive algorithmic utilities the why
+        # often lives in a multi-line `///` header rather than inline. A
+        # function whose header explains its approach is documented; this
+        # check should flag only functions under-explained RELATIVE to their
+        # complexity, counting header + inline together.
+        comments += _dartdoc_header_lines(lines_arr, start_line)
+        ratio = comments / constructs
+        if ratio < _MIN_COMMENT_RATIO:
+            shortfall = constructs - comments
+            ranked.append(
+                (
+                    shortfall,
+                    f"  {label}:{start_line}  {name}  "
+                    f"{constructs} constructs, {comments} comments",
+                )
+            )
+    return ranked
+
+
 def audit_code_comments(
     project_dir: Path, lib_root: Path
 ) -> tuple[list[str], list[str]]:
@@ -909,34 +1122,8 @@ def audit_code_comments(
     # (shortfall, detail) so we can rank worst-first before dropping the score.
     ranked: list[tuple[int, str]] = []
     for lib_path in lib_root.rglob("*.dart"):
-        content = lib_path.read_text(encoding="utf-8")
-        lines_arr = content.splitlines()
-        for start_line, end_line, name in _method_ranges(content):
-            # Skip the declaration line itself (index start_line-1); scan only
-            # the body so a signature's own keywords aren't miscounted.
-            body = lines_arr[start_line:end_line]
-            constructs, comments = _count_constructs_and_comments(body)
-            # Trivial methods are exempt from the inline-comment requirement.
-            if constructs < _MIN_CONSTRUCTS_FOR_COMMENT:
-                continue
-            # Credit the dartdoc header toward the WHY budget: the project policy
-            # is "comment WHY", and for cohesive algorithmic utilities the why
-            # often lives in a multi-line `///` header rather than inline. A
-            # function whose header explains its approach is documented; this
-            # check should flag only functions under-explained RELATIVE to their
-            # complexity, counting header + inline together.
-            comments += _dartdoc_header_lines(lines_arr, start_line)
-            ratio = comments / constructs
-            if ratio < _MIN_COMMENT_RATIO:
-                shortfall = constructs - comments
-                rel = lib_path.relative_to(project_dir)
-                ranked.append(
-                    (
-                        shortfall,
-                        f"  {rel}:{start_line}  {name}  "
-                        f"{constructs} constructs, {comments} comments",
-                    )
-                )
+        rel = lib_path.relative_to(project_dir)
+        ranked.extend(_sparse_comments(str(rel), lib_path.read_text(encoding="utf-8")))
     ranked.sort(key=lambda x: -x[0])
     issues = [detail for _shortfall, detail in ranked]
 
@@ -1091,14 +1278,599 @@ def audit_param_test_coverage(
     return report_lines, issues
 
 
+# -----------------------------------------------------------------------------
+# 10. Hotspots (churn x complexity)
+# -----------------------------------------------------------------------------
+
+# Rows shown in each hotspot table; the full ranking is rarely actionable.
+_HOTSPOT_FILES_SHOWN = 15
+_HOTSPOT_METHODS_SHOWN = 25
+
+
+def audit_hotspots(
+    project_dir: Path, lib_root: Path
+) -> tuple[list[str], list[str]]:
+    """Rank methods by how often they change times how complex they are.
+
+    Churn comes from the cached per-line history index (`hotspots`), which is
+    brought up to HEAD incrementally; complexity is the branch/loop construct
+    count from `_count_constructs_and_comments`. A method's score is its
+    changed-line total multiplied by its constructs, so a complex method nobody
+    touches and a busy but trivial one both rank low. Methods with no
+    constructs are left out. The ranking is informational: it steers review
+    and optimization effort and is not counted as a finding.
+    """
+    index = hotspots.load_churn_index(project_dir)
+    if index is None:
+        return ["Git history unavailable; hotspot ranking skipped."], []
+
+    ranked_files: list[tuple[int, int, str]] = []
+    ranked_methods: list[tuple[int, str]] = []
+    for lib_path in lib_root.rglob("*.dart"):
+        rel = lib_path.relative_to(project_dir).as_posix()
+        churn = index.files.get(rel)
+        if churn is None:
+            continue  # Not committed yet: no history to rank.
+        ranked_files.append(
+            (
+                churn.commits,
+                churn.added + churn.deleted,
+                f"  {rel}  {churn.commits} commits, "
+                f"+{churn.added}/-{churn.deleted} lines",
+            )
+        )
+        content = lib_path.read_text(encoding="utf-8")
+        lines_arr = content.splitlines()
+        for start_line, end_line, name in _method_ranges(content):
+            constructs, _ = _count_constructs_and_comments(
+                lines_arr[start_line:end_line]
+            )
+            changed, peak = churn.span_churn(start_line, end_line)
+            score = changed * constructs
+            if score == 0:
+                continue
+            ranked_methods.append(
+                (
+                    score,
+                    f"  {rel}:{start_line}  {name}  score {score}  "
+                    f"({changed} line changes, peak {peak}x, "
+                    f"{constructs} constructs)",
+                )
+            )
+    ranked_files.sort(key=lambda x: (-x[0], -x[1]))
+    ranked_methods.sort(key=lambda x: -x[0])
+    method_details = [detail for _score, detail in ranked_methods]
+
+    # Keep this line free of run-specific state (commits replayed, rebuilt) so
+    # an unchanged tree produces an identical report the store can skip.
+    report_lines = [f"Churn history indexed up to {index.head[:12]}."]
+    if ranked_files:
+        report_lines.append("Most-changed files:")
+        report_lines.extend(
+            detail for _commits, _lines, detail in ranked_files[:_HOTSPOT_FILES_SHOWN]
+        )
+    if method_details:
+        report_lines.append("Hotspot methods (changed lines x constructs):")
+        report_lines.extend(method_details[:_HOTSPOT_METHODS_SHOWN])
+        if len(method_details) > _HOTSPOT_METHODS_SHOWN:
+            report_lines.append(
+                f"  ... and {len(method_details) - _HOTSPOT_METHODS_SHOWN} more"
+            )
+    else:
+        report_lines.append("No changed method has branch/loop constructs.")
+    return report_lines, method_details
+
+
+# -----------------------------------------------------------------------------
+# 11. Near-duplicate methods (clones)
+# -----------------------------------------------------------------------------
+
+# Clone groups shown; the rest are counted.
+_CLONE_GROUPS_SHOWN = 20
+
+
+def audit_clones(project_dir: Path, lib_root: Path) -> tuple[list[str], list[str]]:
+    """Group method bodies that are near-copies of each other across lib/.
+
+    Bodies come from `_method_ranges` (signature included) and are compared by
+    `clones`: identifiers and literals are abstracted, so a copy with renamed
+    variables still matches, and LSH keeps the comparison close to linear
+    instead of all pairs. Groups are ranked by the tokens a consolidation to
+    one shared helper would remove. Like hotspots, the ranking is
+    informational and not counted as a finding: some near-copies (min/max
+    pairs, typed overloads) are deliberate.
+    """
+    bodies: list[clones.MethodBody] = []
+    for lib_path in sorted(lib_root.rglob("*.dart")):
+        rel = lib_path.relative_to(project_dir).as_posix()
+        content = lib_path.read_text(encoding="utf-8")
+        lines_arr = content.splitlines()
+        for start_line, end_line, name in _method_ranges(content):
+            bodies.append(
+                clones.MethodBody(
+                    rel,
+                    start_line,
+                    name,
+                    "\n".join(lines_arr[start_line - 1 : end_line]),
+                )
+            )
+    groups, candidates = clones.find_clone_groups(bodies)
+
+    report_lines = [
+        f"{len(bodies)} methods compared; {candidates} candidate pairs checked "
+        f"(similarity >= {clones.SIMILARITY_THRESHOLD:.0%}, "
+        f"{clones.MIN_TOKENS}+ tokens)."
+    ]
+    if not groups:
+        report_lines.append("No near-duplicate methods found.")
+        return report_lines, []
+    blocks: list[list[str]] = [
+        [
+            f"  {len(group.members)} methods, ~{group.similarity:.0%} similar, "
+            f"~{group.removable_tokens} removable tokens:"
+        ]
+        + [f"      {m.file}:{m.line}  {m.name}" for m in group.members]
+        for group in groups
+    ]
+    report_lines.append("Clone groups (most removable code first):")
+    for block in blocks[:_CLONE_GROUPS_SHOWN]:
+        report_lines.extend(block)
+    if len(blocks) > _CLONE_GROUPS_SHOWN:
+        report_lines.append(
+            f"  ... and {len(blocks) - _CLONE_GROUPS_SHOWN} more group(s)"
+        )
+    return report_lines, [block[0].strip() for block in blocks]
+
+
+# -----------------------------------------------------------------------------
+# 12. Loop performance smells
+# -----------------------------------------------------------------------------
+
+_SMELLS_SHOWN = 50
+
+
+def _loop_smells(label: str, content: str) -> list[tuple[perf_smells.Smell, str]]:
+    """(smell, detail) for each loop smell in one file."""
+    ranked: list[tuple[perf_smells.Smell, str]] = []
+    code = {line_no: text for line_no, text, _depth in symbols.code_lines(content)}
+    file_types = perf_smells.declared_types("\n".join(code.values()))
+    for start_line, end_line, name in _method_ranges(content):
+        body = "\n".join(code.get(n, "") for n in range(start_line, end_line + 1))
+        for smell in perf_smells.find_smells(body, start_line, file_types):
+            ranked.append(
+                (smell, f"  {label}:{smell.line}  {name}  depth {smell.depth}: {smell.message}")
+            )
+    return ranked
+
+
+def audit_loop_smells(project_dir: Path, lib_root: Path) -> tuple[list[str], list[str]]:
+    """Flag accidental O(n^2) shapes in loops, deepest nesting first.
+
+    Uses the same method ranges as the comment-density check, on text with
+    comments and strings removed (`symbols.code_lines`), and hands each body
+    to `perf_smells`: nested loops over one collection, List `contains` /
+    `indexOf` inside a loop, String `+=` in a loop, and `.toList()` followed
+    by more chaining. Names declared anywhere in the file (fields included)
+    supply receiver types, so a Set lookup is never mistaken for a List scan.
+    """
+    ranked: list[tuple[perf_smells.Smell, str]] = []
+    for lib_path in sorted(lib_root.rglob("*.dart")):
+        rel = lib_path.relative_to(project_dir).as_posix()
+        ranked.extend(_loop_smells(rel, lib_path.read_text(encoding="utf-8")))
+    ranked.sort(key=lambda item: -item[0].depth)
+    issues = [detail for _smell, detail in ranked]
+
+    report_lines: list[str] = []
+    if issues:
+        report_lines.append("Loop hot-path smells (deepest nesting first):")
+        report_lines.extend(issues[:_SMELLS_SHOWN])
+        if len(issues) > _SMELLS_SHOWN:
+            report_lines.append(f"  ... and {len(issues) - _SMELLS_SHOWN} more")
+    else:
+        report_lines.append("No loop performance smells found.")
+    return report_lines, issues
+
+
+# -----------------------------------------------------------------------------
+# 13. Per-call allocations of expensive objects
+# -----------------------------------------------------------------------------
+
+_ALLOCATIONS_SHOWN = 50
+
+
+def _hoistable_allocations(label: str, content: str) -> tuple[list[str], int]:
+    """Hoistable allocation details in one file, and its runtime-argument count."""
+    issues: list[str] = []
+    runtime = 0
+    code = {
+        line_no: text
+        for line_no, text, _depth in symbols.code_lines(content, mark_interpolation=True)
+    }
+    for start_line, end_line, name in _method_ranges(content):
+        body = "\n".join(code.get(n, "") for n in range(start_line, end_line + 1))
+        for alloc in perf_smells.find_allocations(body, start_line):
+            if not alloc.hoistable:
+                runtime += 1
+                continue
+            what = (
+                f"{alloc.what} with {alloc.entries} constant entries (make it const)"
+                if alloc.entries
+                else f"{alloc.what}(...) with constant arguments (move to a static final)"
+            )
+            issues.append(f"  {label}:{alloc.line}  {name}  hoistable: {what}")
+    return issues, runtime
+
+
+def audit_allocations(project_dir: Path, lib_root: Path) -> tuple[list[str], list[str]]:
+    """Flag expensive objects rebuilt on every call that could be built once.
+
+    Within each method range, `perf_smells.find_allocations` finds constructor
+    calls of `perf_smells.EXPENSIVE_TYPES` (RegExp, DateFormat, NumberFormat,
+    ...) and large non-const collection literals. Those whose arguments are
+    all constant literals are "hoistable" to a `static final` / top-level
+    `final` (or `const`) and become findings; calls with runtime arguments
+    (a locale, an interpolated pattern) cannot be hoisted as-is and are only
+    counted. Fields and top-level initializers are outside the method ranges,
+    so already-hoisted objects are never reported.
+    """
+    issues: list[str] = []
+    per_file: dict[str, list[int]] = {}
+    for lib_path in sorted(lib_root.rglob("*.dart")):
+        rel = lib_path.relative_to(project_dir).as_posix()
+        file_issues, runtime = _hoistable_allocations(rel, lib_path.read_text(encoding="utf-8"))
+        if file_issues or runtime:
+            per_file[rel] = [len(file_issues), runtime]
+        issues.extend(file_issues)
+
+    hoistable_total = sum(h for h, _runtime in per_file.values())
+    runtime_total = sum(r for _hoistable, r in per_file.values())
+    report_lines = [
+        f"{hoistable_total} hoistable, {runtime_total} with runtime arguments "
+        f"(types: {', '.join(perf_smells.EXPENSIVE_TYPES)}; collection literals "
+        f"of {perf_smells.MIN_LITERAL_ENTRIES}+ entries)."
+    ]
+    if issues:
+        report_lines.append("Per file (hoistable / runtime arguments):")
+        for rel, (hoistable, runtime) in sorted(
+            per_file.items(), key=lambda item: (-item[1][0], item[0])
+        ):
+            if hoistable:
+                report_lines.append(f"  {rel}  {hoistable} / {runtime}")
+        report_lines.append("Hoistable allocations:")
+        report_lines.extend(issues[:_ALLOCATIONS_SHOWN])
+        if len(issues) > _ALLOCATIONS_SHOWN:
+            report_lines.append(f"  ... and {len(issues) - _ALLOCATIONS_SHOWN} more")
+    else:
+        report_lines.append("No hoistable per-call allocations found.")
+    return report_lines, issues
+
+
+# -----------------------------------------------------------------------------
+# 14. Sequential awaits
+# -----------------------------------------------------------------------------
+
+
+# Opt-out for members that await one at a time on purpose (ordering, rate
+# limits, shared state): the marker in or above the member, "sequential" in
+# its name, or a doc comment that says so.
+SEQUENTIAL_MARKER = "// audit: sequential"
+_SEQUENTIAL_DOC_RE = re.compile(
+    r"\bsequential(?:ly)?\b|\bone after (?:another|the other)\b|\bone at a time\b",
+    re.IGNORECASE,
+)
+
+
+def _deliberately_sequential(
+    lines_arr: list[str], start_line: int, end_line: int, name: str
+) -> bool:
+    """True when the member at `start_line..end_line` is sequential by design."""
+    if "sequential" in name.lower():
+        return True
+    header = _header_comments(lines_arr, start_line)
+    if any(c.startswith("///") and _SEQUENTIAL_DOC_RE.search(c) for c in header):
+        return True
+    member = lines_arr[start_line - 1 : end_line]
+    return any(SEQUENTIAL_MARKER in line for line in [*header, *member])
+
+
+def _sequential_awaits(label: str, content: str) -> list[str]:
+    """Sequential-await details in one file."""
+    if "async" not in content:
+        return []
+    issues: list[str] = []
+    lines_arr = content.splitlines()
+    code = {line_no: text for line_no, text, _depth in symbols.code_lines(content)}
+    for start_line, end_line, name in _method_ranges(content):
+        body = "\n".join(code.get(n, "") for n in range(start_line, end_line + 1))
+        smells = perf_smells.find_async_smells(body, start_line)
+        if smells and _deliberately_sequential(lines_arr, start_line, end_line, name):
+            # Only the "make it concurrent" advice is waived; a needless
+            # `async` is still a smell.
+            smells = [s for s in smells if s.kind == "async-no-await"]
+        for smell in smells:
+            issues.append(f"  {label}:{smell.line}  {name}  {smell.message}")
+    return issues
+
+
+def audit_sequential_awaits(
+    project_dir: Path, lib_root: Path
+) -> tuple[list[str], list[str]]:
+    """Flag async code that waits one thing at a time when it need not.
+
+    Covers every method range in lib/ (lib/async holds most of it, but caches
+    and parsers have async members too) through `perf_smells.find_async_smells`:
+    `await` inside a `for`/`while` loop whose iterations are not tied together
+    by an early `return`/`break`, runs of adjacent `x = await ...` statements
+    whose results do not feed each other, and `async` functions that never
+    await. Each finding names the concurrent alternative.
+
+    Members that are sequential by design are exempt from the first two: a
+    `// audit: sequential` comment in or above the member, "sequential" in
+    its name (`mapSequential`), or a dartdoc that says it runs sequentially,
+    one after another or one at a time.
+    """
+    issues: list[str] = []
+    for lib_path in sorted(lib_root.rglob("*.dart")):
+        rel = lib_path.relative_to(project_dir).as_posix()
+        issues.extend(_sequential_awaits(rel, lib_path.read_text(encoding="utf-8")))
+
+    if issues:
+        report_lines = ["Awaits that could run concurrently:"]
+        report_lines.extend(issues)
+    else:
+        report_lines = ["No sequential awaits or needless async found."]
+    return report_lines, issues
+
+
+# -----------------------------------------------------------------------------
+# 15. Benchmark coverage
+# -----------------------------------------------------------------------------
+
+_UNBENCHMARKED_SHOWN = 25
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$]*")
+
+
+def audit_benchmark_coverage(
+    project_dir: Path, lib_root: Path
+) -> tuple[list[str], dict[str, int]]:
+    """Histogram of how many benchmark files reference each public member.
+
+    The performance counterpart of `audit_coverage`. Benchmark files are the
+    ones the runner discovers (`benchmarks.discover`, benchmark/*_benchmark.dart);
+    each is tokenized once, with comments and strings removed
+    (`symbols.code_lines`), into an identifier -> files index, so a member's
+    count is a set lookup rather than a substring scan per member. Unreferenced
+    members are ranked by branch/loop constructs
+    (`_count_constructs_and_comments`): the most complex code without a
+    benchmark is where a regression would go unnoticed longest. Informational:
+    not every member needs a benchmark.
+    """
+    files = benchmarks.discover(project_dir)
+    index: dict[str, set[str]] = defaultdict(set)
+    for path in files:
+        # Comments and strings are stripped first: every suite's header says
+        # `dart run benchmark/...`, which would credit every public `run`.
+        code = "\n".join(
+            text for _n, text, _d in symbols.code_lines(path.read_text(encoding="utf-8"))
+        )
+        for identifier in set(_IDENTIFIER_RE.findall(code)):
+            index[identifier].add(path.name)
+
+    bench_count_by_method: dict[str, int] = {}
+    uncovered: list[tuple[int, str]] = []
+    for lib_path in sorted(lib_root.rglob("*.dart")):
+        rel = lib_path.relative_to(project_dir).as_posix()
+        content = lib_path.read_text(encoding="utf-8")
+        lines_arr = content.splitlines()
+        ranges = {name: (start, end) for start, end, name in _method_ranges(content)}
+        for member in _find_public_members(lib_path):
+            if member.startswith("_"):
+                continue
+            count = len(index.get(member, ()))
+            bench_count_by_method[f"{rel}::{member}"] = count
+            if count or member not in ranges:
+                continue
+            start_line, end_line = ranges[member]
+            constructs, _ = _count_constructs_and_comments(lines_arr[start_line:end_line])
+            if constructs:
+                uncovered.append(
+                    (constructs, f"  {rel}:{start_line}  {member}  {constructs} constructs")
+                )
+
+    lines = [
+        f"Methods by number of benchmark files that reference them "
+        f"({len(files)} file(s) in {benchmarks.BENCHMARK_DIR}/, heuristic):",
+        "",
+    ]
+    lines.extend(_histogram_lines(bench_count_by_method.values(), "bench"))
+    lines.append("")
+    lines.append("Legend: red = no benchmark, yellow = 1-2, green = 3+")
+    covered = sum(1 for c in bench_count_by_method.values() if c)
+    lines.append(f"Benchmarked: {covered}/{len(bench_count_by_method)} public members.")
+    if uncovered:
+        uncovered.sort(key=lambda item: -item[0])
+        lines.append("Most complex members with no benchmark:")
+        lines.extend(detail for _constructs, detail in uncovered[:_UNBENCHMARKED_SHOWN])
+    return lines, bench_count_by_method
+
+
+# -----------------------------------------------------------------------------
+# 16. Findings by member
+# -----------------------------------------------------------------------------
+
+_WORST_MEMBERS_SHOWN = 25
+_WORST_TYPES_SHOWN = 15
+
+
+def type_ranges(content: str) -> list[tuple[int, int, str]]:
+    """(decl_line_1based, end_line_1based, name) of each top-level type body.
+
+    Uses the `symbols.code_lines` brace depth: a type opens on a depth-0 line
+    matching `_TYPE_DECL_RE` and ends on the last line inside its braces.
+    Header lines before the `{` (`implements ...` on its own line) are still
+    depth 0, so the span only closes at depth 0 once the body has been entered.
+    An unnamed `extension on T` is named after `T`.
+    """
+    ranges: list[tuple[int, int, str]] = []
+    current: tuple[int, str] | None = None
+    last_inside = 0
+    for line_no, code, depth in symbols.code_lines(content):
+        if depth > 0:
+            last_inside = line_no
+            continue
+        if current is not None and last_inside > current[0]:
+            ranges.append((current[0], last_inside, current[1]))
+            current = None
+        if current is None:
+            match = _TYPE_DECL_RE.match(code)
+            if match:
+                name = match.group(1)
+                if name == "on":
+                    target = re.match(r"\s*(?:\w+\s+)*?on\s+([\w<>?,\s]+?)\s*\{?$", code)
+                    name = f"on {target.group(1)}" if target else "extension"
+                if "{" in code and code.count("{") == code.count("}"):
+                    ranges.append((line_no, line_no, name))  # `enum E { a, b }`
+                else:
+                    current = (line_no, name)
+    if current is not None and last_inside > current[0]:
+        ranges.append((current[0], last_inside, current[1]))
+    return ranges
+
+
+def _member_and_type_ranges(content: str) -> tuple[list, list]:
+    return _method_ranges(content), type_ranges(content)
+
+
+def audit_findings_by_member(
+    project_dir: Path, findings: dict[str, list[str]]
+) -> list[str]:
+    """Rank members and types by how many findings of any category land in them.
+
+    Every detail with a `file:line` location (analyzer diagnostics, empty
+    catches, loop smells, ...) is split by `audit_history.parse_detail` and
+    attributed through a `member_index.MemberIndex`: an O(log n) interval
+    lookup per finding, with each file parsed once. Details without a location
+    (duplicate symbol names) and lines outside every member (imports, fields)
+    are counted but not ranked. Informational: it regroups existing findings.
+    """
+    index = member_index.MemberIndex(project_dir, _member_and_type_ranges)
+    by_member: dict[tuple, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    by_type: dict[tuple[str, str], dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    members_per_type: dict[tuple[str, str], set[str]] = defaultdict(set)
+    total = unlocated = outside = 0
+    for category, details in findings.items():
+        for detail in details:
+            total += 1
+            parsed = audit_history.parse_detail(category, detail)
+            location = (
+                index.locate(parsed.file, parsed.line)
+                if parsed.file and parsed.line
+                else None
+            )
+            if location is None:
+                unlocated += 1
+                continue
+            if location.owner is not None:
+                type_key = (location.file, location.owner)
+                by_type[type_key][category] += 1
+                if location.member is not None:
+                    members_per_type[type_key].add(location.member)
+            if location.member is None:
+                outside += 1
+                continue
+            key = (location.file, location.member_line, location.owner, location.member)
+            by_member[key][category] += 1
+
+    def breakdown(counts: dict[str, int]) -> str:
+        ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return ", ".join(f"{category} {n}" for category, n in ordered)
+
+    attributed = total - unlocated - outside
+    lines = [
+        f"{total} findings: {attributed} inside {len(by_member)} members, "
+        f"{outside} outside any member, {unlocated} without a resolvable location."
+    ]
+    if not by_member:
+        return lines
+    lines.append("")
+    lines.append("Worst members:")
+    ranked = sorted(by_member.items(), key=lambda item: (-sum(item[1].values()), item[0][:2]))
+    for (rel, line, owner, member), counts in ranked[:_WORST_MEMBERS_SHOWN]:
+        name = f"{owner}.{member}" if owner else member
+        lines.append(f"  {rel}:{line}  {name}  {sum(counts.values())}  ({breakdown(counts)})")
+    if by_type:
+        lines.append("")
+        lines.append("Worst types:")
+        ranked_types = sorted(by_type.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+        for (rel, owner), counts in ranked_types[:_WORST_TYPES_SHOWN]:
+            lines.append(
+                f"  {rel}  {owner}  {sum(counts.values())} across "
+                f"{len(members_per_type[(rel, owner)])} members  ({breakdown(counts)})"
+            )
+    return lines
+
+
 # -----------------------------------------------------------------------------
 # Run full audit and write report
 # -----------------------------------------------------------------------------
 
-def run_audit(project_dir: Path) -> tuple[dict[str, list[str]], Path]:
+class _CheckTimer:
+    """Wall time per audit check, for the run record in `audit_history`."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+        self._name: str | None = None
+        self._started = 0.0
+
+    def start(self, name: str) -> None:
+        """Begin timing `name`, ending the check that was running."""
+        self.stop()
+        self._name = name
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._name is not None:
+            self.timings[self._name] = time.perf_counter() - self._started
+            self._name = None
+
+
+def file_findings(label: str, content: str) -> dict[str, list[str]]:
+    """The per-file checks (sections 3, 4, 6, 12, 13, 14) on one file's text.
+
+    Keys match the `run_audit` findings categories; empty categories are
+    omitted. Needs no working tree, so `audit_backfill` runs it on blobs read
+    from git.
+    """
+    findings = {
+        "Missing doc headers": _missing_doc_headers(label, content),
+        "Sparse code comments": [detail for _n, detail in _sparse_comments(label, content)],
+        "Empty catch blocks": _empty_catches(label, content),
+        "Loop performance smells": [detail for _s, detail in _loop_smells(label, content)],
+        "Hoistable allocations": _hoistable_allocations(label, content)[0],
+        "Sequential awaits": _sequential_awaits(label, content),
+    }
+    return {category: details for category, details in findings.items() if details}
+
+
+def _head_sha(project_dir: Path) -> str | None:
+    result = run_mod.run_capture(["git", "rev-parse", "HEAD"], project_dir)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run_audit(
+    project_dir: Path, line_coverage: bool = False, warm_analysis: bool = True
+) -> tuple[dict[str, list[str]], Path]:
     """
     Run all audit checks and write report to reports/yyyymmdd/yyyymmdd_HHMMSS_publish_audit.txt.
 
+    `line_coverage` adds section 1b, which runs the test suite with
+    `--coverage` (slow, so opt-in) for measured per-method line coverage.
+    `warm_analysis` False makes section 2 use the cold `dart analyze` CLI
+    instead of the shared analysis-server session.
+
+    When the report text matches the previous audit report, no new file is
+    written and `report_path` is the earlier one.
+
     Returns (findings, report_path) where `findings` maps each category name to
     the FULL list of its detail strings (worst-first where the check ranks them).
     The caller derives the count as len() and prints the top 10 of each to the
@@ -1109,21 +1881,31 @@ def run_audit(project_dir: Path) -> tuple[dict[str, list[str]], Path]:
 
     lib_root = project_dir / "lib"
     test_root = project_dir / "test"
-    report_dir = project_dir / "reports" / datetime.now().strftime("%Y%m%d")
-    report_dir.mkdir(parents=True, exist_ok=True)
-    report_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_publish_audit.txt"
-    report_path = report_dir / report_name
 
     all_lines: list[str] = []
+    timer = _CheckTimer()
 
     # 1. Coverage / test count
-    ui.print_info("Audit 1/10: Code coverage (test count per method)...")
+    timer.start("coverage")
+    ui.print_info("Audit 1/17: Code coverage (test count per method)...")
     cov_lines, _ = audit_coverage(project_dir, lib_root, test_root)
     all_lines.extend(_section(cov_lines, "1. UNIT TEST COVERAGE (methods by test count)"))
 
+    # 1b. Measured line coverage (opt-in: runs the suite)
+    if line_coverage:
+        timer.start("line_coverage")
+        ui.print_info("Audit 1b/17: Line coverage (flutter test --coverage)...")
+        line_cov_lines, _ = audit_line_coverage(project_dir, lib_root)
+        all_lines.extend(
+            _section(line_cov_lines, "1b. LINE COVERAGE (flutter test --coverage)")
+        )
+
     # 2. Analyzer
-    ui.print_info("Audit 2/10: Dart analyzer...")
-    ana_lines, ana_errors, ana_warnings, ana_infos = audit_analyzer(project_dir)
+    timer.start("analyzer")
+    ui.print_info("Audit 2/17: Dart analyzer...")
+    ana_lines, ana_errors, ana_warnings, ana_infos = audit_analyzer(
+        project_dir, warm_analysis
+    )
     all_lines.extend(_section(ana_lines, "2. ANALYZER (error / warning / info)"))
     all_lines.append(
         f"  Total: {len(ana_errors)} errors, "
@@ -1144,18 +1926,21 @@ def run_audit(project_dir: Path) -> tuple[dict[str, list[str]], Path]:
     all_lines.append("")
 
     # 3. Doc headers
-    ui.print_info("Audit 3/10: Multiline doc headers...")
+    timer.start("doc_headers")
+    ui.print_info("Audit 3/17: Multiline doc headers...")
     doc_lines, missing_docs = audit_doc_headers(lib_root)
     all_lines.extend(_section(doc_lines, "3. MULTILINE DOC HEADERS"))
     all_lines.append("")
 
     # 4. Inline code-comment density
-    ui.print_info("Audit 4/10: Inline code comments (branches/loops/vars)...")
+    timer.start("code_comments")
+    ui.print_info("Audit 4/17: Inline code comments (branches/loops/vars)...")
     comment_lines, comment_issues = audit_code_comments(project_dir, lib_root)
     all_lines.extend(_section(comment_lines, "4. INLINE CODE COMMENTS (per method)"))
 
     # 5. Per-parameter unit test coverage
-    ui.print_info("Audit 5/10: Per-parameter unit test coverage...")
+    timer.start("param_tests")
+    ui.print_info("Audit 5/17: Per-parameter unit test coverage...")
     param_lines, param_issues = audit_param_test_coverage(
         project_dir, lib_root, test_root
     )
@@ -1164,50 +1949,67 @@ def run_audit(project_dir: Path) -> tuple[dict[str, list[str]], Path]:
     )
 
     # 6. Bad practices (empty catch)
-    ui.print_info("Audit 6/10: Bad practices (empty catch)...")
+    timer.start("empty_catch")
+    ui.print_info("Audit 6/17: Bad practices (empty catch)...")
     rec_lines, rec_issues = audit_recursion_and_bad(lib_root)
     all_lines.extend(_section(rec_lines, "6. BAD PRACTICES (empty catch)"))
 
     # 7. Try/catch
-    ui.print_info("Audit 7/10: Try/catch usage...")
+    timer.start("try_catch")
+    ui.print_info("Audit 7/17: Try/catch usage...")
     try_lines, _ = audit_try_catch(lib_root)
     all_lines.extend(_section(try_lines, "7. TRY/CATCH ERROR HANDLING (per method)"))
 
-    # 8. Duplicate Dart class names
-    ui.print_info("Audit 8/10: Duplicate Dart class names...")
-    dup_lines, dup_map = duplicate_classes.audit_duplicate_classes(project_dir)
-    all_lines.extend(_section(dup_lines, "8. DUPLICATE DART CLASS NAMES"))
+    # 8. Duplicate top-level symbols and barrel export collisions
+    timer.start("duplicate_symbols")
+    ui.print_info("Audit 8/17: Duplicate top-level symbols...")
+    package = vc.get_package_name(project_dir / "pubspec.yaml")
+    dup_lines, dup_details, collision_details = symbols.audit_duplicate_symbols(
+        project_dir, package
+    )
+    all_lines.extend(_section(dup_lines, "8. DUPLICATE TOP-LEVEL SYMBOLS"))
 
     # 9. Other quality
-    ui.print_info("Audit 9/10: Other quality checks...")
+    timer.start("other_quality")
+    ui.print_info("Audit 9/17: Other quality checks...")
     other_lines = audit_other_quality(project_dir, lib_root)
     all_lines.extend(_section(other_lines, "9. OTHER QUALITY CHECKS"))
 
-    # 10. Summary and recommendations
-    ui.print_info("Audit 10/10: Summary...")
-    summary = [
-        "Recommendations:",
-        "  - Fix all analyzer errors before publishing.",
-        "  - Consider fixing analyzer warnings and adding docs for methods with 0-1 tests.",
-        "  - Add inline comments to flagged branch/loop/variable-heavy methods.",
-        "  - Add tests for any public method with parameters that none reference.",
-        "  - Review methods with try/catch for proper error handling.",
-        "  - Fix any empty-catch blocks (silently swallowed errors).",
-        "  - Address file length if policy requires.",
-    ]
-    all_lines.extend(_section(summary, "10. SUMMARY & RECOMMENDATIONS"))
-
-    report_path.write_text("\n".join(all_lines), encoding="utf-8")
-    ui.print_success(f"Audit report written to {report_path}")
-
-    # Duplicate class names as ranked detail strings (most occurrences first) so
-    # the caller can show the worst 10 alongside the other categories.
-    dup_details = [
-        f"  {name}  (in: {', '.join(files)})"
-        for name, files in sorted(
-            dup_map.items(), key=lambda item: (-len(item[1]), item[0])
-        )
-    ]
+    # 10. Hotspots
+    timer.start("hotspots")
+    ui.print_info("Audit 10/17: Hotspots (churn x complexity)...")
+    hot_lines, _ = audit_hotspots(project_dir, lib_root)
+    all_lines.extend(_section(hot_lines, "10. HOTSPOTS (churn x complexity)"))
+
+    # 11. Near-duplicate methods
+    timer.start("clones")
+    ui.print_info("Audit 11/17: Near-duplicate methods...")
+    clone_lines, _ = audit_clones(project_dir, lib_root)
+    all_lines.extend(_section(clone_lines, "11. NEAR-DUPLICATE METHODS (clone groups)"))
+
+    # 12. Loop performance smells
+    timer.start("loop_smells")
+    ui.print_info("Audit 12/17: Loop performance smells...")
+    smell_lines, smell_issues = audit_loop_smells(project_dir, lib_root)
+    all_lines.extend(_section(smell_lines, "12. LOOP PERFORMANCE SMELLS"))
+
+    # 13. Per-call allocations
+    timer.start("allocations")
+    ui.print_info("Audit 13/17: Per-call allocations of expensive objects...")
+    alloc_lines, alloc_issues = audit_allocations(project_dir, lib_root)
+    all_lines.extend(_section(alloc_lines, "13. PER-CALL ALLOCATIONS (hoistable)"))
+
+    # 14. Sequential awaits
+    timer.start("sequential_awaits")
+    ui.print_info("Audit 14/17: Sequential awaits...")
+    await_lines, await_issues = audit_sequential_awaits(project_dir, lib_root)
+    all_lines.extend(_section(await_lines, "14. SEQUENTIAL AWAITS"))
+
+    # 15. Benchmark coverage
+    timer.start("benchmark_coverage")
+    ui.print_info("Audit 15/17: Benchmark coverage...")
+    bench_lines, _ = audit_benchmark_coverage(project_dir, lib_root)
+    all_lines.extend(_section(bench_lines, "15. BENCHMARK COVERAGE (methods by benchmark count)"))
 
     # Build per-category findings for the caller. Each value is the full detail
     # list (already worst-first where the check ranks); the caller shows top 10.
@@ -1227,6 +2029,73 @@ def run_audit(project_dir: Path) -> tuple[dict[str, list[str]], Path]:
     if rec_issues:
         findings["Empty catch blocks"] = rec_issues
     if dup_details:
-        findings["Duplicate class names"] = dup_details
+        findings["Duplicate symbol names"] = dup_details
+    if collision_details:
+        findings["Barrel export collisions"] = collision_details
+    if smell_issues:
+        findings["Loop performance smells"] = smell_issues
+    if alloc_issues:
+        findings["Hoistable allocations"] = alloc_issues
+    if await_issues:
+        findings["Sequential awaits"] = await_issues
+
+    # 16. Findings by member (regroups the findings above)
+    timer.start("findings_by_member")
+    ui.print_info("Audit 16/17: Findings by member...")
+    member_lines = audit_findings_by_member(project_dir, findings)
+    all_lines.extend(_section(member_lines, "16. FINDINGS BY MEMBER (worst first)"))
+
+    timer.stop()
+
+    # 17. Summary and recommendations
+    ui.print_info("Audit 17/17: Summary...")
+    summary = [
+        "Recommendations:",
+        "  - Fix all analyzer errors before publishing.",
+        "  - Consider fixing analyzer warnings and adding docs for methods with 0-1 tests.",
+        "  - Add inline comments to flagged branch/loop/variable-heavy methods.",
+        "  - Add tests for any public method with parameters that none reference.",
+        "  - Review methods with try/catch for proper error handling.",
+        "  - Fix any empty-catch blocks (silently swallowed errors).",
+        "  - Address file length if policy requires.",
+        "  - Review and simplify the top hotspots before optimizing elsewhere.",
+        "  - Fold the largest clone groups into one shared helper where the copies are accidental.",
+        "  - Replace in-loop List scans and String += with a Set/Map and a StringBuffer.",
+        "  - Hoist constant RegExp/DateFormat/NumberFormat objects out of method bodies.",
+        "  - Start independent awaits together (Future.wait / record .wait).",
+        "  - Add benchmarks for the most complex unbenchmarked members.",
+        "  - Start fixes with the worst members: one pass there clears several findings.",
+    ]
+    all_lines.extend(_section(summary, "17. SUMMARY & RECOMMENDATIONS"))
+
+    # The store skips the write when this report repeats the previous one
+    # (e.g. a retry with nothing fixed), then applies the retention policy.
+    reports_root = project_dir / "reports"
+    try:
+        version = vc.get_version_from_pubspec(project_dir / "pubspec.yaml")
+    except (OSError, ValueError):
+        version = None
+    report_path, written = report_store.write_report(
+        reports_root, "publish_audit", "\n".join(all_lines), version=version
+    )
+    if written:
+        ui.print_success(f"Audit report written to {report_path}")
+    else:
+        ui.print_info(f"Audit report unchanged since last run: {report_path}")
+    report_store.maintain(reports_root)
+
+    # Every run (retries included) goes into the history database, so trends
+    # and "new since last release" are queries rather than report parsing.
+    try:
+        audit_history.record_run(
+            project_dir,
+            findings,
+            timer.timings,
+            version=version,
+            git_sha=_head_sha(project_dir),
+            report_path=report_path,
+        )
+    except sqlite3.Error as e:
+        ui.print_warning(f"Could not record audit history: {e}")
 
     return findings, report_path
@@ -0,0 +1,180 @@
+"""Audit totals for every release tag, read from git objects.
+
+Audit history only starts when someone first runs the audit. This backfills
+it: every `v*` tag's `lib/**/*.dart` blobs are listed with `ls-tree` and read
+through one `git cat-file --batch` pipe (`api_diff.BlobReader`, no checkout),
+and the per-file checks (`audit.file_findings`: doc headers, comment density,
+empty catches, loop smells, hoistable allocations, sequential awaits) plus
+size counts run on each blob.
+
+Work is keyed by blob SHA, not by tag: a file unchanged across 50 tags is one
+blob and is analyzed once. Per-blob counts are cached in
+reports/_cache/audit_backfill.json, invalidated when the checks' source
+changes, so a later backfill only analyzes blobs from new tags. Uncached blobs
+are spread over a process pool (the checks are pure-Python regex work, so
+threads would serialize on the GIL). Per-tag totals are sums over the tag's
+blobs.
+
+Checks that need more than one file's text (analyzer, test coverage,
+duplicate symbols, hotspots, clones, benchmark coverage) are not backfilled.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import subprocess
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import api_diff
+from . import atomic_file
+from . import audit
+
+CACHE_RELATIVE_PATH = Path("reports") / "_cache" / "audit_backfill.json"
+# Size columns first, then the audit categories in `audit.file_findings` order.
+SIZE_COLUMNS = ("files", "lines", "public_symbols")
+CATEGORIES = (
+    "Missing doc headers",
+    "Sparse code comments",
+    "Empty catch blocks",
+    "Loop performance smells",
+    "Hoistable allocations",
+    "Sequential awaits",
+)
+# Blobs handed to a worker per task; large enough to amortize pickling.
+_CHUNK = 32
+
+
+@dataclass(frozen=True)
+class TagTotals:
+    """Summed per-file counts for one release tag."""
+
+    tag: str
+    date: str
+    counts: dict[str, int]
+
+
+def release_tags(repo: Path, pattern: str = "v*") -> list[tuple[str, str]]:
+    """(tag, YYYY-MM-DD) for tags matching `pattern`, oldest first."""
+    result = subprocess.run(
+        [
+            "git",
+            "for-each-ref",
+            "--sort=creatordate",
+            "--format=%(refname:short)%09%(creatordate:short)",
+            f"refs/tags/{pattern}",
+        ],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return []
+    tags = []
+    for line in result.stdout.splitlines():
+        tag, _, day = line.partition("\t")
+        if tag:
+            tags.append((tag, day))
+    return tags
+
+
+def checks_key() -> str:
+    """Digest of the check sources; a change invalidates every cached blob."""
+    digest = hashlib.sha256()
+    modules_dir = Path(__file__).resolve().parent
+    for name in ("audit.py", "perf_smells.py", "symbols.py", "audit_backfill.py"):
+        digest.update((modules_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+def blob_counts(path: str, content: bytes) -> dict[str, int]:
+    """Size and per-category finding counts for one blob."""
+    text = content.decode("utf-8", errors="replace")
+    counts = {
+        "files": 1,
+        "lines": len(text.splitlines()),
+        "public_symbols": len(audit.public_declarations(text)),
+    }
+    for category, details in audit.file_findings(path, text).items():
+        counts[category] = len(details)
+    return counts
+
+
+def _analyze_chunk(items: list[tuple[str, str, bytes]]) -> list[tuple[str, dict[str, int]]]:
+    """Process-pool task: (sha, counts) for each (sha, path, content)."""
+    return [(sha, blob_counts(path, content)) for sha, path, content in items]
+
+
+def _load_cache(path: Path, key: str) -> dict[str, dict[str, int]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("blobs", {}) if data.get("key") == key else {}
+
+
+def _save_cache(path: Path, key: str, blobs: dict[str, dict[str, int]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_file.write_text(path, json.dumps({"key": key, "blobs": blobs}, separators=(",", ":")))
+
+
+def backfill(
+    repo: Path, tags: list[tuple[str, str]], jobs: int | None = None
+) -> tuple[list[TagTotals], int]:
+    """Totals per tag, and how many blobs had to be analyzed (cache misses)."""
+    trees = {}
+    for tag, _day in tags:
+        blobs = api_diff.dart_blobs(repo, tag)
+        if blobs is not None:
+            trees[tag] = blobs
+
+    key = checks_key()
+    cache_path = repo / CACHE_RELATIVE_PATH
+    cache = _load_cache(cache_path, key)
+    # One path per missing SHA is enough: details are counted, not shown.
+    missing: dict[str, str] = {}
+    for blobs in trees.values():
+        for path, sha in blobs.items():
+            if sha not in cache:
+                missing.setdefault(sha, path)
+
+    if missing:
+        items: list[tuple[str, str, bytes]] = []
+        with api_diff.BlobReader(repo) as reader:
+            for sha, content in reader.read_many(sorted(missing)):
+                if content is not None:
+                    items.append((sha, missing[sha], content))
+        chunks = [items[i : i + _CHUNK] for i in range(0, len(items), _CHUNK)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for results in pool.map(_analyze_chunk, chunks):
+                cache.update(results)
+        _save_cache(cache_path, key, cache)
+
+    totals = []
+    for tag, day in tags:
+        if tag not in trees:
+            continue
+        summed: Counter = Counter()
+        for sha in trees[tag].values():
+            summed.update(cache.get(sha, {}))
+        totals.append(TagTotals(tag=tag, date=day, counts=dict(summed)))
+    return totals, len(missing)
+
+
+def columns() -> list[str]:
+    """CSV / table columns after tag and date."""
+    return [*SIZE_COLUMNS, *CATEGORIES]
+
+
+def write_csv(path: Path, totals: list[TagTotals]) -> None:
+    """One row per tag: tag, date, size columns, then category counts."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["tag", "date", *columns()])
+        for row in totals:
+            writer.writerow([row.tag, row.date, *(row.counts.get(c, 0) for c in columns())])
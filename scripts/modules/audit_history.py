@@ -0,0 +1,398 @@
+"""SQLite history of every audit run, for trend / first-seen / fixed-in queries.
+
+The text reports are for reading; answering "when did sparse-comment findings
+start rising" from them means regex-parsing every report ever written. Each
+`run_audit` call also records its findings here, normalized so the common
+questions are indexed lookups:
+
+    runs          one row per audit run: time, package version, git SHA,
+                  report path, total finding count
+    run_checks    per-check wall time for a run
+    categories    finding category names ("Missing doc headers", ...)
+    files         repo-relative file paths
+    members       (file, member name) pairs
+    finding_keys  one row per distinct finding identity: category + file +
+                  member + the detail text with numbers masked, so a finding
+                  that merely moved lines or changed a count keeps its identity
+    findings      (run, finding key, line, detail) occurrences
+
+The database lives at reports/_cache/audit_history.sqlite3, which the report
+organizer and retention pass leave alone.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import subprocess
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from . import sqlite_db
+
+DB_RELATIVE_PATH = Path("reports") / "_cache" / "audit_history.sqlite3"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    version TEXT,
+    git_sha TEXT,
+    report_path TEXT,
+    total_findings INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_version ON runs(version);
+CREATE INDEX IF NOT EXISTS runs_git_sha ON runs(git_sha);
+
+CREATE TABLE IF NOT EXISTS run_checks (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    check_name TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (run_id, check_name)
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER REFERENCES files(id),
+    name TEXT NOT NULL,
+    UNIQUE (file_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS finding_keys (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    file_id INTEGER REFERENCES files(id),
+    member_id INTEGER REFERENCES members(id),
+    key TEXT NOT NULL,
+    UNIQUE (category_id, key)
+);
+CREATE INDEX IF NOT EXISTS finding_keys_file ON finding_keys(file_id);
+CREATE INDEX IF NOT EXISTS finding_keys_member ON finding_keys(member_id);
+
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    key_id INTEGER NOT NULL REFERENCES finding_keys(id),
+    line INTEGER,
+    detail TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_run ON findings(run_id, key_id);
+CREATE INDEX IF NOT EXISTS findings_key ON findings(key_id, run_id);
+"""
+
+# "  lib/x.dart:12  rest" — the leading location every per-member check uses.
+_LOCATED_DETAIL_RE = re.compile(r"^\s*(?P<file>[^\s:]+\.dart):(?P<line>\d+)\s+(?P<rest>.*)$")
+# "  Name  (in: a.dart, b.dart)" — the duplicate-definition shape.
+_NAMED_DETAIL_RE = re.compile(r"^\s*(?P<member>[A-Za-z_$][\w$]*)\s+\(")
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_$][\w$]*")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+@dataclass(frozen=True)
+class ParsedFinding:
+    """One detail string split into its indexed parts."""
+
+    file: str | None
+    line: int | None
+    member: str | None
+    key: str
+    detail: str
+
+
+def parse_detail(category: str, detail: str) -> ParsedFinding:
+    """Split an audit detail string into file, line, member and identity key.
+
+    The key masks every number so a finding keeps its identity when code above
+    it moves or a count in its message changes ("5 constructs, 1 comments").
+    Analyzer details carry a diagnostic code where other checks carry a member
+    name, so they get no member.
+    """
+    text = detail.strip()
+    file = member = None
+    line = None
+    located = _LOCATED_DETAIL_RE.match(detail)
+    if located:
+        file = located.group("file").replace("\\", "/")
+        line = int(located.group("line"))
+        rest = located.group("rest")
+        if not category.startswith("Analyzer"):
+            ident = _IDENTIFIER_RE.match(rest)
+            member = ident.group(0) if ident else None
+        key = f"{file}|{_NUMBER_RE.sub('#', rest)}"
+    else:
+        named = _NAMED_DETAIL_RE.match(detail)
+        if named:
+            member = named.group("member")
+        key = _NUMBER_RE.sub("#", text)
+    return ParsedFinding(file=file, line=line, member=member, key=key, detail=text)
+
+
+def db_path(project_dir: Path) -> Path:
+    return project_dir / DB_RELATIVE_PATH
+
+
+def connect(project_dir: Path) -> AbstractContextManager[sqlite3.Connection]:
+    """Open (creating if needed) the history database; commits on success."""
+    return sqlite_db.connect(db_path(project_dir), _SCHEMA, SCHEMA_VERSION, wal=True)
+
+
+def _intern(conn: sqlite3.Connection, sql_select: str, sql_insert: str, args: tuple) -> int:
+    """Id of an existing lookup row, inserting it first when missing."""
+    row = conn.execute(sql_select, args).fetchone()
+    if row:
+        return row[0]
+    return conn.execute(sql_insert, args).lastrowid
+
+
+def record_run(
+    project_dir: Path,
+    findings: dict[str, list[str]],
+    timings: dict[str, float],
+    version: str | None,
+    git_sha: str | None,
+    report_path: Path | None,
+) -> int:
+    """Store one audit run and its findings; returns the new run id."""
+    with connect(project_dir) as conn:
+        run_id = conn.execute(
+            "INSERT INTO runs (started_at, version, git_sha, report_path, total_findings)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                datetime.now().isoformat(timespec="seconds"),
+                version,
+                git_sha,
+                str(report_path) if report_path else None,
+                sum(len(items) for items in findings.values()),
+            ),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO run_checks (run_id, check_name, seconds) VALUES (?, ?, ?)",
+            [(run_id, name, seconds) for name, seconds in timings.items()],
+        )
+        # Lookup ids are memoized per run: a category or file repeats across
+        # hundreds of findings, and each miss would be a SELECT round-trip.
+        file_ids: dict[str, int] = {}
+        member_ids: dict[tuple[int | None, str], int] = {}
+        rows = []
+        for category, items in findings.items():
+            category_id = _intern(
+                conn,
+                "SELECT id FROM categories WHERE name = ?",
+                "INSERT INTO categories (name) VALUES (?)",
+                (category,),
+            )
+            for detail in items:
+                parsed = parse_detail(category, detail)
+                file_id = None
+                if parsed.file is not None:
+                    if parsed.file not in file_ids:
+                        file_ids[parsed.file] = _intern(
+                            conn,
+                            "SELECT id FROM files WHERE path = ?",
+                            "INSERT INTO files (path) VALUES (?)",
+                            (parsed.file,),
+                        )
+                    file_id = file_ids[parsed.file]
+                member_id = None
+                if parsed.member is not None:
+                    member_key = (file_id, parsed.member)
+                    if member_key not in member_ids:
+                        member_ids[member_key] = _intern(
+                            conn,
+                            "SELECT id FROM members WHERE file_id IS ? AND name = ?",
+                            "INSERT INTO members (file_id, name) VALUES (?, ?)",
+                            member_key,
+                        )
+                    member_id = member_ids[member_key]
+                row = conn.execute(
+                    "SELECT id FROM finding_keys WHERE category_id = ? AND key = ?",
+                    (category_id, parsed.key),
+                ).fetchone()
+                key_id = (
+                    row[0]
+                    if row
+                    else conn.execute(
+                        "INSERT INTO finding_keys (category_id, file_id, member_id, key)"
+                        " VALUES (?, ?, ?, ?)",
+                        (category_id, file_id, member_id, parsed.key),
+                    ).lastrowid
+                )
+                rows.append((run_id, key_id, parsed.line, parsed.detail))
+        conn.executemany(
+            "INSERT INTO findings (run_id, key_id, line, detail) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+    return run_id
+
+
+def trend(
+    conn: sqlite3.Connection, category: str | None = None, limit: int = 20
+) -> list[tuple]:
+    """(run id, started_at, version, git_sha, category, count) for recent runs.
+
+    With `category`, every run gets exactly one row (count 0 included), so the
+    series has no gaps. Without it, each run lists the categories it had; a
+    clean run appears once with category None and count 0.
+    """
+    if category is not None:
+        return conn.execute(
+            """
+            SELECT r.id, r.started_at, r.version, r.git_sha, ?, (
+                SELECT COUNT(*)
+                FROM findings AS f
+                JOIN finding_keys AS k ON k.id = f.key_id
+                JOIN categories AS c ON c.id = k.category_id
+                WHERE f.run_id = r.id AND c.name = ?
+            )
+            FROM (SELECT * FROM runs ORDER BY id DESC LIMIT ?) AS r
+            ORDER BY r.id
+            """,
+            (category, category, limit),
+        ).fetchall()
+    return conn.execute(
+        """
+        SELECT r.id, r.started_at, r.version, r.git_sha, c.name, COUNT(f.key_id)
+        FROM (SELECT * FROM runs ORDER BY id DESC LIMIT ?) AS r
+        LEFT JOIN findings AS f ON f.run_id = r.id
+        LEFT JOIN finding_keys AS k ON k.id = f.key_id
+        LEFT JOIN categories AS c ON c.id = k.category_id
+        GROUP BY r.id, c.name
+        ORDER BY r.id, c.name
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def first_seen(conn: sqlite3.Connection, pattern: str) -> list[tuple]:
+    """(category, key, first run id, started_at, version) for matching keys.
+
+    `pattern` is a SQL LIKE pattern matched against the finding key, which is
+    the file path plus the detail text with numbers masked as "#".
+    """
+    return conn.execute(
+        """
+        SELECT c.name, k.key, r.id, r.started_at, r.version
+        FROM finding_keys AS k
+        JOIN categories AS c ON c.id = k.category_id
+        JOIN runs AS r ON r.id = (
+            SELECT MIN(run_id) FROM findings WHERE key_id = k.id
+        )
+        WHERE k.key LIKE ?
+        ORDER BY r.id, c.name, k.key
+        """,
+        (pattern,),
+    ).fetchall()
+
+
+def fixed_in(conn: sqlite3.Connection, pattern: str) -> list[tuple]:
+    """(category, key, last seen run id, fixed run id, fixed started_at, version).
+
+    A finding is fixed in the first run after its last appearance; findings
+    still present in the latest run are left out.
+    """
+    return conn.execute(
+        """
+        SELECT c.name, k.key, last.run_id, r.id, r.started_at, r.version
+        FROM finding_keys AS k
+        JOIN categories AS c ON c.id = k.category_id
+        JOIN (
+            SELECT key_id, MAX(run_id) AS run_id FROM findings GROUP BY key_id
+        ) AS last ON last.key_id = k.id
+        JOIN runs AS r ON r.id = (
+            SELECT MIN(id) FROM runs WHERE id > last.run_id
+        )
+        WHERE k.key LIKE ?
+        ORDER BY r.id, c.name, k.key
+        """,
+        (pattern,),
+    ).fetchall()
+
+
+def release_baseline(conn: sqlite3.Connection, project_dir: Path, version: str) -> int | None:
+    """Id of the run that stands for release `version`, or None.
+
+    pubspec keeps the last released version during development, so every dev
+    run is recorded under it and "the last run at that version" is simply the
+    latest run. The baseline is therefore tied to the release commit
+    (`v{version}^{commit}`): the last run at exactly that commit, else the last
+    run at one of its ancestors. None when the tag or such a run is missing.
+    """
+    tag = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"v{version}^{{commit}}"],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    if tag.returncode != 0:
+        return None
+    tag_sha = tag.stdout.strip()
+    exact = conn.execute("SELECT MAX(id) FROM runs WHERE git_sha = ?", (tag_sha,)).fetchone()[0]
+    if exact is not None:
+        return exact
+    ancestors = subprocess.run(
+        ["git", "rev-list", tag_sha], cwd=project_dir, capture_output=True, text=True
+    )
+    reachable = set(ancestors.stdout.split()) if ancestors.returncode == 0 else set()
+    for run_id, sha in conn.execute(
+        "SELECT id, git_sha FROM runs WHERE git_sha IS NOT NULL ORDER BY id DESC"
+    ):
+        if sha in reachable:
+            return run_id
+    return None
+
+
+def new_since_version(
+    conn: sqlite3.Connection, project_dir: Path, version: str
+) -> list[tuple] | None:
+    """(category, detail) findings in the latest run absent from release `version`.
+
+    The baseline comes from `release_baseline`. Returns None when there is no
+    baseline, so a caller gating a release can tell "nothing new" from
+    "nothing to compare against".
+    """
+    baseline = release_baseline(conn, project_dir, version)
+    if baseline is None:
+        return None
+    latest = conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+    if latest == baseline:
+        return []
+    return conn.execute(
+        """
+        SELECT c.name, f.detail
+        FROM findings AS f
+        JOIN finding_keys AS k ON k.id = f.key_id
+        JOIN categories AS c ON c.id = k.category_id
+        WHERE f.run_id = ?
+          AND NOT EXISTS (
+              SELECT 1 FROM findings AS b WHERE b.run_id = ? AND b.key_id = f.key_id
+          )
+        ORDER BY c.name, f.detail
+        """,
+        (latest, baseline),
+    ).fetchall()
+
+
+def check_timings(conn: sqlite3.Connection, limit: int = 10) -> list[tuple]:
+    """(check name, average seconds, max seconds) over the last `limit` runs."""
+    return conn.execute(
+        """
+        SELECT check_name, AVG(seconds), MAX(seconds)
+        FROM run_checks
+        WHERE run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+        GROUP BY check_name
+        ORDER BY AVG(seconds) DESC
+        """,
+        (limit,),
+    ).fetchall()
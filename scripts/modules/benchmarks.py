@@ -0,0 +1,405 @@
+"""Dart micro-benchmark runner, version-keyed baselines and regression test.
+
+Benchmarks live in benchmark/*_benchmark.dart and use benchmark/harness.dart,
+which prints one JSON line per case with its per-call timing samples. This
+module runs each file (`dart run`, or a `dart compile exe` build for steadier
+numbers), parses those lines as they stream in, and compares the samples to a
+stored baseline.
+
+Baselines are kept in benchmark/baselines.json, keyed by package version, so
+they are committed alongside the code they measure. Each entry records the
+compile mode (jit/aot), machine and Dart SDK it was taken on. Only baselines
+of the run's own mode are compared against: JIT and AOT timings differ by
+more than any regression worth catching. Timings also only compare
+meaningfully on the same hardware, so on another machine the comparison is
+reported but not trusted as a verdict (`same_machine`).
+
+A case regresses when a one-sided Mann-Whitney U test says its samples are
+slower than the baseline's (p < alpha) AND the median slowed by more than
+`min_change`. The rank test is robust to the odd GC-pause outlier that would
+skew a t-test; the effect-size floor stops a real but trivial 1% shift from
+blocking a release.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import re
+import statistics
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from . import atomic_file
+from . import run as run_mod
+
+BENCHMARK_DIR = "benchmark"
+BASELINE_FILE = "baselines.json"
+BASELINE_FORMAT = 1
+FILE_SUFFIX = "_benchmark.dart"
+
+WARMUP = 5
+SAMPLES = 20
+# Significance level of the rank test and the smallest median change that
+# counts, as a fraction (0.05 = 5% slower).
+ALPHA = 0.01
+MIN_CHANGE = 0.05
+
+# A JSON list of numbers, for keeping each sample list on one line.
+_NUMBER_LIST_RE = re.compile(r"\[\s*(-?[\d.eE+-]+(?:,\s*-?[\d.eE+-]+)*)\s*\]")
+
+
+@dataclass
+class BenchmarkResult:
+    """Samples of one benchmark case, in microseconds per call."""
+
+    name: str  # "<file stem>.<case>", e.g. "caching.lru_get_hit"
+    unit: str
+    iterations: int
+    samples: list[float]
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+
+@dataclass
+class Comparison:
+    """One case measured against its baseline."""
+
+    name: str
+    baseline_median: float | None
+    current_median: float | None
+    p_slower: float | None = None
+    p_faster: float | None = None
+    verdict: str = "unchanged"  # regression | improvement | unchanged | new | missing
+
+    @property
+    def change(self) -> float | None:
+        """Relative median change (+0.10 = 10% slower)."""
+        if not self.baseline_median or self.current_median is None:
+            return None
+        return self.current_median / self.baseline_median - 1
+
+
+def discover(project_dir: Path, only: list[str] | None = None) -> list[Path]:
+    """Benchmark entry points, optionally limited to the given file stems."""
+    root = project_dir / BENCHMARK_DIR
+    if not root.is_dir():
+        return []
+    files = sorted(root.glob(f"*{FILE_SUFFIX}"))
+    if only:
+        # Accept "caching", "caching_benchmark" or a path to the .dart file.
+        wanted = {
+            Path(name).name.removesuffix(".dart").removesuffix("_benchmark")
+            for name in only
+        }
+        files = [p for p in files if _stem(p) in wanted]
+    return files
+
+
+def _stem(path: Path) -> str:
+    return path.name.removesuffix(FILE_SUFFIX)
+
+
+def _compile(project_dir: Path, path: Path, out_dir: Path) -> Path | None:
+    """AOT-compile one benchmark; returns the executable or None on failure."""
+    exe = out_dir / (_stem(path) + (".exe" if os.name == "nt" else ""))
+    result = run_mod.run_capture(
+        ["dart", "compile", "exe", str(path), "-o", str(exe)], project_dir
+    )
+    return exe if result.returncode == 0 else None
+
+
+def run_file(
+    project_dir: Path,
+    path: Path,
+    warmup: int = WARMUP,
+    samples: int = SAMPLES,
+    case_filter: str | None = None,
+    executable: Path | None = None,
+    on_result: Callable[[BenchmarkResult], None] | None = None,
+) -> tuple[list[BenchmarkResult], run_mod.StreamResult]:
+    """Run one benchmark file and collect its results as they are printed.
+
+    Lines that are not harness JSON (compiler progress, a stack trace) only
+    end up in the returned stream tail, for error display.
+    """
+    cmd = [str(executable)] if executable else ["dart", "run", str(path)]
+    cmd += ["--warmup", str(warmup), "--samples", str(samples)]
+    if case_filter:
+        cmd += ["--filter", case_filter]
+    stem = _stem(path)
+    results: list[BenchmarkResult] = []
+
+    def on_line(line: str) -> None:
+        if not line.startswith("{"):
+            return
+        try:
+            data = json.loads(line)
+            result = BenchmarkResult(
+                name=f"{stem}.{data['name']}",
+                unit=data.get("unit", "us"),
+                iterations=int(data["iterations"]),
+                samples=[float(s) for s in data["samples"]],
+            )
+        except (ValueError, KeyError, TypeError):
+            return
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    stream = run_mod.run_streaming(cmd, project_dir, on_line)
+    return results, stream
+
+
+def run_all(
+    project_dir: Path,
+    files: list[Path],
+    warmup: int = WARMUP,
+    samples: int = SAMPLES,
+    case_filter: str | None = None,
+    aot: bool = False,
+    on_result: Callable[[BenchmarkResult], None] | None = None,
+) -> tuple[list[BenchmarkResult], list[tuple[Path, list[str]]]]:
+    """Run every file in turn. Returns (results, [(file, error tail)])."""
+    results: list[BenchmarkResult] = []
+    failures: list[tuple[Path, list[str]]] = []
+    # Files run one after another on purpose: parallel runs would compete for
+    # the same cores and skew each other's timings.
+    with tempfile.TemporaryDirectory(prefix="saropa_bench_") as tmp:
+        for path in files:
+            executable = None
+            if aot:
+                executable = _compile(project_dir, path, Path(tmp))
+                if executable is None:
+                    failures.append((path, ["dart compile exe failed"]))
+                    continue
+            file_results, stream = run_file(
+                project_dir, path, warmup, samples, case_filter, executable, on_result
+            )
+            if stream.returncode != 0:
+                failures.append((path, stream.tail))
+            results.extend(file_results)
+    return results, failures
+
+
+# -----------------------------------------------------------------------------
+# Baselines
+# -----------------------------------------------------------------------------
+
+
+def baseline_path(project_dir: Path) -> Path:
+    return project_dir / BENCHMARK_DIR / BASELINE_FILE
+
+
+def machine_id() -> str:
+    """Identifies the hardware/OS a baseline was taken on."""
+    return f"{platform.system()} {platform.machine()} {os.cpu_count()} cpu"
+
+
+def same_machine(entry: dict) -> bool:
+    """True when a baseline entry was recorded on this machine."""
+    return entry.get("machine") == machine_id()
+
+
+def dart_version(project_dir: Path) -> str | None:
+    try:
+        result = run_mod.run_capture(["dart", "--version"], project_dir)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    text = (result.stdout or result.stderr).strip()
+    return text.splitlines()[0] if text else None
+
+
+def load_baselines(project_dir: Path) -> dict[str, dict]:
+    """Version -> baseline entry, or {} when there is no (readable) store."""
+    try:
+        data = json.loads(baseline_path(project_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != BASELINE_FORMAT:
+        return {}
+    return data.get("baselines", {})
+
+
+def save_baseline(
+    project_dir: Path,
+    version: str,
+    results: list[BenchmarkResult],
+    mode: str,
+) -> Path:
+    """Record `results` as the baseline for `version`, replacing any earlier one.
+
+    Cases not re-run this time (a `--filter` run) keep their previous samples
+    when those were taken in the same `mode`.
+    """
+    baselines = load_baselines(project_dir)
+    earlier = baselines.get(version, {})
+    previous = earlier.get("results", {}) if earlier.get("mode") == mode else {}
+    merged = dict(previous)
+    for result in results:
+        merged[result.name] = {
+            "unit": result.unit,
+            "iterations": result.iterations,
+            "samples": [round(s, 4) for s in result.samples],
+        }
+    baselines[version] = {
+        "recorded": datetime.now().isoformat(timespec="seconds"),
+        "mode": mode,
+        "machine": machine_id(),
+        "dart": dart_version(project_dir),
+        "results": dict(sorted(merged.items())),
+    }
+    path = baseline_path(project_dir)
+    text = json.dumps({"format": BASELINE_FORMAT, "baselines": baselines}, indent=1)
+    # One line per sample list keeps the committed file short and its diffs
+    # readable (indent alone puts every sample on its own line).
+    text = _NUMBER_LIST_RE.sub(
+        lambda m: "[" + ", ".join(v.strip() for v in m.group(1).split(",")) + "]", text
+    )
+    atomic_file.write_text(path, text + "\n")
+    return path
+
+
+def select_baseline(
+    baselines: dict[str, dict],
+    version: str | None = None,
+    current: str | None = None,
+    mode: str | None = None,
+) -> tuple[str, dict] | None:
+    """The baseline to compare against.
+
+    With `mode`, only entries recorded in that mode ("jit"/"aot") qualify. An
+    explicit `version` wins. Otherwise the most recently recorded entry for
+    a version other than `current` (the release being cut is measured against
+    the last one), falling back to `current`'s own entry.
+    """
+    if mode is not None:
+        baselines = {v: e for v, e in baselines.items() if e.get("mode") == mode}
+    if version is not None:
+        entry = baselines.get(version)
+        return (version, entry) if entry else None
+    others = [(v, e) for v, e in baselines.items() if v != current]
+    if others:
+        return max(others, key=lambda item: item[1].get("recorded", ""))
+    if current in baselines:
+        return current, baselines[current]
+    return None
+
+
+# -----------------------------------------------------------------------------
+# Comparison
+# -----------------------------------------------------------------------------
+
+
+def mann_whitney(baseline: list[float], current: list[float]) -> tuple[float, float]:
+    """One-sided Mann-Whitney U p-values: (current slower, current faster).
+
+    Uses the normal approximation with tie correction and continuity
+    correction, which is accurate for the 10+ samples per side the runner
+    collects.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        return 1.0, 1.0
+    pooled = sorted([(v, 0) for v in baseline] + [(v, 1) for v in current])
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        # Tied values share the average of the ranks they span (1-based).
+        rank = (i + j) / 2 + 1
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if pooled[k][1] == 1)
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        i = j + 1
+    u_current = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0, 1.0
+    sd = math.sqrt(variance)
+    z_slower = (u_current - mean - 0.5) / sd
+    z_faster = (mean - u_current - 0.5) / sd
+    return (
+        0.5 * math.erfc(z_slower / math.sqrt(2)),
+        0.5 * math.erfc(z_faster / math.sqrt(2)),
+    )
+
+
+def compare(
+    baseline: dict,
+    results: list[BenchmarkResult],
+    alpha: float = ALPHA,
+    min_change: float = MIN_CHANGE,
+    report_missing: bool = True,
+) -> list[Comparison]:
+    """Compare `results` to a baseline entry; regressions first.
+
+    Baseline cases absent from `results` are listed as "missing" unless
+    `report_missing` is off (a run limited to some files or cases).
+    """
+    stored: dict[str, dict] = baseline.get("results", {})
+    comparisons: list[Comparison] = []
+    seen: set[str] = set()
+    for result in results:
+        seen.add(result.name)
+        entry = stored.get(result.name)
+        if entry is None:
+            comparisons.append(Comparison(result.name, None, result.median, verdict="new"))
+            continue
+        base_samples = [float(s) for s in entry.get("samples", [])]
+        p_slower, p_faster = mann_whitney(base_samples, result.samples)
+        comparison = Comparison(
+            result.name,
+            statistics.median(base_samples) if base_samples else None,
+            result.median,
+            p_slower,
+            p_faster,
+        )
+        change = comparison.change
+        if change is not None:
+            if p_slower < alpha and change > min_change:
+                comparison.verdict = "regression"
+            elif p_faster < alpha and change < -min_change:
+                comparison.verdict = "improvement"
+        comparisons.append(comparison)
+    for name in sorted(set(stored) - seen if report_missing else ()):
+        samples = stored[name].get("samples", [])
+        comparisons.append(
+            Comparison(
+                name,
+                statistics.median(samples) if samples else None,
+                None,
+                verdict="missing",
+            )
+        )
+    order = {"regression": 0, "improvement": 1, "new": 2, "unchanged": 3, "missing": 4}
+    comparisons.sort(key=lambda c: (order[c.verdict], c.name))
+    return comparisons
+
+
+def format_comparisons(comparisons: list[Comparison]) -> list[str]:
+    """One aligned line per case: medians, change, p-value and verdict."""
+    width = max((len(c.name) for c in comparisons), default=0)
+    lines = []
+    for c in comparisons:
+        base = f"{c.baseline_median:10.3f}" if c.baseline_median is not None else f"{'-':>10}"
+        cur = f"{c.current_median:10.3f}" if c.current_median is not None else f"{'-':>10}"
+        change = f"{c.change:+7.1%}" if c.change is not None else " " * 7
+        p_value = c.p_slower if (c.change or 0) >= 0 else c.p_faster
+        p_text = f"p={p_value:.4f}" if p_value is not None else " " * 8
+        lines.append(f"  {c.name.ljust(width)}  {base} -> {cur} us  {change}  {p_text}  {c.verdict}")
+    return lines
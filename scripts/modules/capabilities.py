@@ -0,0 +1,127 @@
+"""Skip or speed up CAPABILITIES.md regeneration (tool/gen_capabilities.dart).
+
+The generator resolves every lib/ file with the Dart analyzer under `dart run`
+(JIT startup plus analyzer warm-up) on every release, although most releases
+do not touch the public API. Two things cut that out:
+
+1. An API fingerprint, computed in Python, of everything the catalog is built
+   from: each public declaration as the audit's parser sees it
+   (`audit.public_declarations`), every `///` doc line (symbol summaries and
+   file purposes come from those), declaration-level code (fields and enum
+   values the regex parser does not list), and the generator's own source.
+   It is stored as a trailing HTML comment in CAPABILITIES.md. When it
+   matches, the tool is not run; only the header stamp
+   (`**Release X** · Generated DATE`) is brought up to date, since the version
+   changes every release while the catalog does not.
+2. When the tool must run, it runs as a native executable from
+   `dart compile exe`, cached in reports/_cache/ and rebuilt only when the
+   tool source or the locked dependencies change. A failed compile falls back
+   to `dart run`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from datetime import date
+from pathlib import Path
+
+from . import atomic_file
+from . import audit
+from . import platform as platform_mod
+from . import run as run_mod
+from . import symbols
+
+TOOL_RELATIVE_PATH = Path("tool") / "gen_capabilities.dart"
+OUTPUT_NAME = "CAPABILITIES.md"
+CACHE_DIR = Path("reports") / "_cache"
+# The barrel only re-exports; the generator skips it too.
+_BARREL = "saropa_dart_utils.dart"
+
+_FINGERPRINT_RE = re.compile(r"^<!-- api-fingerprint: ([0-9a-f]+) -->$", re.MULTILINE)
+_STAMP_RE = re.compile(r"^\*\*Release [^*]+\*\* · Generated \d{4}-\d{2}-\d{2}$", re.MULTILINE)
+
+
+def api_fingerprint(project_dir: Path) -> str:
+    """Digest of the public API and docs under lib/, plus the generator source."""
+    digest = hashlib.blake2b(digest_size=16)
+    tool = project_dir / TOOL_RELATIVE_PATH
+    if tool.is_file():
+        digest.update(tool.read_bytes())
+    for path in sorted((project_dir / "lib").rglob("*.dart")):
+        if path.name == _BARREL:
+            continue
+        text = path.read_text(encoding="utf-8")
+        parts = [path.relative_to(project_dir).as_posix()]
+        parts.extend(f"{name}/{params}" for name, params, _line in audit.public_declarations(text))
+        parts.extend(line.strip() for line in text.splitlines() if line.lstrip().startswith("///"))
+        # Signatures, fields and enum values: declaration-level lines, with
+        # whitespace collapsed so a reformat does not count as a change.
+        parts.extend(
+            " ".join(code.split())
+            for _line_no, code, depth in symbols.code_lines(text)
+            if depth <= 1 and code.strip()
+        )
+        digest.update("\n".join(parts).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def stored_fingerprint(output: Path) -> str | None:
+    """The fingerprint recorded in CAPABILITIES.md, if any."""
+    try:
+        match = _FINGERPRINT_RE.search(output.read_text(encoding="utf-8"))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def stamp(output: Path, fingerprint: str, version: str | None) -> None:
+    """Record `fingerprint` and refresh the release/date header, atomically."""
+    text = output.read_text(encoding="utf-8")
+    text = _FINGERPRINT_RE.sub("", text).rstrip("\n") + "\n"
+    if version is not None:
+        header = f"**Release {version}** · Generated {date.today().isoformat()}"
+        text = _STAMP_RE.sub(header, text, count=1)
+    text += f"\n<!-- api-fingerprint: {fingerprint} -->\n"
+    atomic_file.write_text(output, text, newline="\n")
+
+
+def _build_key(project_dir: Path) -> str:
+    digest = hashlib.sha256((project_dir / TOOL_RELATIVE_PATH).read_bytes())
+    lock = project_dir / "pubspec.lock"
+    if lock.is_file():
+        # The analyzer package is compiled into the executable.
+        digest.update(lock.read_bytes())
+    return digest.hexdigest()
+
+
+def tool_command(project_dir: Path) -> list[str]:
+    """Command that runs the generator: the cached executable when possible.
+
+    The executable is rebuilt when its key (tool source + pubspec.lock) no
+    longer matches the one recorded beside it; if compiling fails, the
+    generator runs under `dart run` as before.
+    """
+    fallback = ["dart", "run", TOOL_RELATIVE_PATH.as_posix()]
+    cache_dir = project_dir / CACHE_DIR
+    suffix = ".exe" if platform_mod.is_windows() else ""
+    exe = cache_dir / f"gen_capabilities{suffix}"
+    key_path = cache_dir / "gen_capabilities.key"
+    key = _build_key(project_dir)
+    try:
+        current = key_path.read_text(encoding="utf-8").strip()
+    except OSError:
+        current = None
+    if current == key and exe.is_file():
+        return [str(exe)]
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    result = run_mod.run_capture(
+        ["dart", "compile", "exe", TOOL_RELATIVE_PATH.as_posix(), "-o", str(exe)],
+        project_dir,
+    )
+    if result.returncode != 0 or not exe.is_file():
+        return fallback
+    key_path.write_text(key + "\n", encoding="utf-8")
+    return [str(exe)]
@@ -0,0 +1,116 @@
+"""Publish step checkpoints, so a run that fails late can resume.
+
+Each workflow step that completes is recorded in
+reports/_cache/publish_checkpoint.json together with the release version, the
+HEAD commit and a fingerprint of the working tree as the step left them.
+`publish.py --resume` loads the checkpoint and skips recorded steps when the
+cheap invariants still hold:
+
+    - the version being released is the recorded one;
+    - HEAD is the recorded commit (the release commit, once step 11 ran);
+    - the working tree has not been edited since (tracked diff against HEAD
+      and untracked files, reports/ excluded since every run writes there).
+
+Anything else discards the checkpoint and the run starts at step 1. A run that
+ends with the version live on pub.dev clears it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from . import atomic_file
+from . import run as run_mod
+
+CHECKPOINT_RELATIVE_PATH = Path("reports") / "_cache" / "publish_checkpoint.json"
+# Audit reports and caches (this file included) change on every run.
+_EXCLUDE = ":(exclude)reports"
+
+
+def tree_state(project_dir: Path) -> tuple[str | None, str]:
+    """(HEAD sha, working-tree fingerprint) of `project_dir`."""
+    head = run_mod.run_capture(["git", "rev-parse", "HEAD"], project_dir)
+    diff = run_mod.run_capture(["git", "diff", "HEAD", "--", ".", _EXCLUDE], project_dir)
+    untracked = run_mod.run_capture(
+        ["git", "ls-files", "--others", "--exclude-standard", "--", ".", _EXCLUDE],
+        project_dir,
+    )
+    digest = hashlib.sha256(diff.stdout.encode("utf-8"))
+    for rel in sorted(untracked.stdout.splitlines()):
+        try:
+            stat = (project_dir / rel).stat()
+        except OSError:
+            continue
+        digest.update(f"\0{rel}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+    return (head.stdout.strip() if head.returncode == 0 else None), digest.hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """Completed steps of one release attempt, saved after every step."""
+
+    version: str
+    head: str | None
+    tree: str
+    steps: list[str] = field(default_factory=list)
+    # Step outputs a resumed run still needs (release notes, report path).
+    data: dict[str, str] = field(default_factory=dict)
+    path: Path | None = field(default=None, repr=False, compare=False)
+
+    def done(self, step: str) -> bool:
+        return step in self.steps
+
+    def complete(self, step: str, project_dir: Path, **data: str) -> None:
+        """Record `step` (and any outputs) with the tree state it left behind."""
+        if step not in self.steps:
+            self.steps.append(step)
+        self.data.update(data)
+        self.head, self.tree = tree_state(project_dir)
+        self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = asdict(self)
+        del record["path"]
+        atomic_file.write_text(self.path, json.dumps(record, indent=2))
+
+
+def start(project_dir: Path, version: str) -> Checkpoint:
+    """A fresh checkpoint for `version`, replacing any earlier one."""
+    head, tree = tree_state(project_dir)
+    checkpoint = Checkpoint(
+        version=version, head=head, tree=tree, path=project_dir / CHECKPOINT_RELATIVE_PATH
+    )
+    checkpoint._save()
+    return checkpoint
+
+
+def resume(project_dir: Path, version: str) -> tuple[Checkpoint | None, str]:
+    """The saved checkpoint if its invariants hold, else (None, reason)."""
+    path = project_dir / CHECKPOINT_RELATIVE_PATH
+    try:
+        record = json.loads(path.read_text(encoding="utf-8"))
+        checkpoint = Checkpoint(**record, path=path)
+    except (OSError, ValueError, TypeError):
+        return None, "no checkpoint"
+    if checkpoint.version != version:
+        return None, f"checkpoint is for v{checkpoint.version}"
+    head, tree = tree_state(project_dir)
+    if checkpoint.head != head:
+        return None, "HEAD moved since the checkpoint"
+    if checkpoint.tree != tree:
+        return None, "working tree changed since the checkpoint"
+    return checkpoint, "ok"
+
+
+def clear(project_dir: Path) -> None:
+    """Remove the checkpoint (the release finished)."""
+    try:
+        (project_dir / CHECKPOINT_RELATIVE_PATH).unlink()
+    except FileNotFoundError:
+        pass
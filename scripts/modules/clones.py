@@ -0,0 +1,220 @@
+"""Near-duplicate method detection: winnowed k-gram fingerprints, MinHash, LSH.
+
+Comparing every method body with every other is quadratic — tens of millions
+of pairs across lib/. Instead each body goes through a fixed pipeline whose
+cost is linear in the corpus:
+
+1. Normalize: tokenize the body with comments dropped, every identifier
+   abstracted to `ID`, string literals to `STR` and numbers to `NUM`, so a
+   copy with renamed variables or different constants still matches.
+   Keywords, operators and punctuation stay as they are — they carry the
+   structure.
+2. Fingerprint: hash every k-gram of tokens and keep the winnowed minimum of
+   each window (Schleimer et al.), a small position-robust subset.
+3. Sign: a MinHash signature of the fingerprint set estimates Jaccard
+   similarity between any two bodies.
+4. Bucket: the signature is split into bands; bodies sharing any whole band
+   land in the same LSH bucket and become candidate pairs. Only candidates
+   get an exact Jaccard check on their fingerprint sets.
+
+Pairs above the threshold are merged into clone groups (union-find) and
+ranked by how much code a consolidation would remove.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Tokens per k-gram and winnowing window. k=5 tokens is about one short
+# statement; a window of 4 guarantees any shared run of k+w-1 = 8 tokens is
+# caught.
+KGRAM = 5
+WINDOW = 4
+# Bodies shorter than this many tokens are too small to be worth consolidating
+# (a one-line getter matches hundreds of others).
+MIN_TOKENS = 40
+# 32 bands of 2 rows: a pair at Jaccard 0.7 becomes a candidate with
+# probability 1 - (1 - 0.7^2)^32 > 0.999; at 0.3 it is ~95% likely too, which
+# the exact check then discards. Buckets stay small because bodies share few
+# fingerprints overall.
+BANDS = 32
+ROWS = 2
+SIMILARITY_THRESHOLD = 0.7
+
+_MERSENNE = (1 << 61) - 1
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<string>r?'''.*?'''|r?\"\"\".*?\"\"\"|r?'(?:\\.|[^'\\\n])*'|r?"(?:\\.|[^"\\\n])*")
+    |(?P<number>\b(?:0x[0-9A-Fa-f]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b)
+    |(?P<word>[A-Za-z_$][\w$]*)
+    |(?P<op>\?\?=|\.\.\.|\?\.|\?\?|=>|==|!=|<=|>=|&&|\|\||\+\+|--|[-+*/%~^&|<>!=?:;.,(){}\[\]@#])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+# Words kept verbatim: they are structure, not names.
+_DART_KEYWORDS = frozenset(
+    """
+    abstract as assert async await break case catch class const continue
+    default do dynamic else enum extends external factory false final finally
+    for get if implements import in is late library mixin new null on
+    operator override part required rethrow return set static super switch
+    sync this throw true try typedef var void when while with yield
+    """.split()
+)
+
+
+@dataclass(frozen=True)
+class MethodBody:
+    """One method body to compare."""
+
+    file: str
+    line: int
+    name: str
+    text: str
+
+
+@dataclass
+class CloneGroup:
+    """Methods whose bodies are near-duplicates of each other."""
+
+    members: list[MethodBody]
+    similarity: float  # lowest pairwise Jaccard that joined the group
+    tokens: int  # token count of the largest member
+
+    @property
+    def removable_tokens(self) -> int:
+        """Tokens a consolidation to one copy would remove."""
+        return self.tokens * (len(self.members) - 1)
+
+
+def normalize(text: str) -> list[str]:
+    """Token stream of `text` with names, strings and numbers abstracted."""
+    tokens: list[str] = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        if kind == "string":
+            tokens.append("STR")
+        elif kind == "number":
+            tokens.append("NUM")
+        elif kind == "word":
+            word = match.group(0)
+            tokens.append(word if word in _DART_KEYWORDS else "ID")
+        else:
+            tokens.append(match.group(0))
+    return tokens
+
+
+def _hash64(data: str) -> int:
+    """Stable 64-bit hash (Python's `hash` is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(data.encode(), digest_size=8).digest(), "big")
+
+
+def winnow(tokens: list[str], k: int = KGRAM, window: int = WINDOW) -> set[int]:
+    """Winnowed fingerprints: the minimum k-gram hash of every window.
+
+    Only hash values are kept (not positions), so a run of windows sharing one
+    minimum contributes a single fingerprint.
+    """
+    hashes = [_hash64(" ".join(tokens[i : i + k])) for i in range(len(tokens) - k + 1)]
+    if len(hashes) <= window:
+        return set(hashes)
+    fingerprints: set[int] = set()
+    for start in range(len(hashes) - window + 1):
+        fingerprints.add(min(hashes[start : start + window]))
+    return fingerprints
+
+
+def _minhash_params(count: int) -> list[tuple[int, int]]:
+    """Deterministic (a, b) pairs for `count` universal hash functions."""
+    params = []
+    for i in range(count):
+        seed = _hash64(f"minhash-{i}")
+        params.append(((seed | 1) % _MERSENNE, (seed >> 3) % _MERSENNE))
+    return params
+
+
+_PARAMS = _minhash_params(BANDS * ROWS)
+
+
+def minhash(fingerprints: set[int]) -> tuple[int, ...]:
+    """MinHash signature of a fingerprint set."""
+    return tuple(
+        min((a * fp + b) % _MERSENNE for fp in fingerprints) for a, b in _PARAMS
+    )
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_clone_groups(
+    bodies: list[MethodBody],
+    threshold: float = SIMILARITY_THRESHOLD,
+    min_tokens: int = MIN_TOKENS,
+) -> tuple[list[CloneGroup], int]:
+    """Group near-duplicate bodies. Returns (groups ranked, candidate pairs checked)."""
+    kept: list[MethodBody] = []
+    prints: list[set[int]] = []
+    sizes: list[int] = []
+    for body in bodies:
+        tokens = normalize(body.text)
+        if len(tokens) < min_tokens:
+            continue
+        kept.append(body)
+        prints.append(winnow(tokens))
+        sizes.append(len(tokens))
+
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = defaultdict(list)
+    for idx, fps in enumerate(prints):
+        signature = minhash(fps)
+        for band in range(BANDS):
+            key = signature[band * ROWS : (band + 1) * ROWS]
+            buckets[(band, key)].append(idx)
+
+    candidates: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1 :]:
+                candidates.add((a, b) if a < b else (b, a))
+
+    parent = list(range(len(kept)))
+    weakest: dict[int, float] = {}
+    matched: list[tuple[int, int, float]] = []
+    for a, b in candidates:
+        union = len(prints[a] | prints[b])
+        similarity = len(prints[a] & prints[b]) / union if union else 0.0
+        if similarity >= threshold:
+            matched.append((a, b, similarity))
+            parent[_find(parent, a)] = _find(parent, b)
+
+    for a, _b, similarity in matched:
+        root = _find(parent, a)
+        weakest[root] = min(weakest.get(root, 1.0), similarity)
+
+    grouped: dict[int, list[int]] = defaultdict(list)
+    for idx in range(len(kept)):
+        root = _find(parent, idx)
+        if root in weakest:
+            grouped[root].append(idx)
+
+    groups = [
+        CloneGroup(
+            members=[kept[i] for i in sorted(idxs, key=lambda i: (kept[i].file, kept[i].line))],
+            similarity=weakest[root],
+            tokens=max(sizes[i] for i in idxs),
+        )
+        for root, idxs in grouped.items()
+    ]
+    groups.sort(key=lambda g: (-g.removable_tokens, -g.similarity))
+    return groups, len(candidates)
@@ -3,7 +3,7 @@
 from enum import Enum
 
 
-SCRIPT_VERSION = "2.9"
+SCRIPT_VERSION = "3.0"
 
 
 class ExitCode(Enum):
@@ -20,3 +20,4 @@ class ExitCode(Enum):
     GIT_FAILED = 8
     USER_CANCELLED = 9
     AUDIT_FAILED = 10
+    BENCHMARK_REGRESSION = 11
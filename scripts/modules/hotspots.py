@@ -0,0 +1,301 @@
+"""Incremental per-line churn index for lib/ built from one streaming git log.
+
+The audit's hotspot section ranks methods by churn × complexity. Complexity
+comes from the audit's own construct counts; churn comes from here.
+
+`git log --numstat` stops at file granularity, so the pass reads zero-context
+hunks instead (`git log -p -U0`), which carry the same per-file add/delete
+counts plus WHERE each change landed. Every commit on the first-parent chain is
+replayed oldest first onto a per-file list of change counts, one entry per
+current line: a hunk splices its replaced lines out, and the new lines inherit
+the highest count they replaced plus one. After the replay, entry `i` of a file
+is how many commits have rewritten line `i + 1` of that file at HEAD, so a
+method's churn is the sum over its current line span — no per-method
+`git log -L` calls, which cost one history walk per method.
+
+The result is cached in reports/_cache/churn_index.json keyed by the last
+processed commit SHA. The next run replays only `<sha>..HEAD`; when that SHA is
+no longer an ancestor of HEAD (rebased or reset), the index is rebuilt.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import atomic_file
+from . import run as run_mod
+
+CACHE_VERSION = 1
+CACHE_RELATIVE_PATH = Path("reports") / "_cache" / "churn_index.json"
+
+# Commit delimiter in the --format output. Content lines in a -U0 patch always
+# start with "+", "-" or "\", so this prefix cannot be confused with one.
+_COMMIT_MARK = "\x1eCOMMIT "
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class FileChurn:
+    """History of one file under lib/, aligned to its content at `head`."""
+
+    commits: int = 0
+    added: int = 0
+    deleted: int = 0
+    # Change count per current line (index 0 = line 1).
+    lines: list[int] = field(default_factory=list)
+
+    def span_churn(self, start_1based: int, end_1based: int) -> tuple[int, int]:
+        """(total line changes, most-rewritten line count) for a line span."""
+        span = self.lines[max(0, start_1based - 1) : end_1based]
+        if not span:
+            return 0, 0
+        return sum(span), max(span)
+
+
+@dataclass
+class ChurnIndex:
+    """Per-file churn for every lib/ Dart file, as of commit `head`."""
+
+    head: str = ""
+    files: dict[str, FileChurn] = field(default_factory=dict)
+    # Commits replayed by the most recent update (0 when the cache was current).
+    replayed: int = 0
+    rebuilt: bool = False
+
+
+@dataclass
+class _PendingFile:
+    """One file section of the patch being parsed."""
+
+    old_path: str | None = None
+    new_path: str | None = None
+    # (old_start, old_count, new_count), in patch (ascending) order.
+    hunks: list[tuple[int, int, int]] = field(default_factory=list)
+
+
+def _apply_hunks(lines: list[int], hunks: list[tuple[int, int, int]]) -> None:
+    """Replay one commit's hunks for a file onto its per-line counts.
+
+    Hunk coordinates refer to the pre-image, so they are applied bottom-up:
+    splicing a later hunk never shifts an earlier one.
+    """
+    for old_start, old_count, new_count in reversed(hunks):
+        if old_count == 0:
+            # Pure insertion AFTER line `old_start` (0 = top of file).
+            at = min(old_start, len(lines))
+            lines[at:at] = [1] * new_count
+            continue
+        at = min(old_start - 1, len(lines))
+        replaced = lines[at : at + old_count]
+        inherited = max(replaced, default=0)
+        lines[at : at + old_count] = [inherited + 1] * new_count
+        if new_count == 0 and at > 0:
+            # A pure deletion leaves no line to carry the change; charge it to
+            # the line above so the enclosing method still shows the churn.
+            lines[at - 1] += 1
+
+
+class _PatchReplayer:
+    """`on_line` callback that replays a `git log -p -U0` stream into an index."""
+
+    def __init__(self, files: dict[str, FileChurn]) -> None:
+        self.files = files
+        self.commits = 0
+        self.last_sha = ""
+        self._pending: _PendingFile | None = None
+        # Content lines still owed by the current hunk (old side, new side).
+        self._old_left = 0
+        self._new_left = 0
+
+    def __call__(self, line: str) -> None:
+        if self._old_left or self._new_left:
+            if line.startswith("-"):
+                self._old_left -= 1
+                return
+            if line.startswith("+"):
+                self._new_left -= 1
+                return
+            if line.startswith("\\"):
+                return  # "\ No newline at end of file"
+            # Counts disagreed with the stream; fall through and resync.
+            self._old_left = self._new_left = 0
+
+        if line.startswith(_COMMIT_MARK):
+            self._flush_file()
+            self.last_sha = line[len(_COMMIT_MARK) :].strip()
+            self.commits += 1
+        elif line.startswith("diff --git "):
+            self._flush_file()
+            self._pending = _diff_header_paths(line[len("diff --git ") :])
+        elif self._pending is None:
+            return
+        elif line.startswith("rename from "):
+            self._pending.old_path = line[len("rename from ") :]
+        elif line.startswith("rename to "):
+            self._pending.new_path = line[len("rename to ") :]
+        elif line.startswith("--- "):
+            self._pending.old_path = _patch_path(line[4:], "a/")
+        elif line.startswith("+++ "):
+            self._pending.new_path = _patch_path(line[4:], "b/")
+        elif line.startswith("new file mode"):
+            self._pending.old_path = None
+        elif line.startswith("deleted file mode"):
+            self._pending.new_path = None
+        elif line.startswith("@@"):
+            match = _HUNK_RE.match(line)
+            if match:
+                old_count = int(match.group(2) or "1")
+                new_count = int(match.group(4) or "1")
+                self._pending.hunks.append(
+                    (int(match.group(1)), old_count, new_count)
+                )
+                self._old_left, self._new_left = old_count, new_count
+
+    def finish(self) -> None:
+        """Apply the last file section once the stream has ended."""
+        self._flush_file()
+
+    def _flush_file(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        old, new = pending.old_path, pending.new_path
+        churn = self.files.pop(old, None) if old else None
+        if new is None:
+            return  # Deleted (or moved out of lib/): its history goes with it.
+        if churn is None:
+            churn = self.files.pop(new, None) or FileChurn()
+        _apply_hunks(churn.lines, pending.hunks)
+        churn.commits += 1
+        churn.added += sum(h[2] for h in pending.hunks)
+        churn.deleted += sum(h[1] for h in pending.hunks)
+        self.files[new] = churn
+
+
+def _diff_header_paths(rest: str) -> _PendingFile:
+    """Seed both paths from `a/<p> b/<p>` so a mode-only change still counts.
+
+    The `---`/`+++` and `rename` lines that follow override these; they are
+    absent only for changes without content (mode flips, pure renames).
+    """
+    half = (len(rest) - 1) // 2
+    if rest.startswith("a/") and rest[half : half + 3] == " b/":
+        path = rest[2:half]
+        if path == rest[half + 3 :]:
+            return _PendingFile(old_path=path, new_path=path)
+    return _PendingFile()
+
+
+def _patch_path(raw: str, prefix: str) -> str | None:
+    """Path from a `--- a/x` / `+++ b/x` header; None for /dev/null."""
+    raw = raw.rstrip("\t")
+    if raw == "/dev/null":
+        return None
+    return raw[len(prefix) :] if raw.startswith(prefix) else raw
+
+
+def _git(project_dir: Path, *args: str) -> subprocess.CompletedProcess:
+    return run_mod.run_capture(["git", *args], project_dir)
+
+
+def _load_cache(path: Path) -> ChurnIndex | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION or not data.get("head"):
+        return None
+    files = {
+        rel: FileChurn(
+            commits=entry["commits"],
+            added=entry["added"],
+            deleted=entry["deleted"],
+            lines=entry["lines"],
+        )
+        for rel, entry in data.get("files", {}).items()
+    }
+    return ChurnIndex(head=data["head"], files=files)
+
+
+def _save_cache(path: Path, index: ChurnIndex) -> None:
+    """Write the cache atomically (temp file + os.replace)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": CACHE_VERSION,
+        "head": index.head,
+        "files": {
+            rel: {
+                "commits": churn.commits,
+                "added": churn.added,
+                "deleted": churn.deleted,
+                "lines": churn.lines,
+            }
+            for rel, churn in sorted(index.files.items())
+        },
+    }
+    atomic_file.write_text(path, json.dumps(data, separators=(",", ":")))
+
+
+def load_churn_index(project_dir: Path) -> ChurnIndex | None:
+    """Return the churn index brought up to HEAD, or None without git history.
+
+    Replays only commits the cache has not seen; an unchanged HEAD costs one
+    `rev-parse` and a JSON read.
+    """
+    head_result = _git(project_dir, "rev-parse", "HEAD")
+    if head_result.returncode != 0:
+        return None
+    head = head_result.stdout.strip()
+
+    cache_path = project_dir / CACHE_RELATIVE_PATH
+    index = _load_cache(cache_path)
+    if index is not None and index.head == head:
+        return index
+
+    # A full replay walks everything up to HEAD; an incremental one only the
+    # commits after the cached SHA.
+    rev_range = head
+    rebuilt = True
+    if index is not None:
+        ancestor = _git(project_dir, "merge-base", "--is-ancestor", index.head, head)
+        if ancestor.returncode == 0:
+            rev_range = f"{index.head}..{head}"
+            rebuilt = False
+    if rebuilt:
+        index = ChurnIndex()
+
+    replayer = _PatchReplayer(index.files)
+    cmd = [
+        "git",
+        "-c",
+        "core.quotepath=off",
+        "log",
+        "--reverse",
+        # The first-parent chain is a single line of history, so each diff
+        # applies on top of the previous one; merges diff against parent 1.
+        "--first-parent",
+        "-m",
+        "-p",
+        "-U0",
+        "-M",
+        "--no-color",
+        "--no-ext-diff",
+        f"--format={_COMMIT_MARK}%H",
+        rev_range,
+        "--",
+        "lib/*.dart",
+    ]
+    result = run_mod.run_streaming(cmd, project_dir, on_line=replayer)
+    replayer.finish()
+    if result.returncode != 0:
+        return None
+
+    index.head = head
+    index.replayed = replayer.commits
+    index.rebuilt = rebuilt
+    _save_cache(cache_path, index)
+    return index
@@ -0,0 +1,252 @@
+"""Per-method line coverage from `flutter test --coverage` (coverage/lcov.info).
+
+The audit's section 1 counts tests that mention a member by name, which is a
+heuristic. This module reads the real thing: the lcov tracefile the test
+runner writes, one record per source file:
+
+    SF:lib/src/string/string_extensions.dart
+    DA:12,4          <- line 12 executed 4 times
+    DA:13,0          <- line 13 is executable but never ran
+    LF:2
+    LH:1
+    end_of_record
+
+The tracefile for a large suite runs to megabytes, so it is never loaded whole.
+`iter_records` reads it line by line and yields each record as soon as its
+`end_of_record` arrives; the caller maps that record onto method spans and
+drops it, so memory is bounded by the largest single file's line table.
+
+Mapping onto methods needs the audit's `_method_ranges`, which this module
+does not import (audit imports it); the caller passes a function instead.
+Results are cached in reports/_cache/line_coverage.json keyed by the
+tracefile's SHA-256 plus a digest of lib/, so re-auditing a release candidate
+whose tests produced the same tracefile skips the mapping entirely.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+from collections.abc import Callable, Iterator
+from dataclasses import astuple, dataclass
+from pathlib import Path
+
+from . import atomic_file
+
+CACHE_VERSION = 1
+CACHE_RELATIVE_PATH = Path("reports") / "_cache" / "line_coverage.json"
+LCOV_RELATIVE_PATH = Path("coverage") / "lcov.info"
+
+# Read size for hashing; the tracefile is hashed in chunks, never read whole.
+_CHUNK = 1 << 20
+
+MethodRanges = Callable[[str], list[tuple[int, int, str]]]
+
+
+@dataclass(frozen=True)
+class MethodCoverage:
+    """Executable-line coverage of one method span."""
+
+    file: str
+    line: int
+    end: int
+    name: str
+    covered: int
+    total: int
+
+    @property
+    def missed(self) -> int:
+        return self.total - self.covered
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.covered / self.total if self.total else 0.0
+
+
+@dataclass
+class CoverageReport:
+    """Everything the audit section needs from one tracefile."""
+
+    methods: list[MethodCoverage]
+    lines_found: int = 0
+    lines_hit: int = 0
+    files_with_data: int = 0
+    # lib/ files no test loaded: the tracefile has no record for them at all.
+    files_without_data: int = 0
+    cached: bool = False
+
+
+def iter_records(path: Path) -> Iterator[tuple[str, dict[int, int]]]:
+    """Yield (source file, {line: hit count}) for each record in a tracefile.
+
+    Streams: only the current record's line table is held. A line listed twice
+    in one record (merged tracefiles) keeps the sum of its hits. Records with no
+    `SF:` line are skipped; a final record missing its `end_of_record` (a
+    truncated file) is still yielded.
+    """
+    source: str | None = None
+    hits: dict[int, int] = {}
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        for raw in handle:
+            line = raw.rstrip("\r\n")
+            if line.startswith("DA:"):
+                # DA:<line>,<hits>[,<checksum>]
+                parts = line[3:].split(",")
+                try:
+                    number, count = int(parts[0]), int(parts[1])
+                except (IndexError, ValueError):
+                    continue
+                hits[number] = hits.get(number, 0) + count
+            elif line.startswith("SF:"):
+                source = line[3:]
+                hits = {}
+            elif line == "end_of_record":
+                if source is not None:
+                    yield source, hits
+                source, hits = None, {}
+    if source is not None:
+        yield source, hits
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def lib_digest(project_dir: Path) -> str:
+    """Digest of every lib/ Dart file's path and content.
+
+    Part of the cache key: method spans come from the sources, so an edit that
+    happens to leave the tracefile unchanged (a renamed method, a moved
+    comment) must still invalidate the cached mapping.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted((project_dir / "lib").rglob("*.dart")):
+        digest.update(path.relative_to(project_dir).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def source_relpath(source: str, project_dir: Path) -> str | None:
+    """Project-relative posix path of an `SF:` entry, or None outside lib/.
+
+    `flutter test` writes relative paths; other tools write absolute ones,
+    with Windows separators on Windows.
+    """
+    path = Path(source.replace("\\", "/"))
+    if path.is_absolute():
+        try:
+            path = path.resolve().relative_to(project_dir.resolve())
+        except ValueError:
+            return None
+    rel = path.as_posix()
+    return rel if rel.startswith("lib/") else None
+
+
+def map_methods(
+    rel: str, hits: dict[int, int], ranges: list[tuple[int, int, str]]
+) -> list[MethodCoverage]:
+    """Coverage of each method span in one file.
+
+    The executable lines are sorted once and each span is two bisections into
+    them, so a file costs O((lines + methods) log lines). Spans with no
+    executable line (abstract members, constant getters) are left out.
+    """
+    lines = sorted(hits)
+    methods: list[MethodCoverage] = []
+    for start, end, name in ranges:
+        lo = bisect.bisect_left(lines, start)
+        hi = bisect.bisect_right(lines, end)
+        if lo == hi:
+            continue
+        covered = sum(1 for n in lines[lo:hi] if hits[n] > 0)
+        methods.append(MethodCoverage(rel, start, end, name, covered, hi - lo))
+    return methods
+
+
+def _load_cache(path: Path, key: str) -> CoverageReport | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION or data.get("key") != key:
+        return None
+    try:
+        return CoverageReport(
+            methods=[MethodCoverage(*row) for row in data["methods"]],
+            lines_found=data["lines_found"],
+            lines_hit=data["lines_hit"],
+            files_with_data=data["files_with_data"],
+            files_without_data=data["files_without_data"],
+            cached=True,
+        )
+    except (KeyError, TypeError):
+        return None
+
+
+def _save_cache(path: Path, key: str, report: CoverageReport) -> None:
+    """Write the cache atomically (temp file + os.replace)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": CACHE_VERSION,
+        "key": key,
+        "lines_found": report.lines_found,
+        "lines_hit": report.lines_hit,
+        "files_with_data": report.files_with_data,
+        "files_without_data": report.files_without_data,
+        "methods": [list(astuple(m)) for m in report.methods],
+    }
+    atomic_file.write_text(path, json.dumps(data, separators=(",", ":")))
+
+
+def load_coverage(
+    project_dir: Path, method_ranges: MethodRanges, lcov_path: Path | None = None
+) -> CoverageReport | None:
+    """Per-method coverage from the tracefile, or None when there is none.
+
+    `method_ranges` maps a file's content to (start, end, name) spans (the
+    audit's `_method_ranges`). A cache hit costs one hashing pass over the
+    tracefile and lib/; a miss streams the records and reads only the lib/
+    files they name.
+    """
+    lcov_path = lcov_path or project_dir / LCOV_RELATIVE_PATH
+    if not lcov_path.is_file():
+        return None
+    key = f"{file_digest(lcov_path)}:{lib_digest(project_dir)}"
+    cache_path = project_dir / CACHE_RELATIVE_PATH
+    cached = _load_cache(cache_path, key)
+    if cached is not None:
+        return cached
+
+    report = CoverageReport(methods=[])
+    seen: set[str] = set()
+    for source, hits in iter_records(lcov_path):
+        rel = source_relpath(source, project_dir)
+        # `flutter test` writes one record per file. A repeat (tracefiles
+        # concatenated by hand) is skipped rather than merged, which would
+        # mean holding every record until the end.
+        if rel is None or rel in seen:
+            continue
+        lib_path = project_dir / rel
+        if not lib_path.is_file():
+            continue  # Tracefile is older than the tree: file since removed.
+        seen.add(rel)
+        report.files_with_data += 1
+        report.lines_found += len(hits)
+        report.lines_hit += sum(1 for count in hits.values() if count > 0)
+        content = lib_path.read_text(encoding="utf-8")
+        report.methods.extend(map_methods(rel, hits, method_ranges(content)))
+    report.files_without_data = sum(
+        1
+        for path in (project_dir / "lib").rglob("*.dart")
+        if path.relative_to(project_dir).as_posix() not in seen
+    )
+    _save_cache(cache_path, key, report)
+    return report
@@ -0,0 +1,108 @@
+"""Line -> enclosing member lookup, for attributing line-based audit findings.
+
+Analyzer diagnostics, empty catches, loop smells and the other per-line checks
+report `file:line`. Ranking members by how many findings land in them needs
+the member that contains each line. Scanning a file's member list per finding
+is linear in members; with thousands of diagnostics that adds up, so each file
+gets a `SpanIndex` instead: its members' (start, end) spans sorted by start,
+searched with `bisect` in O(log n). Member spans never overlap (`_method_ranges`
+drops nested closures), and neither do top-level type bodies, so the span
+starting at or before the line is the only candidate and one comparison with
+its end settles it.
+
+Spans come from the audit's own parsers, passed in as `build` (this module
+cannot import audit, which imports it). Files are indexed on first lookup and
+kept, so a file with many findings is parsed once.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+# (start_1based, end_1based, name)
+Spans = list[tuple[int, int, str]]
+# File content -> (member spans, type spans).
+SpanBuilder = Callable[[str], tuple[Spans, Spans]]
+
+
+class SpanIndex:
+    """Non-overlapping line spans, searchable by line in O(log n)."""
+
+    def __init__(self, spans: Spans) -> None:
+        self._spans = sorted(spans)
+        self._starts = [start for start, _end, _name in self._spans]
+
+    def find(self, line: int) -> tuple[int, int, str] | None:
+        """The span containing `line`, or None when it falls between spans."""
+        at = bisect.bisect_right(self._starts, line) - 1
+        if at < 0:
+            return None
+        span = self._spans[at]
+        return span if line <= span[1] else None
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+@dataclass(frozen=True)
+class MemberLocation:
+    """Where a finding landed: its file, enclosing type and member."""
+
+    file: str
+    owner: str | None  # enclosing class/mixin/enum/extension, None at top level
+    member: str | None  # None outside every member (imports, fields)
+    member_line: int | None
+
+
+class MemberIndex:
+    """Per-file `SpanIndex`es for members and types, built on demand."""
+
+    def __init__(self, project_dir: Path, build: SpanBuilder) -> None:
+        self._project_dir = project_dir
+        self._build = build
+        self._files: dict[str, tuple[SpanIndex, SpanIndex] | None] = {}
+        # Older checks report a bare file name; resolve those when unique.
+        by_name: dict[str, list[str]] = {}
+        for path in (project_dir / "lib").rglob("*.dart"):
+            rel = path.relative_to(project_dir).as_posix()
+            by_name.setdefault(path.name, []).append(rel)
+        self._basenames = {name: rels[0] for name, rels in by_name.items() if len(rels) == 1}
+
+    def resolve(self, file: str) -> str | None:
+        """Project-relative posix path for a finding's file, or None."""
+        file = file.replace("\\", "/")
+        if "/" not in file:
+            return self._basenames.get(file)
+        return file if (self._project_dir / file).is_file() else None
+
+    def _indexes(self, rel: str) -> tuple[SpanIndex, SpanIndex] | None:
+        if rel not in self._files:
+            try:
+                content = (self._project_dir / rel).read_text(encoding="utf-8")
+            except OSError:
+                self._files[rel] = None
+            else:
+                members, types = self._build(content)
+                self._files[rel] = (SpanIndex(members), SpanIndex(types))
+        return self._files[rel]
+
+    def locate(self, file: str, line: int) -> MemberLocation | None:
+        """Enclosing type and member of `file:line`; None for unknown files."""
+        rel = self.resolve(file)
+        indexes = self._indexes(rel) if rel is not None else None
+        if indexes is None:
+            return None
+        members, types = indexes
+        member = members.find(line)
+        # A member's owner is the type around its declaration; a line outside
+        # every member is attributed to the type around the line itself.
+        owner = types.find(member[0] if member else line)
+        return MemberLocation(
+            file=rel,
+            owner=owner[2] if owner else None,
+            member=member[2] if member else None,
+            member_line=member[0] if member else None,
+        )
@@ -0,0 +1,526 @@
+"""Loop hot-path smells in method bodies: the usual accidental O(n^2) shapes.
+
+Works on method text that already has comments and strings removed
+(`symbols.code_lines`), so braces and parentheses can be matched directly.
+Each loop is located with its body span — `for`/`while`/`do` statements and
+the closures of iteration calls such as `.map(...)` or `.forEach(...)` — and
+every smell is tagged with the loop nesting depth at its position:
+
+- a loop nested in another loop over the same collection;
+- `contains`/`indexOf`/`lastIndexOf` on a List or Iterable inside a loop (a
+  linear scan per iteration; a Set or Map lookup is constant time);
+- `+=` on a String inside a loop instead of a StringBuffer;
+- `.toList()` followed by more chaining, which materializes an intermediate
+  list the next step only iterates once.
+
+`find_allocations` covers the other common per-call cost: constructing an
+expensive object (a RegExp compiles its pattern, a DateFormat parses its
+skeleton) or a large collection literal inside a method body, so every call
+pays for it again. When every argument is a constant literal the object is
+"hoistable" to a `static final` / top-level `final` (or the literal to
+`const`); calls that take runtime arguments are counted but not flagged.
+
+`find_async_smells` holds async code to the same standard: an `await`
+inside a `for`/`while` loop serializes iterations that may be independent, a
+run of sequential `await`s whose results do not feed each other could start
+together, and an `async` function that never awaits pays for a needless
+Future wrapper and microtask.
+
+There is no type inference. Receiver types come from declarations visible in
+the file (`List<int> ids`, `final seen = <int>{}`, `String out = ''`), and a
+receiver whose type is unknown is not flagged, which keeps false positives
+down at the cost of missing some cases.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+# Declared type names whose `contains`/`indexOf` is a linear scan.
+_LINEAR_TYPES = frozenset({"List", "Iterable", "Queue", "ListQueue"})
+_KIND_ORDER = {"nested": 0, "scan": 1, "concat": 2, "materialize": 3}
+
+_IDENT = r"[A-Za-z_$][\w$]*"
+_TYPED_DECL_RE = re.compile(
+    rf"\b(?P<type>[A-Z][\w$]*)\s*(?:<[^;{{}}()]*?>)?\??\s+(?P<name>{_IDENT})\s*(?=[=;,)])"
+)
+_LITERAL_DECL_RE = re.compile(
+    rf"\b(?:var|final|late)\s+(?P<name>{_IDENT})\s*=\s*(?:const\s+)?"
+    rf"(?P<value><[^;]*?>\s*[\[{{]|[\[{{]|''|[^;]*?\.(?:toList|toSet)\([^()]*\)\s*;)"
+)
+_LOOP_KEYWORD_RE = re.compile(r"\b(?P<kw>for|while)\s*\(|\bdo\s*\{")
+_ITER_CALL_RE = re.compile(
+    rf"(?P<recv>{_IDENT}(?:\s*\.\s*{_IDENT})*)?\s*\.\s*"
+    r"(?:forEach|map|where|expand|any|every|fold|reduce|firstWhere|lastWhere|"
+    r"singleWhere|removeWhere|retainWhere|takeWhile|skipWhile)\s*\("
+)
+_SCAN_RE = re.compile(
+    rf"(?P<recv>{_IDENT}(?:\s*\.\s*{_IDENT})*)\s*\.\s*"
+    r"(?P<method>contains|indexOf|lastIndexOf)\s*\("
+)
+_CONCAT_RE = re.compile(rf"(?<![\w$.])(?P<name>{_IDENT})\s*\+=")
+_MATERIALIZE_RE = re.compile(
+    r"\.toList\([^()]*\)\s*\.\s*(?P<next>map|where|whereType|expand|take|skip|"
+    r"takeWhile|skipWhile|followedBy|toList|toSet|forEach|any|every|fold|reduce|"
+    r"join|contains)\b"
+)
+_FOR_IN_RE = re.compile(r"\bin\s+(?P<iterable>.+)$", re.DOTALL)
+# `i < items.length` as the first bound on the loop variable `i`; the variable
+# comes from the initializer (`int i = 0`) or, failing that, the update (`i++`).
+_FOR_LENGTH_RE = re.compile(
+    rf"^\s*(?P<var>{_IDENT})\s*<=?\s*(?P<iterable>{_IDENT}(?:\.{_IDENT})*)!?\.length\s*$"
+)
+_FOR_INIT_VAR_RE = re.compile(rf"(?P<var>{_IDENT})\s*=(?!=)")
+_FOR_UPDATE_VAR_RE = re.compile(rf"(?:\+\+|--)?\s*(?P<var>{_IDENT})")
+
+
+# Constructors worth hoisting when their arguments are constant, including
+# named constructors (`DateFormat.yMd(...)`). Extend to audit more types.
+EXPENSIVE_TYPES: tuple[str, ...] = (
+    "RegExp",
+    "DateFormat",
+    "NumberFormat",
+    "JsonEncoder",
+    "JsonDecoder",
+)
+# Static members reached through a type name that are not constructors.
+_NOT_CONSTRUCTORS = frozenset({"RegExp.escape", "DateFormat.localeExists"})
+# A non-const collection literal with at least this many constant entries is
+# flagged; smaller ones cost about as much as the hoisted reference.
+MIN_LITERAL_ENTRIES = 8
+
+# After a named-argument label is dropped, what may remain of a constant
+# argument list: strings (already `''`), numbers, bool/null, operators.
+_CONSTANT_ARGS_RE = re.compile(
+    r"^(?:\s|r?''|-?\d[\d_.xXa-fA-FeE]*|true|false|null|const|[-+*,:()\[\]{}<>])*$"
+)
+_NAMED_LABEL_RE = re.compile(rf"\b{_IDENT}\s*:(?!:)")
+_TYPE_ARGS_RE = re.compile(r"<[\w\s,?<>]*>")
+_COLLECTION_START_RE = re.compile(
+    r"(?P<lead>=>|=|\breturn\b|\(|,)\s*(?P<const>const\s+)?"
+    r"(?P<types><[\w\s,?<>]*>\s*)?(?P<open>[\[{])"
+)
+
+
+@dataclass(frozen=True)
+class Allocation:
+    """One expensive construction in a method body."""
+
+    line: int  # 1-based line in the file
+    what: str  # constructor ("RegExp", "DateFormat.yMd") or "Map/Set literal" / "List literal"
+    hoistable: bool  # every argument / entry is a constant literal
+    entries: int = 0  # entry count, for collection literals
+
+
+@dataclass(frozen=True)
+class Smell:
+    """One performance smell in a method body."""
+
+    line: int  # 1-based line in the file
+    depth: int  # loop nesting depth at the smell (0 = outside any loop)
+    kind: str  # nested | scan | concat | materialize
+    message: str
+
+
+@dataclass(frozen=True)
+class _Loop:
+    kind: str  # for | await-for | while | do | call
+    header: int  # offset of the loop keyword or iteration call
+    start: int  # body span [start, end)
+    end: int
+    iterable: str | None
+
+
+def declared_types(code: str) -> dict[str, str]:
+    """Variable name -> declared type name ("List", "Set", "String", ...).
+
+    Literal initializers stand in for a type: `<T>[` / `[` is a List, `{` a Set
+    or Map, `''` a String, and a `.toList()` / `.toSet()` result its type.
+    """
+    types: dict[str, str] = {}
+    for match in _TYPED_DECL_RE.finditer(code):
+        types[match.group("name")] = match.group("type")
+    for match in _LITERAL_DECL_RE.finditer(code):
+        value = match.group("value").rstrip()
+        if value == "''":
+            kind = "String"
+        elif value.endswith(";"):
+            kind = "List" if ".toList(" in value else "Set"
+        else:
+            kind = "List" if value.endswith("[") else "Set"
+        types[match.group("name")] = kind
+    return types
+
+
+def _match(code: str, open_idx: int) -> int:
+    """Index just past the bracket closing the one at `open_idx`."""
+    opener = code[open_idx]
+    closer = {"(": ")", "{": "}", "[": "]"}[opener]
+    depth = 0
+    for idx in range(open_idx, len(code)):
+        char = code[idx]
+        if char == opener:
+            depth += 1
+        elif char == closer:
+            depth -= 1
+            if depth == 0:
+                return idx + 1
+    return len(code)
+
+
+def _statement_end(code: str, start: int) -> int:
+    """Index just past the `;` ending the statement that begins at `start`."""
+    depth = 0
+    for idx in range(start, len(code)):
+        char = code[idx]
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth < 0:
+                return idx
+        elif char == ";" and depth == 0:
+            return idx + 1
+    return len(code)
+
+
+def _normalize(expr: str | None) -> str | None:
+    """Compare iterables by text with whitespace and a trailing `!` dropped."""
+    if not expr:
+        return None
+    text = re.sub(r"\s+", "", expr).rstrip("!")
+    return text if re.fullmatch(rf"{_IDENT}(?:\.{_IDENT})*", text) else None
+
+
+def _counted_iterable(header: str) -> str | None:
+    """`items` for `for (int i = 0; i < items.length; i++)`, else None.
+
+    Only the loop variable's own bound counts: in
+    `for (j = 0; j < width && i + j < bytes.length; j++)` the loop runs to
+    `width`, and `bytes.length` only guards an index built from another
+    variable.
+    """
+    parts = header.split(";")
+    if len(parts) != 3:
+        return None
+    init, condition, update = parts
+    var = _FOR_INIT_VAR_RE.search(init) or _FOR_UPDATE_VAR_RE.match(update)
+    if var is None:
+        return None
+    bound = _FOR_LENGTH_RE.match(re.split(r"&&|\|\|", condition, maxsplit=1)[0])
+    if bound is None or bound.group("var") != var.group("var"):
+        return None
+    return bound.group("iterable")
+
+
+def find_loops(code: str) -> list[_Loop]:
+    """Every loop in `code` with its body span and (when known) its iterable."""
+    loops: list[_Loop] = []
+    for match in _LOOP_KEYWORD_RE.finditer(code):
+        if match.group("kw") is None:  # do { ... } while (...);
+            brace = match.end() - 1
+            loops.append(_Loop("do", match.start(), brace, _match(code, brace), None))
+            continue
+        paren = match.end() - 1
+        header_end = _match(code, paren)
+        header = code[paren + 1 : header_end - 1]
+        rest = code[header_end:]
+        body_start = header_end + len(rest) - len(rest.lstrip())
+        if body_start >= len(code) or code[body_start] == ";":
+            continue  # the `while (...)` tail of a do-while
+        if code[body_start] == "{":
+            body_end = _match(code, body_start)
+        else:
+            body_end = _statement_end(code, body_start)
+        iterable = None
+        if match.group("kw") == "for":
+            for_in = _FOR_IN_RE.search(header) if ";" not in header else None
+            if for_in:
+                iterable = for_in.group("iterable")
+            else:
+                iterable = _counted_iterable(header)
+        kind = match.group("kw")
+        if kind == "for" and code[: match.start()].rstrip().endswith("await"):
+            kind = "await-for"
+        loops.append(_Loop(kind, match.start(), body_start, body_end, _normalize(iterable)))
+    for match in _ITER_CALL_RE.finditer(code):
+        paren = match.end() - 1
+        loops.append(
+            _Loop(
+                "call", match.start(), paren, _match(code, paren), _normalize(match.group("recv"))
+            )
+        )
+    loops.sort(key=lambda loop: loop.header)
+    return loops
+
+
+def find_smells(
+    code: str, first_line: int, types: dict[str, str] | None = None
+) -> list[Smell]:
+    """Smells in one method's cleaned text, which starts at `first_line`.
+
+    `types` maps names declared elsewhere in the file (fields, top-level
+    variables) to their type; declarations inside `code` take precedence.
+    """
+    known = {**(types or {}), **declared_types(code)}
+    loops = find_loops(code)
+
+    def depth_at(pos: int) -> int:
+        return sum(1 for loop in loops if loop.start <= pos < loop.end)
+
+    def line_at(pos: int) -> int:
+        return first_line + code.count("\n", 0, pos)
+
+    smells: list[Smell] = []
+    for loop in loops:
+        if loop.iterable is None:
+            continue
+        outer = [
+            other
+            for other in loops
+            if other is not loop
+            and other.start <= loop.header < other.end
+            and other.iterable == loop.iterable
+        ]
+        if outer:
+            smells.append(
+                Smell(
+                    line_at(loop.header),
+                    depth_at(loop.header) + 1,
+                    "nested",
+                    f"nested loop over {loop.iterable} inside a loop over the same collection",
+                )
+            )
+    for match in _SCAN_RE.finditer(code):
+        depth = depth_at(match.start())
+        receiver = re.sub(r"\s+", "", match.group("recv"))
+        declared = known.get(receiver) or known.get(receiver.rsplit(".", 1)[-1])
+        if depth and declared in _LINEAR_TYPES:
+            smells.append(
+                Smell(
+                    line_at(match.start()),
+                    depth,
+                    "scan",
+                    f"{receiver}.{match.group('method')}() on a {declared} inside a loop "
+                    "(linear scan per iteration; use a Set or Map)",
+                )
+            )
+    for match in _CONCAT_RE.finditer(code):
+        depth = depth_at(match.start())
+        if depth and known.get(match.group("name")) == "String":
+            smells.append(
+                Smell(
+                    line_at(match.start()),
+                    depth,
+                    "concat",
+                    f"String {match.group('name')} += inside a loop (use a StringBuffer)",
+                )
+            )
+    for match in _MATERIALIZE_RE.finditer(code):
+        smells.append(
+            Smell(
+                line_at(match.start()),
+                depth_at(match.start()),
+                "materialize",
+                f".toList().{match.group('next')} materializes an intermediate list",
+            )
+        )
+    smells.sort(key=lambda s: (-s.depth, _KIND_ORDER[s.kind], s.line))
+    return smells
+
+
+def _is_constant(args: str) -> bool:
+    """True when an argument list or literal body holds only constants."""
+    text = _NAMED_LABEL_RE.sub("", _TYPE_ARGS_RE.sub("", args))
+    return bool(_CONSTANT_ARGS_RE.match(text))
+
+
+def _top_level_entries(body: str) -> int:
+    """Comma-separated entries at the top level of a literal's body."""
+    if not body.strip():
+        return 0
+    depth = 0
+    entries = 1
+    for char in body:
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            entries += 1
+    # A trailing comma does not start another entry.
+    return entries - 1 if body.rstrip().endswith(",") else entries
+
+
+def _in_const_context(code: str, pos: int) -> bool:
+    """True when the statement holding `pos` is a `const` declaration or
+    expression, which the compiler canonicalizes instead of allocating."""
+    start = max(code.rfind(ch, 0, pos) for ch in ";{}")
+    return re.search(r"\bconst\b", code[start + 1 : pos]) is not None
+
+
+def find_allocations(
+    code: str, first_line: int, types: tuple[str, ...] = EXPENSIVE_TYPES
+) -> list[Allocation]:
+    """Expensive constructions in one method's text, which starts at `first_line`.
+
+    `code` must come from `symbols.code_lines(..., mark_interpolation=True)`:
+    an interpolated string (`'$'`) is a runtime argument, a plain one (`''`)
+    a constant.
+    """
+    found: list[Allocation] = []
+
+    def line_at(pos: int) -> int:
+        return first_line + code.count("\n", 0, pos)
+
+    call_re = re.compile(
+        rf"(?<![\w$.])(?:new\s+)?(?P<what>(?:{'|'.join(map(re.escape, types))})"
+        rf"(?:\.{_IDENT})?)\s*\("
+    )
+    for match in call_re.finditer(code):
+        if match.group("what") in _NOT_CONSTRUCTORS:
+            continue
+        # `x ??= RegExp(...)` already caches the object.
+        if code[: match.start()].rstrip().endswith("??=") or _in_const_context(
+            code, match.start()
+        ):
+            continue
+        paren = match.end() - 1
+        args = code[paren + 1 : _match(code, paren) - 1]
+        found.append(Allocation(line_at(match.start()), match.group("what"), _is_constant(args)))
+
+    for match in _COLLECTION_START_RE.finditer(code):
+        opener = match.start("open")
+        if match.group("const") or _in_const_context(code, opener):
+            continue
+        body = code[opener + 1 : _match(code, opener) - 1]
+        entries = _top_level_entries(body)
+        if entries < MIN_LITERAL_ENTRIES or not _is_constant(body):
+            continue
+        what = "List literal" if code[opener] == "[" else "Map/Set literal"
+        found.append(Allocation(line_at(opener), what, True, entries))
+    found.sort(key=lambda a: a.line)
+    return found
+
+
+_AWAIT_RE = re.compile(r"\bawait\b")
+_NOT_SERIAL_AWAIT_RE = re.compile(
+    rf"\s+(?:{_IDENT}(?:\[[^\]]*\])?\s*[;)]|Future(?:<[^>]*>)?\.(?:wait|any|delayed)\b"
+    rf"|\([^;]*\)\.wait\b)"
+)
+_EARLY_EXIT_RE = re.compile(r"\b(?:return|break)\b")
+_AWAIT_BINDING_RE = re.compile(
+    rf"(?:(?:final|var|late)\s+)?(?:{_IDENT}(?:<[^;=]*?>)?\??\s+)?"
+    rf"(?P<name>{_IDENT})\s*=\s*await\b"
+)
+
+
+def _body_start(code: str) -> int | None:
+    """Offset of the body (`{` or `=>`) after the signature, at paren depth 0."""
+    depth = 0
+    for idx, char in enumerate(code):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0 and (char == "{" or code.startswith("=>", idx)):
+            return idx
+    return None
+
+
+def _await_runs(code: str) -> list[list[tuple[int, str, int]]]:
+    """Runs of consecutive `x = await ...;` statements that do not depend on
+    each other. Each entry is (offset, bound name, statement end)."""
+    runs: list[list[tuple[int, str, int]]] = []
+    current: list[tuple[int, str, int]] = []
+    previous_end = -1
+    for match in _AWAIT_BINDING_RE.finditer(code):
+        # Only whole statements: the binding must open its statement.
+        before = code[: match.start()].rstrip()
+        if before and before[-1] not in ";{}":
+            continue
+        end = _statement_end(code, match.end())
+        awaited = code[match.end() : end]
+        adjacent = previous_end >= 0 and not code[previous_end : match.start()].strip()
+        depends = any(re.search(rf"\b{re.escape(name)}\b", awaited) for _o, name, _e in current)
+        if not adjacent or depends:
+            if len(current) > 1:
+                runs.append(current)
+            current = []
+        current.append((match.start(), match.group("name"), end))
+        previous_end = end
+    if len(current) > 1:
+        runs.append(current)
+    return runs
+
+
+def find_async_smells(code: str, first_line: int) -> list[Smell]:
+    """Async smells in one method's cleaned text, which starts at `first_line`."""
+    loops = find_loops(code)
+
+    def line_at(pos: int) -> int:
+        return first_line + code.count("\n", 0, pos)
+
+    smells: list[Smell] = []
+    body = _body_start(code)
+    if body is not None:
+        signature = code[:body]
+        is_async = re.search(r"\basync\s*$", signature) is not None
+        if is_async and not _AWAIT_RE.search(code, body):
+            smells.append(
+                Smell(
+                    line_at(0),
+                    0,
+                    "async-no-await",
+                    "async function with no await (drop async and return the value "
+                    "or Future directly to skip the extra Future and microtask)",
+                )
+            )
+
+    for match in _AWAIT_RE.finditer(code):
+        # `await for` is the stream loop itself, not an await inside one.
+        if re.match(r"\s*for\b", code[match.end() :]):
+            continue
+        # Awaiting an already-started future (`await future`), a combinator
+        # that is concurrent already, or a deliberate delay is not a smell.
+        if _NOT_SERIAL_AWAIT_RE.match(code, match.end()):
+            continue
+        statement_loops = [
+            loop
+            for loop in loops
+            if loop.kind in ("for", "while", "do") and loop.start <= match.start() < loop.end
+        ]
+        if not statement_loops:
+            continue
+        # A loop that can stop on an awaited outcome (retry, poll, search) is
+        # sequential by design: the next iteration depends on this one.
+        if any(_EARLY_EXIT_RE.search(code, l.start, l.end) for l in statement_loops):
+            continue
+        loop = statement_loops[-1]
+        if loop.kind == "for":
+            hint = "Future.wait(items.map(...)) runs independent iterations concurrently"
+        else:
+            hint = "if iterations are independent, collect the futures and Future.wait them"
+        smells.append(
+            Smell(
+                line_at(match.start()),
+                len(statement_loops),
+                "await-loop",
+                f"await inside a {loop.kind} loop runs iterations one at a time ({hint})",
+            )
+        )
+
+    for run in _await_runs(code):
+        names = ", ".join(name for _offset, name, _end in run)
+        smells.append(
+            Smell(
+                line_at(run[0][0]),
+                0,
+                "await-run",
+                f"{len(run)} independent sequential awaits ({names}); start them together "
+                f"with `final ({names}) = await (f1, f2, ...).wait` or Future.wait",
+            )
+        )
+    smells.sort(key=lambda s: s.line)
+    return smells
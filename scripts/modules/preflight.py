@@ -0,0 +1,232 @@
+"""Concurrent preflight probes: tools, gh auth, remote sync, remote tags.
+
+Every probe here is a subprocess that waits on the network or on another
+process (`gh auth status` calls the GitHub API, `git fetch` and
+`git ls-remote` round-trip to origin). Run serially they cost the SUM of their
+latencies — tens of seconds on a slow VPN link. They are independent of each
+other, so they are awaited together through the async runner
+(`run.run_async`) and the stage costs roughly the slowest single round-trip.
+
+Each network probe is bounded by `PROBE_TIMEOUT_SECONDS`: a hung remote
+(a stalled VPN, a credential prompt nobody will answer) reads as a failed
+probe instead of stalling the publish before it prints anything.
+
+The probes only COLLECT facts. Deciding what is fatal stays with the numbered
+workflow steps (`check_prerequisites`, `check_remote_sync`) and the tag guard
+in `publish.main()`, which read the collected `PreflightResult` instead of
+re-running the commands.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import run as run_mod
+from . import ui
+
+# (tool, install hint) for every executable the publish workflow shells out to.
+REQUIRED_TOOLS = (
+    ("flutter", "Install from https://flutter.dev"),
+    ("git", "Install from https://git-scm.com"),
+    ("gh", "Install from https://cli.github.com"),
+)
+# Per-command limit for the probes that go over the network.
+PROBE_TIMEOUT_SECONDS = 30.0
+
+
+@dataclass
+class RemoteSync:
+    """Outcome of `git fetch` plus the ahead/behind count against origin."""
+
+    fetched: bool
+    ahead: int = 0
+    behind: int = 0
+
+
+@dataclass
+class PreflightResult:
+    """Everything the startup probes learned, gathered in one pass."""
+
+    branch: str
+    remote_url: str
+    missing_tools: list[tuple[str, str]]
+    # None when `gh` itself is missing (auth was never probed).
+    gh_auth: subprocess.CompletedProcess | None
+    sync: RemoteSync
+    # Tag names on origin (e.g. "v1.6.3"), or None when `ls-remote` failed.
+    remote_tags: frozenset[str] | None
+
+    @property
+    def gh_authenticated(self) -> bool:
+        """True when `gh auth status` ran and succeeded."""
+        return self.gh_auth is not None and self.gh_auth.returncode == 0
+
+    def tag_on_remote(self, tag_name: str) -> bool:
+        """True when origin already has `tag_name`.
+
+        An unreadable tag list reads as "not present", matching the old inline
+        probe, which only blocked on a successful non-empty `ls-remote`.
+        """
+        return self.remote_tags is not None and tag_name in self.remote_tags
+
+    def failures(self) -> list[str]:
+        """Every preflight problem as a one-line message, in display order."""
+        problems = [f"{tool} not found. {hint}" for tool, hint in self.missing_tools]
+        if self.gh_auth is not None and self.gh_auth.returncode != 0:
+            problems.append("GitHub CLI is not authenticated (run 'gh auth login').")
+        if not self.sync.fetched:
+            problems.append(f"Could not fetch origin/{self.branch}.")
+        if self.sync.behind > 0:
+            problems.append(
+                f"Local branch is behind remote by {self.sync.behind} commit(s)."
+            )
+        if self.remote_tags is None:
+            problems.append("Could not list remote tags (tag guard is unverified).")
+        return problems
+
+
+async def _network_probe(cmd: list[str], project_dir: Path) -> subprocess.CompletedProcess:
+    """`run_async` with the probe timeout; a timeout becomes a failed result."""
+    try:
+        return await run_mod.run_async(cmd, project_dir, timeout=PROBE_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        return subprocess.CompletedProcess(
+            cmd, -1, "", f"timed out after {PROBE_TIMEOUT_SECONDS:g}s"
+        )
+
+
+async def _current_branch(project_dir: Path) -> str:
+    """Current branch name, defaulting to "main" like `get_current_branch`."""
+    result = await run_mod.run_async(
+        ["git", "rev-parse", "--abbrev-ref", "HEAD"], project_dir
+    )
+    if result.returncode == 0:
+        return result.stdout.strip()
+    return "main"
+
+
+async def _remote_url(project_dir: Path) -> str:
+    """The origin URL, or "" when there is no origin remote."""
+    result = await run_mod.run_async(
+        ["git", "remote", "get-url", "origin"], project_dir
+    )
+    if result.returncode == 0:
+        return result.stdout.strip()
+    return ""
+
+
+async def _probe_remote_sync(project_dir: Path, branch: str) -> RemoteSync:
+    """Fetch `branch` from origin and count commits ahead of / behind it.
+
+    A single `rev-list --left-right --count HEAD...origin/<branch>` replaces the
+    former pair of one-sided counts: the left column is commits only on HEAD
+    (ahead), the right column commits only on origin (behind).
+    """
+    result = await _network_probe(["git", "fetch", "origin", branch], project_dir)
+    if result.returncode != 0:
+        return RemoteSync(fetched=False)
+
+    result = await run_mod.run_async(
+        ["git", "rev-list", "--left-right", "--count", f"HEAD...origin/{branch}"],
+        project_dir,
+    )
+    parts = result.stdout.split() if result.returncode == 0 else []
+    if len(parts) != 2 or not all(p.isdigit() for p in parts):
+        # Fetched, but origin/<branch> is not comparable (e.g. a brand-new
+        # branch): treat as in sync, the same as the old empty-output path.
+        return RemoteSync(fetched=True)
+    return RemoteSync(fetched=True, ahead=int(parts[0]), behind=int(parts[1]))
+
+
+def probe_remote_sync(project_dir: Path, branch: str) -> RemoteSync:
+    """Blocking form of the remote-sync probe, for step 3 when the preflight
+    counts are stale or missing."""
+    return asyncio.run(_probe_remote_sync(project_dir, branch))
+
+
+async def _branch_and_sync(project_dir: Path) -> tuple[str, RemoteSync]:
+    """Resolve the branch, then probe its sync state (the fetch needs the name)."""
+    branch = await _current_branch(project_dir)
+    return branch, await _probe_remote_sync(project_dir, branch)
+
+
+async def _remote_tags(project_dir: Path) -> frozenset[str] | None:
+    """List every `v*` tag on origin in one `ls-remote` round-trip.
+
+    Listing the whole set (instead of probing `refs/tags/v<version>`) lets the
+    probe run before the release version is settled — the [Unreleased] bump
+    prompt may still change it — while the later guard is a set lookup.
+    """
+    result = await _network_probe(
+        ["git", "ls-remote", "--tags", "origin", "refs/tags/v*"], project_dir
+    )
+    if result.returncode != 0:
+        return None
+    tags: set[str] = set()
+    for line in result.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 2 or not parts[1].startswith("refs/tags/"):
+            continue
+        # Annotated tags are listed twice: the tag itself and its peeled `^{}`.
+        tags.add(parts[1][len("refs/tags/") :].removesuffix("^{}"))
+    return frozenset(tags)
+
+
+async def _gh_auth(project_dir: Path) -> subprocess.CompletedProcess:
+    """`gh auth status`, the one probe that talks to the GitHub API."""
+    return await _network_probe(["gh", "auth", "status"], project_dir)
+
+
+async def _gather_preflight(
+    project_dir: Path, missing_tools: list[tuple[str, str]]
+) -> PreflightResult:
+    """Await every network-bound probe at once and combine the results."""
+    gh_present = all(tool != "gh" for tool, _ in missing_tools)
+    auth_probe = _gh_auth(project_dir) if gh_present else asyncio.sleep(0)
+    (branch, sync), remote_url, remote_tags, gh_auth = await asyncio.gather(
+        _branch_and_sync(project_dir),
+        _remote_url(project_dir),
+        _remote_tags(project_dir),
+        auth_probe,
+    )
+    return PreflightResult(
+        branch=branch,
+        remote_url=remote_url,
+        missing_tools=missing_tools,
+        gh_auth=gh_auth,
+        sync=sync,
+        remote_tags=remote_tags,
+    )
+
+
+def run_preflight(project_dir: Path) -> PreflightResult:
+    """Run every startup probe concurrently and return the combined result.
+
+    `shutil.which` lookups are local and instant, so they run inline first:
+    they decide whether `gh auth status` can be probed at all.
+    """
+    missing_tools = [
+        (tool, hint)
+        for tool, hint in REQUIRED_TOOLS
+        if not run_mod.command_exists(tool)
+    ]
+    return asyncio.run(_gather_preflight(project_dir, missing_tools))
+
+
+def report_preflight(result: PreflightResult) -> None:
+    """Print every preflight problem at once, as warnings.
+
+    Nothing here aborts: the numbered steps still own the fatal decisions. The
+    point is that the operator sees ALL problems up front (missing tool, stale
+    auth, branch behind origin) instead of fixing them one rerun at a time.
+    """
+    problems = result.failures()
+    if not problems:
+        ui.print_success("Preflight checks passed (tools, gh auth, remote sync, tags)")
+        return
+    ui.print_warning(f"Preflight found {len(problems)} problem(s):")
+    for problem in problems:
+        ui.print_colored(f"      - {problem}", ui.Color.YELLOW)
@@ -0,0 +1,223 @@
+"""Release several interdependent packages in dependency order, in parallel.
+
+Each package is published by its own headless `publish.py` run (the
+package's `scripts/publish.py` when it has one, otherwise this repository's
+with `--project-dir`), so every package gets the full audit and workflow,
+including the final `verify_published` gate: a run exits 0 only once pub.dev
+serves the new version.
+
+The train is a DAG built from each `pubspec.yaml`'s `dependencies` (hosted,
+path or git; only edges to packages in the train count). `dev_dependencies`
+are left out: a consumer never resolves them, so they impose no publish
+order, and two packages that test against each other would otherwise form a
+cycle and stop the train. `graphlib.TopologicalSorter` hands out every
+package whose upstreams have all been confirmed on pub.dev, and those run
+concurrently, so the train takes about as long as its longest dependency
+chain rather than the sum of all packages. A failed package stops its
+dependents; independent branches carry on.
+
+Concurrent runs would interleave on the terminal, so each run's output goes
+to its own log file and the terminal gets one line per start and finish.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+from time import perf_counter
+
+from . import run as run_mod
+from . import version_changelog as vc
+
+# The publisher used for packages without their own scripts/publish.py.
+_OWN_PUBLISHER = Path(__file__).resolve().parent.parent / "publish.py"
+# A top-level key (`dependencies:`) and a package entry two spaces under it.
+_SECTION_RE = re.compile(r"^(\w+):")
+_DEP_RE = re.compile(r"^  (\w+):")
+
+
+@dataclass(frozen=True)
+class Package:
+    """One package root in the train and the package names it depends on."""
+
+    name: str
+    root: Path
+    version: str
+    depends_on: frozenset[str]
+
+
+@dataclass
+class TrainResult:
+    """Outcome of one package's publish run."""
+
+    package: str
+    exit_code: int | None = None  # None: never started (an upstream failed)
+    seconds: float = 0.0
+    log: Path | None = None
+    summary: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+
+def dependency_names(pubspec_text: str) -> set[str]:
+    """Package names under `dependencies:` (not `dev_dependencies:`)."""
+    names: set[str] = set()
+    section = None
+    for line in pubspec_text.splitlines():
+        top = _SECTION_RE.match(line)
+        if top:
+            section = top.group(1)
+            continue
+        dep = _DEP_RE.match(line)
+        if dep and section == "dependencies":
+            names.add(dep.group(1))
+    return names
+
+
+def read_package(root: Path) -> Package:
+    """Parse `root/pubspec.yaml`; raises ValueError when it is missing or unnamed."""
+    pubspec = root / "pubspec.yaml"
+    try:
+        text = pubspec.read_text(encoding="utf-8")
+    except OSError as e:
+        raise ValueError(f"{pubspec}: {e}") from e
+    return Package(
+        name=vc.get_package_name(pubspec),
+        root=root,
+        version=vc.get_version_from_pubspec(pubspec),
+        depends_on=frozenset(dependency_names(text)),
+    )
+
+
+def build_graph(packages: list[Package]) -> dict[str, set[str]]:
+    """name -> names of in-train packages it depends on."""
+    names = {package.name for package in packages}
+    if len(names) != len(packages):
+        raise ValueError("two package roots declare the same package name")
+    return {
+        package.name: {dep for dep in package.depends_on if dep in names and dep != package.name}
+        for package in packages
+    }
+
+
+def _sorter(graph: dict[str, set[str]]) -> TopologicalSorter:
+    sorter = TopologicalSorter(graph)
+    try:
+        sorter.prepare()
+    except CycleError as e:
+        raise ValueError(f"dependency cycle: {' -> '.join(e.args[1])}") from e
+    return sorter
+
+
+def waves(graph: dict[str, set[str]]) -> list[list[str]]:
+    """Packages grouped by dependency depth (each wave can run in parallel).
+
+    Raises ValueError on a dependency cycle.
+    """
+    sorter = _sorter(graph)
+    result = []
+    while sorter.is_active():
+        ready = sorted(sorter.get_ready())
+        result.append(ready)
+        sorter.done(*ready)
+    return result
+
+
+def publish_command(root: Path, publish_args: list[str], summary_path: Path) -> list[str]:
+    """Headless publish command line for the package at `root`."""
+    own = root / "scripts" / "publish.py"
+    if own.is_file():
+        cmd = [sys.executable, str(own)]
+    else:
+        cmd = [sys.executable, str(_OWN_PUBLISHER), "--project-dir", str(root)]
+    return [*cmd, *publish_args, "--summary-json", str(summary_path)]
+
+
+def _publish_one(package: Package, publish_args: list[str], log_dir: Path) -> TrainResult:
+    log_path = log_dir / f"{package.name}.log"
+    summary_path = log_dir / f"{package.name}.summary.json"
+    started = perf_counter()
+    with log_path.open("w", encoding="utf-8") as log:
+        result = run_mod.run_streaming(
+            publish_command(package.root, publish_args, summary_path),
+            package.root,
+            on_line=lambda line: log.write(line + "\n"),
+        )
+    try:
+        summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        summary = {}
+    return TrainResult(
+        package=package.name,
+        exit_code=result.returncode,
+        seconds=perf_counter() - started,
+        log=log_path,
+        summary=summary,
+    )
+
+
+def run_train(
+    packages: list[Package],
+    publish_args: list[str],
+    log_dir: Path,
+    jobs: int | None = None,
+    on_event: Callable[[str], None] | None = None,
+) -> dict[str, TrainResult]:
+    """Publish every package, each as soon as its upstreams are on pub.dev.
+
+    `publish_args` are the headless flags passed to every run (`--mode ...`).
+    `on_event(message)` receives start / finish / skip lines. Returns a result
+    per package; packages downstream of a failure have `exit_code` None.
+    """
+    graph = build_graph(packages)
+    by_name = {package.name: package for package in packages}
+    sorter = _sorter(graph)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    results = {name: TrainResult(package=name) for name in graph}
+    blocked: set[str] = set()
+
+    def emit(message: str) -> None:
+        if on_event is not None:
+            on_event(message)
+
+    running: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=jobs or len(packages) or 1) as pool:
+        while sorter.is_active():
+            for name in sorted(sorter.get_ready()):
+                failed = sorted(graph[name] & blocked)
+                if failed:
+                    # Never started; its own dependents are blocked in turn.
+                    blocked.add(name)
+                    emit(f"{name}: skipped (upstream {', '.join(failed)} failed)")
+                    sorter.done(name)
+                    continue
+                emit(f"{name} {by_name[name].version}: started")
+                running[pool.submit(_publish_one, by_name[name], publish_args, log_dir)] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except OSError as e:
+                    results[name] = TrainResult(package=name, exit_code=-1)
+                    emit(f"{name}: could not run publisher ({e})")
+                if results[name].ok:
+                    emit(f"{name}: published ({results[name].seconds:.0f}s)")
+                else:
+                    blocked.add(name)
+                    emit(
+                        f"{name}: FAILED with exit {results[name].exit_code} "
+                        f"(log: {results[name].log})"
+                    )
+                sorter.done(name)
+    return results
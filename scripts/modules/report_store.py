@@ -0,0 +1,294 @@
+"""Self-contained store for generated reports under reports/.
+
+Every audit run used to add a new `reports/<yyyymmdd>/<timestamp>_<kind>.txt`,
+including each retry that produced the same text, and nothing ever removed
+them. The store keeps the folder bounded:
+
+- `write_report` skips the write when the text hashes the same as the previous
+  report of that kind, and returns the earlier path instead.
+- Each write is recorded in a compact index (reports/_cache/report_index.json)
+  by date, version and content hash, so "which report belongs to 1.6.3" is a
+  lookup instead of a tree walk.
+- `maintain` scans the tree once with `os.scandir`, then compresses reports
+  older than N days (gzip or xz, written to a temp file and swapped in with
+  `os.replace`), deletes those past the age limit, trims the oldest until the
+  total fits the size budget, and prunes emptied date folders.
+
+Only timestamped report files (`yyyymmdd_HHMMSS_*`) are touched; `_cache/`,
+`git_report/` and anything else in reports/ are left alone.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from . import atomic_file
+
+INDEX_VERSION = 1
+INDEX_RELATIVE_PATH = Path("_cache") / "report_index.json"
+
+# Retention defaults, overridable per `maintain` call.
+COMPRESS_AFTER_DAYS = 7
+DELETE_AFTER_DAYS = 180
+MAX_TOTAL_BYTES = 100 * 1024 * 1024
+
+# Compression codec name -> (file suffix, opener).
+CODECS = {"gzip": (".gz", gzip.open), "xz": (".xz", lzma.open)}
+
+# Directories under reports/ that hold state, not timestamped reports.
+_SKIP_DIRS = frozenset({"_cache", "git_report", "__pycache__"})
+_REPORT_NAME_RE = re.compile(r"^(\d{8}_\d{6})_(.+?)\.\w+(?:\.gz|\.xz)?$")
+_COMPRESSED_SUFFIXES = tuple(suffix for suffix, _opener in CODECS.values())
+
+
+@dataclass
+class MaintenanceResult:
+    """What one `maintain` pass changed."""
+
+    scanned: int = 0
+    compressed: int = 0
+    deleted: int = 0
+    freed_bytes: int = 0
+    pruned_dirs: int = 0
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_index(reports_root: Path) -> list[dict]:
+    """Index entries oldest first, or [] when missing or unreadable."""
+    try:
+        data = json.loads((reports_root / INDEX_RELATIVE_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if data.get("version") != INDEX_VERSION:
+        return []
+    return list(data.get("reports", []))
+
+
+def _save_index(reports_root: Path, entries: list[dict]) -> None:
+    path = reports_root / INDEX_RELATIVE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": INDEX_VERSION, "reports": entries}
+    atomic_file.write_bytes(path, json.dumps(payload, indent=1).encode("utf-8"))
+
+
+def reports_for_version(reports_root: Path, version: str) -> list[Path]:
+    """Every indexed report written while the package was at `version`."""
+    return [
+        reports_root / entry["path"]
+        for entry in load_index(reports_root)
+        if entry.get("version") == version
+    ]
+
+
+def reports_on(reports_root: Path, day: str) -> list[Path]:
+    """Every indexed report written on `day` (yyyymmdd)."""
+    return [
+        reports_root / entry["path"]
+        for entry in load_index(reports_root)
+        if entry.get("date") == day
+    ]
+
+
+def write_report(
+    reports_root: Path, kind: str, text: str, version: str | None = None
+) -> tuple[Path, bool]:
+    """Write `text` as a new `<kind>` report unless it repeats the last one.
+
+    Returns (path, written). When the content hash matches the most recent
+    indexed report of the same kind and that file still exists, nothing is
+    written and its path is returned with written=False.
+    """
+    digest = _sha256(text)
+    entries = load_index(reports_root)
+    previous = next((e for e in reversed(entries) if e.get("kind") == kind), None)
+    if previous is not None and previous.get("sha256") == digest:
+        previous_path = reports_root / previous["path"]
+        if previous_path.exists():
+            return previous_path, False
+
+    now = datetime.now()
+    report_dir = reports_root / now.strftime("%Y%m%d")
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f"{now.strftime('%Y%m%d_%H%M%S')}_{kind}.txt"
+    data = text.encode("utf-8")
+    atomic_file.write_bytes(report_path, data)
+
+    entries.append(
+        {
+            "path": report_path.relative_to(reports_root).as_posix(),
+            "kind": kind,
+            "date": now.strftime("%Y%m%d"),
+            "created": now.isoformat(timespec="seconds"),
+            "version": version,
+            "sha256": digest,
+            "bytes": len(data),
+        }
+    )
+    _save_index(reports_root, entries)
+    return report_path, True
+
+
+def _scan_reports(reports_root: Path) -> list[os.DirEntry]:
+    """Every timestamped report file under `reports_root`, in one scandir walk."""
+    found: list[os.DirEntry] = []
+    stack = [str(reports_root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _SKIP_DIRS:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and _REPORT_NAME_RE.match(
+                    entry.name
+                ):
+                    found.append(entry)
+    return found
+
+
+def _compress(path: Path, codec: str) -> Path:
+    """Compress `path` next to itself and remove the original."""
+    suffix, opener = CODECS[codec]
+    target = path.with_name(path.name + suffix)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp.", suffix=suffix)
+    os.close(fd)
+    try:
+        with path.open("rb") as src, opener(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        shutil.copystat(path, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    path.unlink()
+    return target
+
+
+def maintain(
+    reports_root: Path,
+    compress_after_days: float = COMPRESS_AFTER_DAYS,
+    delete_after_days: float = DELETE_AFTER_DAYS,
+    max_total_bytes: int = MAX_TOTAL_BYTES,
+    codec: str = "gzip",
+) -> MaintenanceResult:
+    """Apply the compression and retention policy to every stored report.
+
+    The newest report of each kind is never deleted by the size budget, so the
+    latest audit always survives. Index entries follow their files: compressed
+    or moved ones are re-pointed, deleted ones are dropped.
+    """
+    result = MaintenanceResult()
+    if not reports_root.is_dir():
+        return result
+    now = time.time()
+    entries = _scan_reports(reports_root)
+    result.scanned = len(entries)
+
+    # (mtime, size, path) for everything that survives age-based deletion.
+    kept: list[tuple[float, int, Path]] = []
+    for entry in entries:
+        stat = entry.stat(follow_symlinks=False)
+        path = Path(entry.path)
+        age_days = (now - stat.st_mtime) / 86400
+        if age_days > delete_after_days:
+            path.unlink(missing_ok=True)
+            result.deleted += 1
+            result.freed_bytes += stat.st_size
+            continue
+        if age_days > compress_after_days and not entry.name.endswith(
+            _COMPRESSED_SUFFIXES
+        ):
+            target = _compress(path, codec)
+            result.compressed += 1
+            new_size = target.stat().st_size
+            result.freed_bytes += stat.st_size - new_size
+            kept.append((stat.st_mtime, new_size, target))
+            continue
+        kept.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _mtime, size, _path in kept)
+    if total > max_total_bytes:
+        newest_by_kind: dict[str, Path] = {}
+        for _mtime, _size, path in sorted(kept, key=lambda k: k[0]):
+            newest_by_kind[_REPORT_NAME_RE.match(path.name).group(2)] = path
+        protected = set(newest_by_kind.values())
+        for _mtime, size, path in sorted(kept, key=lambda k: k[0]):
+            if total <= max_total_bytes:
+                break
+            if path in protected:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            result.deleted += 1
+            result.freed_bytes += size
+
+    located = {
+        _base_name(path.name): path for _mtime, _size, path in kept if path.exists()
+    }
+    result.pruned_dirs = _prune_empty_dirs(reports_root)
+    _reconcile_index(reports_root, located)
+    return result
+
+
+def _prune_empty_dirs(reports_root: Path) -> int:
+    """Remove report folders left empty (deepest first); returns the count."""
+    removed = 0
+    for dirpath, _dirnames, _filenames in os.walk(reports_root, topdown=False):
+        path = Path(dirpath)
+        if path == reports_root or _SKIP_DIRS.intersection(
+            path.relative_to(reports_root).parts
+        ):
+            continue
+        try:
+            path.rmdir()  # Fails (and is skipped) unless the folder is empty.
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _base_name(name: str) -> str:
+    """Report file name without a compression suffix."""
+    for suffix in _COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _reconcile_index(reports_root: Path, located: dict[str, Path]) -> None:
+    """Re-point index entries at where their file now lives; drop lost ones.
+
+    `located` maps each surviving report's uncompressed name to its current
+    path, so compressed reports and ones moved by `organize_reports.py` keep
+    their index entry. Timestamped names are unique, so the name is the key.
+    """
+    entries = load_index(reports_root)
+    if not entries:
+        return
+    kept = []
+    changed = False
+    for entry in entries:
+        current = located.get(_base_name(Path(entry["path"]).name))
+        if current is None:
+            changed = True
+            continue
+        rel = current.relative_to(reports_root).as_posix()
+        if rel != entry["path"]:
+            entry["path"] = rel
+            changed = True
+        kept.append(entry)
+    if changed:
+        _save_index(reports_root, kept)
@@ -1,7 +1,14 @@
 """Command execution and PATH checks."""
 
+import asyncio
+import os
 import shutil
 import subprocess
+import sys
+import weakref
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from pathlib import Path
 
 from . import platform as platform_mod
@@ -63,3 +70,215 @@ def run_capture(
         encoding="utf-8",
         errors="replace",
     )
+
+
+# Lines of output kept for error display by `run_streaming`. Enough to hold a
+# failing test's stack trace or dartdoc's crash frame, small enough that a
+# multi-megabyte `flutter test` log never accumulates in memory.
+STREAM_TAIL_LINES = 200
+
+
+@dataclass
+class StreamResult:
+    """Outcome of `run_streaming`: exit code plus the bounded output tail."""
+
+    returncode: int
+    # The last `tail_limit` lines (stdout and stderr interleaved), oldest first.
+    tail: list[str]
+    # Total lines seen, including those that scrolled out of `tail`.
+    line_count: int
+
+    @property
+    def output(self) -> str:
+        """The retained tail joined back into text."""
+        return "\n".join(self.tail)
+
+
+def run_streaming(
+    cmd: list[str],
+    cwd: Path,
+    on_line: Callable[[str], None] | None = None,
+    tail_limit: int = STREAM_TAIL_LINES,
+) -> StreamResult:
+    """Run a command, handing each output line to `on_line` as it arrives.
+
+    Unlike `run_capture`, output is never held whole: stderr is merged into
+    stdout, every line is passed to `on_line` (live progress, incremental
+    parsing) and only the last `tail_limit` lines are kept in a ring buffer for
+    error display. Memory stays flat however much the tool prints.
+    """
+    tail: deque[str] = deque(maxlen=tail_limit)
+    line_count = 0
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        shell=platform_mod.get_shell_mode(),
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    ) as proc:
+        assert proc.stdout is not None
+        for raw in proc.stdout:
+            line = raw.rstrip("\r\n")
+            line_count += 1
+            tail.append(line)
+            if on_line is not None:
+                on_line(line)
+        returncode = proc.wait()
+    return StreamResult(returncode=returncode, tail=list(tail), line_count=line_count)
+
+
+class ProgressLine:
+    """`on_line` callback that shows the latest output on one rewritten line.
+
+    Long-running tools (`flutter test`, `dart doc`) print thousands of lines;
+    echoing them all buries the step's own messages, while printing nothing
+    looks like a hang. Overwriting a single terminal line shows the tool is
+    alive. Call `finish()` once the command exits to release the line.
+    """
+
+    def __init__(self, width: int = 100) -> None:
+        self._width = width
+        self._shown = False
+
+    def __call__(self, line: str) -> None:
+        text = line.strip()
+        if not text:
+            return
+        sys.stdout.write(f"\r      {text[: self._width]:<{self._width}}")
+        sys.stdout.flush()
+        self._shown = True
+
+    def finish(self) -> None:
+        """End the progress line so the next print starts on a fresh line."""
+        if self._shown:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+            self._shown = False
+
+
+# Default cap on concurrently running child processes for the async API. The
+# publish tooling mixes cheap git calls with heavyweight dart/flutter runs, so
+# letting every queued command start at once would oversubscribe the machine.
+DEFAULT_CONCURRENCY = max(2, os.cpu_count() or 2)
+
+_concurrency_limit = DEFAULT_CONCURRENCY
+# One semaphore per event loop: an asyncio.Semaphore binds to the loop that
+# first waits on it, and each `asyncio.run` call starts a fresh loop.
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def set_concurrency_limit(limit: int) -> None:
+    """Set how many child processes `run_async` may run at once (global)."""
+    global _concurrency_limit
+    if limit < 1:
+        raise ValueError(f"concurrency limit must be >= 1, got {limit}")
+    _concurrency_limit = limit
+    _semaphores.clear()
+
+
+def _loop_semaphore() -> asyncio.Semaphore:
+    """The global concurrency semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(_concurrency_limit)
+        _semaphores[loop] = sem
+    return sem
+
+
+async def _spawn(cmd: list[str], cwd: Path) -> asyncio.subprocess.Process:
+    """Start `cmd` with piped output, honoring `platform.get_shell_mode()`.
+
+    Windows needs a shell to resolve `flutter.bat` and friends, so there the
+    argument list is quoted into one command line for the shell.
+    """
+    if platform_mod.get_shell_mode():
+        return await asyncio.create_subprocess_shell(
+            subprocess.list2cmdline(cmd),
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    """Kill a child that is still running and reap it."""
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+
+async def run_async(
+    cmd: list[str],
+    cwd: Path,
+    timeout: float | None = None,
+) -> subprocess.CompletedProcess:
+    """Async counterpart of `run_capture`: run a command, capture its output.
+
+    Waits on the global concurrency semaphore before starting the process.
+    On `timeout` (seconds) the child is killed and `subprocess.TimeoutExpired`
+    raised, as `subprocess.run(timeout=...)` does; if the awaiting task is
+    cancelled, the child is killed before the cancellation propagates, so an
+    abandoned command never outlives its caller.
+    """
+    async with _loop_semaphore():
+        proc = await _spawn(cmd, cwd)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill(proc)
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+        except asyncio.CancelledError:
+            await _kill(proc)
+            raise
+    return subprocess.CompletedProcess(
+        cmd,
+        proc.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def gather_commands(
+    cmds: Sequence[list[str]],
+    cwd: Path,
+    timeout: float | None = None,
+) -> list[subprocess.CompletedProcess]:
+    """Run several commands concurrently; results come back in input order.
+
+    `timeout` applies to each command separately. If any command raises (a
+    timeout, a missing executable), the others are cancelled — and their
+    processes killed — before the error propagates.
+    """
+    tasks = [asyncio.ensure_future(run_async(cmd, cwd, timeout)) for cmd in cmds]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def run_concurrently(
+    cmds: Sequence[list[str]],
+    cwd: Path,
+    timeout: float | None = None,
+) -> list[subprocess.CompletedProcess]:
+    """Blocking wrapper around `gather_commands` for synchronous callers."""
+    return asyncio.run(gather_commands(cmds, cwd, timeout))
@@ -0,0 +1,34 @@
+"""Open the small SQLite databases under reports/_cache/.
+
+Audit history and test timings each keep their own database with their own
+schema; this is the shared open: create the parent directory, enable foreign
+keys, apply the (idempotent, `CREATE ... IF NOT EXISTS`) schema, stamp its
+version, and run the caller's work in one transaction.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def connect(
+    path: Path, schema: str, schema_version: int, wal: bool = False
+) -> Iterator[sqlite3.Connection]:
+    """Open (creating if needed) the database at `path`; commits on success.
+
+    `wal` switches to write-ahead logging, so a reader (a query script) does
+    not block the writer.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("PRAGMA foreign_keys = ON")
+        if wal:
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(schema)
+        conn.execute(f"PRAGMA user_version = {schema_version}")
+        with conn:
+            yield conn
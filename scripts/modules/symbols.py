@@ -0,0 +1,434 @@
+"""Global table of top-level Dart symbols, built in one scan of the project.
+
+Replaces the class-only duplicate scan (a per-line `class <Name>` search that
+missed extensions, mixins, enums, typedefs and top-level functions, all of which
+collide just as hard in the `saropa_dart_utils.dart` barrel). Every `.dart` file
+is read once; each declaration at brace depth 0 becomes a `Symbol` with its
+kind, file, line and privacy, and the table indexes them by name in a dict, so
+"who defines X" is a constant-time lookup and duplicate detection is a single
+pass over the index.
+
+Two reports come out of it:
+
+- duplicate public names: one name declared in more than one lib/ file.
+  Private (`_`) names are library-scoped in Dart and never collide across
+  files, and test/tool files are separate entry-point libraries, so neither is
+  reported. The table itself still covers the whole project for lookups.
+- barrel export collisions: one public name reachable from the package barrel
+  through two different defining files. `export` directives are followed
+  recursively, honouring `show` / `hide` combinators, so a name hidden on one
+  path (e.g. `hide median`) does not count.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+EXCLUDE_DIRS = {".dart_tool", "dependency_overrides", "build"}
+
+# Class modifiers that may precede `class` / `mixin class` (Dart 3).
+_CLASS_RE = re.compile(
+    r"^(?:(?:abstract|base|final|interface|sealed|mixin)\s+)*class\s+([A-Za-z_$][\w$]*)"
+)
+_MIXIN_RE = re.compile(r"^(?:base\s+)?mixin\s+([A-Za-z_$][\w$]*)")
+_ENUM_RE = re.compile(r"^enum\s+([A-Za-z_$][\w$]*)")
+_EXTENSION_TYPE_RE = re.compile(r"^extension\s+type\s+(?:const\s+)?([A-Za-z_$][\w$]*)")
+# A named extension; `extension on X` / `extension<T> on X` have no name.
+_EXTENSION_RE = re.compile(r"^extension\s+(?!on\b)([A-Za-z_$][\w$]*)")
+# `typedef Name<T> = ...` or the legacy `typedef Ret Name(...)`.
+_TYPEDEF_RE = re.compile(
+    r"^typedef\s+(?:([A-Za-z_$][\w$]*)\s*(?:<[^=]*>)?\s*=|.*?([A-Za-z_$][\w$]*)\s*(?:<[^(]*>)?\s*\()"
+)
+# Top-level getter / setter.
+_ACCESSOR_RE = re.compile(r"^(?:external\s+)?(?:[\w$<>?,\s]+\s+)?(?:get|set)\s+([A-Za-z_$][\w$]*)")
+_IDENT_RE = re.compile(r"[A-Za-z_$][\w$]*")
+# Top-level variable: `const` / `final` / `var` / `late` / typed `= value;`.
+_VARIABLE_RE = re.compile(
+    r"^(?:external\s+)?(?:late\s+)?(?:const|final|var|[\w$<>?,.\s]+?)\s+([A-Za-z_$][\w$]*)\s*(?:=|;)"
+)
+# Lines at depth 0 that begin a directive or keyword, never a symbol.
+_NON_SYMBOL_START_RE = re.compile(
+    r"^(?:import|export|part|library|@|return|if|for|while|switch|else)\b"
+)
+_FUNCTION_NAME_SKIP = frozenset(
+    {"if", "for", "while", "switch", "catch", "return", "Function"}
+)
+
+_STRING_RE = re.compile(r"'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"")
+_INTERPOLATION_RE = re.compile(r"(?<!\\)\$")
+_EXPORT_RE = re.compile(
+    r"^\s*export\s+['\"]([^'\"]+)['\"](?P<combinators>[^;]*);", re.MULTILINE
+)
+# `import 'a.dart' if (dart.library.io) 'b.dart';` — platform alternatives.
+_CONDITIONAL_URI_RE = re.compile(
+    r"^\s*(?:import|export)\s+['\"]([^'\"]+)['\"]((?:\s+if\s*\([^)]*\)\s*['\"][^'\"]+['\"])+)",
+    re.MULTILINE,
+)
+_CONDITIONAL_ALT_RE = re.compile(r"if\s*\([^)]*\)\s*['\"]([^'\"]+)['\"]")
+_COMBINATOR_RE = re.compile(r"\b(show|hide)\s+([\w$,\s]+?)(?=\s*(?:\bshow\b|\bhide\b|$))")
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """One top-level declaration."""
+
+    name: str
+    kind: str
+    file: str  # project-relative, forward slashes
+    line: int
+
+    @property
+    def private(self) -> bool:
+        return self.name.startswith("_")
+
+
+@dataclass
+class SymbolTable:
+    """Every top-level symbol in the project, indexed by name and by file."""
+
+    by_name: dict[str, list[Symbol]] = field(default_factory=lambda: defaultdict(list))
+    by_file: dict[str, list[Symbol]] = field(default_factory=lambda: defaultdict(list))
+    # Files named together in one conditional import/export: each is a
+    # platform variant of the same API, so their shared names are expected.
+    alternatives: list[frozenset[str]] = field(default_factory=list)
+    files_scanned: int = 0
+
+    def add(self, symbol: Symbol) -> None:
+        self.by_name[symbol.name].append(symbol)
+        self.by_file[symbol.file].append(symbol)
+
+    def lookup(self, name: str) -> list[Symbol]:
+        """Every declaration of `name` (constant-time)."""
+        return self.by_name.get(name, [])
+
+    def duplicates(self, under: str = "") -> dict[str, list[Symbol]]:
+        """Public names declared in more than one file below `under`."""
+        found: dict[str, list[Symbol]] = {}
+        for name, syms in self.by_name.items():
+            if name.startswith("_"):
+                continue
+            scoped = [s for s in syms if s.file.startswith(under)]
+            if len({s.file for s in scoped}) > 1:
+                found[name] = scoped
+        return found
+
+
+def _is_excluded(rel: Path) -> bool:
+    return any(part in EXCLUDE_DIRS or part.startswith(".") for part in rel.parts[:-1])
+
+
+def _replace_string(match: re.Match) -> str:
+    raw = match.start() > 0 and match.string[match.start() - 1] == "r"
+    if not raw and _INTERPOLATION_RE.search(match.group(0)):
+        return "'$'"
+    return "''"
+
+
+def code_lines(text: str, mark_interpolation: bool = False):
+    """Yield (line_no, code, depth_before) with comments and strings removed.
+
+    `depth_before` is the `{` nesting at the start of the line, so depth 0
+    means the line starts at library scope. Block comments and triple-quoted
+    strings spanning lines are skipped whole. Strings become `''`; with
+    `mark_interpolation`, a non-raw string that interpolates becomes `'$'`
+    instead, so callers can tell a constant literal from a computed one.
+    """
+    replace = _replace_string if mark_interpolation else "''"
+    depth = 0
+    in_block_comment = False
+    in_triple: str | None = None
+    for line_no, raw in enumerate(text.splitlines(), start=1):
+        line = raw
+        if in_triple:
+            end = line.find(in_triple)
+            if end < 0:
+                continue
+            line = line[end + 3 :]
+            in_triple = None
+        if in_block_comment:
+            end = line.find("*/")
+            if end < 0:
+                continue
+            line = line[end + 2 :]
+            in_block_comment = False
+        line = re.sub(r"/\*.*?\*/", "", line)
+        for quote in ("'''", '"""'):
+            start = line.find(quote)
+            if start >= 0 and line.find(quote, start + 3) < 0:
+                line = line[:start]
+                in_triple = quote
+        line = _STRING_RE.sub(replace, line)
+        comment = line.find("//")
+        if comment >= 0:
+            line = line[:comment]
+        start = line.find("/*")
+        if start >= 0:
+            line = line[:start]
+            in_block_comment = True
+        yield line_no, line, depth
+        depth = max(0, depth + line.count("{") - line.count("}"))
+
+
+def _symbol_at(code: str) -> tuple[str, str] | None:
+    """(kind, name) declared by a depth-0 code line, or None."""
+    stripped = code.strip()
+    if not stripped or _NON_SYMBOL_START_RE.match(stripped):
+        return None
+    for kind, pattern in (
+        ("class", _CLASS_RE),
+        ("mixin", _MIXIN_RE),
+        ("enum", _ENUM_RE),
+        ("extension type", _EXTENSION_TYPE_RE),
+        ("extension", _EXTENSION_RE),
+    ):
+        match = pattern.match(stripped)
+        if match:
+            return kind, match.group(1)
+    if stripped.startswith("typedef"):
+        match = _TYPEDEF_RE.match(stripped)
+        if match:
+            return "typedef", match.group(1) or match.group(2)
+        return None
+    if stripped.startswith(("extension", "class", "mixin", "enum")):
+        return None  # Unnamed extension or a form we do not recognise.
+    match = _ACCESSOR_RE.match(stripped)
+    if match:
+        return "accessor", match.group(1)
+    name = _function_name(stripped)
+    if name:
+        return "function", name
+    match = _VARIABLE_RE.match(stripped)
+    if match:
+        return "variable", match.group(1)
+    return None
+
+
+def _function_name(code: str) -> str | None:
+    """Name of a top-level function declared by `code`, or None.
+
+    The name is the last identifier before the first `(` that sits outside
+    every `<...>` and `(...)`, skipping `Function(` — so return types such as
+    `Map<K, List<V>>` or `R Function(T)` are not mistaken for the name. A `=`
+    or `=>` before that point means an initializer, not a declaration.
+    """
+    angle = 0
+    paren = 0
+    last_ident: str | None = None
+    i = 0
+    while i < len(code):
+        c = code[i]
+        if c == "<":
+            angle += 1
+        elif c == ">":
+            angle = max(0, angle - 1)
+        elif c == "=":
+            return None
+        elif c == "(":
+            if angle == 0 and paren == 0 and last_ident not in (None, *_FUNCTION_NAME_SKIP):
+                return last_ident
+            paren += 1
+        elif c == ")":
+            paren = max(0, paren - 1)
+        elif angle == 0 and paren == 0:
+            match = _IDENT_RE.match(code, i)
+            if match:
+                last_ident = match.group(0)
+                i = match.end()
+                continue
+        i += 1
+    return None
+
+
+def symbols_in_text(text: str, rel: str) -> list[Symbol]:
+    """Top-level symbols declared in one file's source."""
+    found: list[Symbol] = []
+    continuation = False
+    for line_no, code, depth in code_lines(text):
+        if depth > 0:
+            continuation = False
+            continue
+        # A depth-0 line that continues an unfinished statement (a wrapped
+        # initializer or parameter list) is not a new declaration.
+        if not continuation:
+            parsed = _symbol_at(code)
+            if parsed:
+                found.append(Symbol(name=parsed[1], kind=parsed[0], file=rel, line=line_no))
+        tail = code.rstrip()
+        if not tail:
+            continue  # Blank or comment-only: the statement state carries over.
+        # Annotations (`@immutable`) sit on their own line before the
+        # declaration they belong to, so they never start a continuation.
+        continuation = not tail.lstrip().startswith("@") and not tail.endswith(
+            (";", "{", "}")
+        )
+    return found
+
+
+def build_symbol_table(project_dir: Path) -> SymbolTable:
+    """Scan every project `.dart` file once into a `SymbolTable`."""
+    table = SymbolTable()
+    for path in project_dir.rglob("*.dart"):
+        rel = path.relative_to(project_dir)
+        if _is_excluded(rel):
+            continue
+        try:
+            text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        table.files_scanned += 1
+        for symbol in symbols_in_text(text, rel.as_posix()):
+            table.add(symbol)
+        for match in _CONDITIONAL_URI_RE.finditer(text):
+            uris = [match.group(1), *_CONDITIONAL_ALT_RE.findall(match.group(2))]
+            group = set()
+            for uri in uris:
+                if ":" in uri:
+                    continue
+                target = (path.parent / uri).resolve()
+                try:
+                    group.add(target.relative_to(project_dir.resolve()).as_posix())
+                except ValueError:
+                    continue
+            if len(group) > 1:
+                table.alternatives.append(frozenset(group))
+    return table
+
+
+def _parse_exports(text: str) -> list[tuple[str, frozenset[str] | None, frozenset[str]]]:
+    """(uri, show set or None, hide set) for each `export` directive."""
+    exports = []
+    for match in _EXPORT_RE.finditer(text):
+        show: set[str] | None = None
+        hide: set[str] = set()
+        for combinator, names in _COMBINATOR_RE.findall(match.group("combinators")):
+            parsed = {n.strip() for n in names.split(",") if n.strip()}
+            if combinator == "show":
+                show = parsed if show is None else show & parsed
+            else:
+                hide |= parsed
+        exports.append(
+            (match.group(1), frozenset(show) if show is not None else None, frozenset(hide))
+        )
+    return exports
+
+
+def _resolve_uri(uri: str, from_file: Path, lib_root: Path, package: str) -> Path | None:
+    prefix = f"package:{package}/"
+    if uri.startswith(prefix):
+        return lib_root / uri[len(prefix) :]
+    if ":" in uri:
+        return None  # dart: or another package
+    return (from_file.parent / uri).resolve()
+
+
+def barrel_exports(
+    table: SymbolTable, project_dir: Path, barrel: Path, package: str
+) -> dict[str, set[str]]:
+    """Public name -> set of defining files reachable through `barrel`.
+
+    Follows `export` directives recursively. Combinators narrow what passes
+    through each edge: `show` keeps only the listed names, `hide` removes them,
+    and both compose along a chain of re-exports.
+    """
+    lib_root = (project_dir / "lib").resolve()
+    project_dir = project_dir.resolve()
+    reachable: dict[str, set[str]] = defaultdict(set)
+    # (file, show filter, hide filter) already expanded; guards export cycles.
+    seen: set[tuple[Path, frozenset[str] | None, frozenset[str]]] = set()
+    stack = [(barrel.resolve(), None, frozenset())]
+    while stack:
+        path, show, hide = stack.pop()
+        if (path, show, hide) in seen or not path.is_file():
+            continue
+        seen.add((path, show, hide))
+        rel = path.relative_to(project_dir).as_posix()
+        for symbol in table.by_file.get(rel, []):
+            if symbol.private or symbol.name in hide:
+                continue
+            if show is not None and symbol.name not in show:
+                continue
+            reachable[symbol.name].add(symbol.file)
+        text = path.read_text(encoding="utf-8")
+        for uri, edge_show, edge_hide in _parse_exports(text):
+            target = _resolve_uri(uri, path, lib_root, package)
+            if target is None:
+                continue
+            if show is None:
+                next_show = edge_show
+            elif edge_show is None:
+                next_show = show
+            else:
+                next_show = show & edge_show
+            stack.append((target, next_show, hide | edge_hide))
+    return reachable
+
+
+def audit_duplicate_symbols(
+    project_dir: Path, package: str
+) -> tuple[list[str], list[str], list[str]]:
+    """Report duplicate public symbols and barrel export collisions.
+
+    Returns (report_lines, duplicate_details, collision_details), each detail
+    list ranked most-declarations first. Every duplicate is listed in the
+    report, but only unresolved ones are returned as findings: a duplicate is
+    resolved when the barrel exposes exactly one of its definitions (the
+    others are hidden or not exported) or when all of its files are variants
+    in one conditional import.
+    """
+    table = build_symbol_table(project_dir)
+    # Only lib/ is one importable surface; every test or tool file is its own
+    # library with its own `main`, so names repeated there never collide.
+    duplicates = table.duplicates(under="lib/")
+    barrel = project_dir / "lib" / f"{package}.dart"
+    exported = barrel_exports(table, project_dir, barrel, package)
+    collisions = {name: files for name, files in exported.items() if len(files) > 1}
+
+    def resolution(name: str, syms: list[Symbol]) -> str | None:
+        files = {s.file for s in syms}
+        if any(files <= group for group in table.alternatives):
+            return "conditional import variants"
+        if len(exported.get(name, ())) == 1:
+            return f"one definition exported by {barrel.name}"
+        return None
+
+    ranked = sorted(duplicates.items(), key=lambda item: (-len(item[1]), item[0]))
+    dup_lines: list[str] = []
+    dup_details: list[str] = []
+    for name, syms in ranked:
+        detail = f"  {name}  (in: {', '.join(f'{s.file}:{s.line} {s.kind}' for s in syms)})"
+        resolved = resolution(name, syms)
+        if resolved:
+            dup_lines.append(f"{detail}  [resolved: {resolved}]")
+        else:
+            dup_lines.append(detail)
+            dup_details.append(detail)
+    collision_details = [
+        f"  {name}  (exported from: {', '.join(sorted(files))})"
+        for name, files in sorted(collisions.items(), key=lambda item: (-len(item[1]), item[0]))
+    ]
+
+    kinds: dict[str, int] = defaultdict(int)
+    for syms in table.by_name.values():
+        for symbol in syms:
+            kinds[symbol.kind] += 1
+    lines = [
+        f"Symbols indexed: {sum(kinds.values())} in {table.files_scanned} files ("
+        + ", ".join(f"{n} {kind}" for kind, n in sorted(kinds.items()))
+        + ")"
+    ]
+    if dup_lines:
+        lines.append("Public names declared in more than one lib/ file:")
+        lines.extend(dup_lines)
+    else:
+        lines.append("No duplicate public top-level names.")
+    if not barrel.is_file():
+        lines.append(f"Barrel {barrel.name} not found; export collisions not checked.")
+    elif collision_details:
+        lines.append(f"Names exported from {barrel.name} by more than one file:")
+        lines.extend(collision_details)
+    else:
+        lines.append(f"No export collisions in {barrel.name}.")
+    return lines, dup_details, collision_details
@@ -0,0 +1,364 @@
+"""Per-test timings from `flutter test --reporter json`, kept across runs.
+
+A plain `flutter test` only says pass or fail. With `--reporter json` the
+runner prints one event per line instead; the ones used here are:
+
+    {"type": "suite", "suite": {"id": 0, "path": "/abs/test/x_test.dart"}}
+    {"type": "testStart", "test": {"id": 3, "name": "...", "suiteID": 0}, "time": 812}
+    {"type": "testDone", "testID": 3, "result": "success", "hidden": false, "time": 815}
+    {"type": "error", "testID": 3, "error": "Expected: ...", "isFailure": true}
+    {"type": "done", "success": true, "time": 9120}
+
+`time` is milliseconds since the run started, so a test's duration is the
+difference between its two events. `TimingCollector` is the `on_line` callback
+for `run.run_streaming`: it folds each event in as it arrives and keeps only
+tests still in flight plus one small record per finished test. Hidden tests
+are the runner's own — "loading <file>" (compiling and loading the suite) and
+setUpAll/tearDownAll — and count toward their file's time but are not listed.
+
+Each successful run is recorded in reports/_cache/test_timings.sqlite3:
+
+    runs       one row per run: time, package version, git SHA, wall seconds
+    tests      one row per distinct (file, test name)
+    durations  (run, test, seconds)
+
+so `slower_tests` can compare this run with the median of the previous few and
+point at the tests that are drifting slower.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import statistics
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from . import atomic_file
+from . import sqlite_db
+
+DB_RELATIVE_PATH = Path("reports") / "_cache" / "test_timings.sqlite3"
+SCHEMA_VERSION = 1
+
+SLOWEST_SHOWN = 25
+SLOWEST_FILES_SHOWN = 15
+# A test is "getting slower" when this run took SLOWER_RATIO times the median
+# of its last HISTORY_RUNS recorded runs, and at least SLOWER_MIN_SECONDS more:
+# the ratio alone would flag every 2 ms test that took 5 ms once.
+HISTORY_RUNS = 5
+SLOWER_RATIO = 1.5
+SLOWER_MIN_SECONDS = 0.25
+# Failure messages kept for the terminal; the rest are counted.
+_FAILURES_KEPT = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    version TEXT,
+    git_sha TEXT,
+    wall_seconds REAL NOT NULL,
+    test_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (file, name)
+);
+
+CREATE TABLE IF NOT EXISTS durations (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    seconds REAL NOT NULL,
+    PRIMARY KEY (run_id, test_id)
+);
+CREATE INDEX IF NOT EXISTS durations_test ON durations(test_id, run_id);
+"""
+
+
+@dataclass
+class TestTiming:
+    """One finished, visible test."""
+
+    file: str
+    name: str
+    seconds: float
+    result: str  # success / failure / error
+
+
+@dataclass
+class FileTiming:
+    """One test file: wall span from its first start to its last finish."""
+
+    file: str
+    seconds: float = 0.0
+    load_seconds: float = 0.0
+    tests: int = 0
+
+
+@dataclass
+class SlowerTest:
+    """A test that took notably longer than its recent median."""
+
+    file: str
+    name: str
+    seconds: float
+    median: float
+
+    @property
+    def ratio(self) -> float:
+        return self.seconds / self.median if self.median else 0.0
+
+
+@dataclass
+class _Suite:
+    file: str
+    first_start: int | None = None
+    last_done: int = 0
+    load_ms: int = 0
+    tests: int = 0
+
+
+@dataclass
+class TimingCollector:
+    """`on_line` callback that turns the JSON reporter stream into timings.
+
+    Lines that are not JSON events (tool banners, a crash before the reporter
+    starts) are ignored; `run_streaming` still keeps them in its tail.
+    `progress`, when given, receives a one-line status after each test.
+    """
+
+    project_dir: Path
+    progress: Callable[[str], None] | None = None
+    tests: list[TestTiming] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+    failure_count: int = 0
+    wall_seconds: float = 0.0
+    success: bool | None = None
+    _suites: dict[int, _Suite] = field(default_factory=dict)
+    # testID -> (start ms, name, suite id) for tests still running.
+    _running: dict[int, tuple[int, str, int]] = field(default_factory=dict)
+    _names: dict[int, str] = field(default_factory=dict)
+
+    def __call__(self, line: str) -> None:
+        if not line.startswith("{"):
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return
+        kind = event.get("type")
+        if kind == "suite":
+            suite = event["suite"]
+            self._suites[suite["id"]] = _Suite(self._relpath(suite.get("path") or "?"))
+        elif kind == "testStart":
+            test = event["test"]
+            self._running[test["id"]] = (event["time"], test["name"], test["suiteID"])
+            suite = self._suites.get(test["suiteID"])
+            if suite is not None and suite.first_start is None:
+                suite.first_start = event["time"]
+        elif kind == "testDone":
+            self._test_done(event)
+        elif kind == "error":
+            self._error(event)
+        elif kind == "done":
+            self.success = bool(event.get("success"))
+            self.wall_seconds = event.get("time", 0) / 1000
+
+    def _relpath(self, path: str) -> str:
+        try:
+            return Path(path).resolve().relative_to(self.project_dir.resolve()).as_posix()
+        except ValueError:
+            return path.replace("\\", "/")
+
+    def _test_done(self, event: dict) -> None:
+        started = self._running.pop(event["testID"], None)
+        if started is None:
+            return
+        start_ms, name, suite_id = started
+        elapsed = event["time"] - start_ms
+        suite = self._suites.get(suite_id)
+        if suite is not None:
+            suite.last_done = max(suite.last_done, event["time"])
+        if event.get("hidden"):
+            if suite is not None and name.startswith("loading "):
+                suite.load_ms += elapsed
+            return
+        if event.get("skipped"):
+            return
+        if suite is not None:
+            suite.tests += 1
+        result = event.get("result", "success")
+        self._names[event["testID"]] = name
+        self.tests.append(
+            TestTiming(suite.file if suite else "?", name, elapsed / 1000, result)
+        )
+        if result != "success":
+            self.failure_count += 1
+        if self.progress is not None:
+            self.progress(
+                f"{len(self.tests)} tests, {self.failure_count} failed: {name}"
+            )
+
+    def _error(self, event: dict) -> None:
+        if len(self.failures) >= _FAILURES_KEPT:
+            return
+        test_id = event.get("testID")
+        running = self._running.get(test_id)
+        name = running[1] if running else self._names.get(test_id, f"test {test_id}")
+        message = (event.get("error") or "").strip().splitlines()
+        self.failures.append(f"{name}: {message[0] if message else 'error'}")
+
+    def files(self) -> list[FileTiming]:
+        """Per-file timings, slowest first."""
+        timings = [
+            FileTiming(
+                suite.file,
+                (suite.last_done - suite.first_start) / 1000,
+                suite.load_ms / 1000,
+                suite.tests,
+            )
+            for suite in self._suites.values()
+            if suite.first_start is not None
+        ]
+        timings.sort(key=lambda f: -f.seconds)
+        return timings
+
+    def slowest(self) -> list[TestTiming]:
+        return sorted(self.tests, key=lambda t: -t.seconds)
+
+
+def db_path(project_dir: Path) -> Path:
+    return project_dir / DB_RELATIVE_PATH
+
+
+def connect(project_dir: Path) -> AbstractContextManager[sqlite3.Connection]:
+    """Open (creating if needed) the timing database; commits on success."""
+    return sqlite_db.connect(db_path(project_dir), _SCHEMA, SCHEMA_VERSION)
+
+
+def record_run(
+    conn: sqlite3.Connection,
+    collector: TimingCollector,
+    version: str | None,
+    git_sha: str | None,
+) -> int:
+    """Store one run's per-test durations; returns the new run id."""
+    run_id = conn.execute(
+        "INSERT INTO runs (started_at, version, git_sha, wall_seconds, test_count)"
+        " VALUES (?, ?, ?, ?, ?)",
+        (
+            datetime.now().isoformat(timespec="seconds"),
+            version,
+            git_sha,
+            collector.wall_seconds,
+            len(collector.tests),
+        ),
+    ).lastrowid
+    for test in collector.tests:
+        conn.execute(
+            "INSERT OR IGNORE INTO tests (file, name) VALUES (?, ?)",
+            (test.file, test.name),
+        )
+        (test_id,) = conn.execute(
+            "SELECT id FROM tests WHERE file = ? AND name = ?", (test.file, test.name)
+        ).fetchone()
+        # Two tests with one name in one file share an identity; keep the
+        # slower so the comparison errs towards flagging.
+        conn.execute(
+            "INSERT INTO durations (run_id, test_id, seconds) VALUES (?, ?, ?)"
+            " ON CONFLICT (run_id, test_id) DO UPDATE"
+            " SET seconds = max(seconds, excluded.seconds)",
+            (run_id, test_id, test.seconds),
+        )
+    return run_id
+
+
+def slower_tests(conn: sqlite3.Connection, run_id: int) -> list[SlowerTest]:
+    """Tests in `run_id` that were notably slower than their recent median.
+
+    The median is over each test's last `HISTORY_RUNS` recorded durations
+    before this run; tests with no history yet are not compared.
+    """
+    rows = conn.execute(
+        """
+        SELECT t.file, t.name, d.seconds, (
+            SELECT group_concat(seconds) FROM (
+                SELECT p.seconds FROM durations p
+                WHERE p.test_id = d.test_id AND p.run_id < d.run_id
+                ORDER BY p.run_id DESC LIMIT ?
+            )
+        )
+        FROM durations d JOIN tests t ON t.id = d.test_id
+        WHERE d.run_id = ?
+        """,
+        (HISTORY_RUNS, run_id),
+    ).fetchall()
+    slower: list[SlowerTest] = []
+    for file, name, seconds, history in rows:
+        if not history:
+            continue
+        median = statistics.median(float(s) for s in history.split(","))
+        if seconds >= median * SLOWER_RATIO and seconds - median >= SLOWER_MIN_SECONDS:
+            slower.append(SlowerTest(file, name, seconds, median))
+    slower.sort(key=lambda s: -(s.seconds - s.median))
+    return slower
+
+
+def report_lines(
+    collector: TimingCollector, slower: list[SlowerTest] | None
+) -> list[str]:
+    """The "slowest tests" report: totals, slowest files and tests, drift."""
+    total = sum(t.seconds for t in collector.tests)
+    lines = [
+        f"{len(collector.tests)} tests in {len(collector.files())} files; "
+        f"wall {collector.wall_seconds:.1f}s, summed test time {total:.1f}s.",
+        "",
+        "Slowest files (first start to last finish, incl. loading):",
+    ]
+    for timing in collector.files()[:SLOWEST_FILES_SHOWN]:
+        lines.append(
+            f"  {timing.seconds:8.2f}s  {timing.file}  "
+            f"({timing.tests} tests, load {timing.load_seconds:.2f}s)"
+        )
+    lines.append("")
+    lines.append("Slowest tests:")
+    slowest = collector.slowest()
+    for test in slowest[:SLOWEST_SHOWN]:
+        share = f"{100 * test.seconds / total:.1f}%" if total else "-"
+        lines.append(f"  {test.seconds:8.2f}s  {share:>6}  {test.file}  {test.name}")
+    if len(slowest) > SLOWEST_SHOWN:
+        rest = sum(t.seconds for t in slowest[SLOWEST_SHOWN:])
+        lines.append(f"  ... {len(slowest) - SLOWEST_SHOWN} more tests, {rest:.1f}s together")
+    lines.append("")
+    if slower is None:
+        lines.append("Run not recorded (tests failed); no drift comparison.")
+    elif slower:
+        lines.append(
+            f"Getting slower (vs median of last {HISTORY_RUNS} runs, "
+            f">= {SLOWER_RATIO}x and +{SLOWER_MIN_SECONDS}s):"
+        )
+        for test in slower:
+            lines.append(
+                f"  {test.seconds:8.2f}s  was {test.median:.2f}s ({test.ratio:.1f}x)  "
+                f"{test.file}  {test.name}"
+            )
+    else:
+        lines.append("No test is notably slower than its recent runs.")
+    return lines
+
+
+def write_json(path: Path, collector: TimingCollector) -> None:
+    """Write the machine-readable timings next to the text report (atomic)."""
+    data = {
+        "wall_seconds": collector.wall_seconds,
+        "success": collector.success,
+        "files": [asdict(f) for f in collector.files()],
+        "tests": [asdict(t) for t in collector.slowest()],
+    }
+    atomic_file.write_text(path, json.dumps(data, indent=1))
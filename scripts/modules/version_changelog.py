@@ -1,9 +1,19 @@
-"""Version and CHANGELOG parsing and updates."""
+"""Version and CHANGELOG parsing and updates.
 
+`ChangelogDocument` parses CHANGELOG.md once into an ordered section index and
+batches edits into one atomic write; the module-level CHANGELOG functions are
+one-shot wrappers over it for callers that need a single answer.
+"""
+
+from __future__ import annotations
+
+import bisect
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+from . import atomic_file
 from . import ui
 
 # Base of the per-release "[log]" link required at the top of every CHANGELOG
@@ -44,8 +54,7 @@ def update_pubspec_version(pubspec_path: Path, new_version: str) -> None:
 
 def has_unreleased_section(changelog_path: Path) -> bool:
     """Check if CHANGELOG.md has an [Unreleased] section."""
-    content = changelog_path.read_text(encoding="utf-8")
-    return bool(re.search(r"##\s*\[Unreleased\]", content, re.IGNORECASE))
+    return ChangelogDocument.load(changelog_path).has_unreleased
 
 
 def bump_patch_version(version: str) -> str:
@@ -68,44 +77,21 @@ def bump_major_version(version: str) -> str:
 
 def update_changelog_unreleased(changelog_path: Path, new_version: str) -> None:
     """Replace [Unreleased] header with versioned header and today's date."""
-    content = changelog_path.read_text(encoding="utf-8")
-    today = datetime.now().strftime("%Y-%m-%d")
-    updated = re.sub(
-        r"(##\s*)\[Unreleased\]",
-        rf"\g<1>[{new_version}] - {today}",
-        content,
-        count=1,
-        flags=re.IGNORECASE,
-    )
-    changelog_path.write_text(updated, encoding="utf-8")
+    doc = ChangelogDocument.load(changelog_path)
+    doc.release_unreleased(new_version)
+    doc.save()
 
 
 def strip_unreleased_suffix(changelog_path: Path, version: str) -> bool:
     """Remove a trailing "- Unreleased" placeholder from a version's header.
 
-    This handles a header shape distinct from `## [Unreleased]` (covered by
-    `has_unreleased_section`/`update_changelog_unreleased`): the in-flight
-    section is written as `## [1.1.1] - Unreleased`, where "Unreleased" is a
-    placeholder sitting in the date slot. `get_latest_changelog_version` reads
-    `1.1.1` straight through that suffix, so without this step the placeholder
-    reaches pub.dev and labels a shipped release as unreleased.
-
-    Targets only the header for `version`, leaving older dated entries intact,
-    and drops the entire " - Unreleased" run (separator included) so the header
-    reads `## [1.1.1]`. Returns True when a placeholder was removed.
+    See `ChangelogDocument.strip_unreleased_suffix`. Returns True when a
+    placeholder was removed (and the file rewritten).
     """
-    content = changelog_path.read_text(encoding="utf-8")
-    # Capture the bracketed-version portion so it survives verbatim; consume the
-    # separator, the literal "Unreleased", and any trailing spaces/tabs, but
-    # stop at the newline ([ \t]* never crosses it) so the line break is kept.
-    pattern = rf"(##\s*\[?{re.escape(version)}\]?)\s*-\s*Unreleased[ \t]*"
-    updated, count = re.subn(
-        pattern, r"\g<1>", content, count=1, flags=re.IGNORECASE
-    )
-    if count == 0:
-        return False
-    changelog_path.write_text(updated, encoding="utf-8")
-    return True
+    doc = ChangelogDocument.load(changelog_path)
+    changed = doc.strip_unreleased_suffix(version)
+    doc.save()
+    return changed
 
 
 def get_package_name(pubspec_path: Path) -> str:
@@ -121,139 +107,58 @@ def get_latest_changelog_version(changelog_path: Path) -> str | None:
     """Extract the latest version from CHANGELOG.md."""
     if not changelog_path.exists():
         return None
-
-    content = changelog_path.read_text(encoding="utf-8")
-    match = re.search(r"##\s*\[?(\d+\.\d+\.\d+)\]?", content)
-    if match:
-        return match.group(1)
-    return None
+    return ChangelogDocument.load(changelog_path).latest_version
 
 
 def validate_changelog_version(project_dir: Path, version: str) -> str | None:
     """Validate version exists in CHANGELOG and extract release notes."""
     changelog_path = project_dir / "CHANGELOG.md"
-
     if not changelog_path.exists():
         return None
-
-    content = changelog_path.read_text(encoding="utf-8")
-    version_pattern = rf"##\s*\[?{re.escape(version)}\]?"
-    if not re.search(version_pattern, content):
-        return None
-
-    pattern = rf"(?s)##\s*\[?{re.escape(version)}\]?[^\n]*\n(.*?)(?=##\s*\[?\d+\.\d+\.\d+|$)"
-    match = re.search(pattern, content)
-
-    if match:
-        return match.group(1).strip()
-    return ""
-
-
-def _release_section_bounds(content: str, version: str) -> tuple[int, int] | None:
-    """Locate a version's section body within the raw CHANGELOG text.
-
-    Returns (start, end) offsets spanning from just after the `## [version]`
-    header line up to the next `## ` header (any version) or EOF, or None when
-    the header is absent. The body is what carries the intro line, the log
-    link, and the `### Added` / `### Fixed` subsections.
-    """
-    header = re.search(
-        rf"##\s*\[?{re.escape(version)}\]?[^\n]*\n", content
-    )
-    if not header:
-        return None
-    start = header.end()
-    # The next top-level `## ` header ends this section; nothing below it belongs
-    # to `version`. Match a leading newline so a `##` mid-line cannot false-trip.
-    nxt = re.search(r"\n##\s", content[start:])
-    end = start + nxt.start() if nxt else len(content)
-    return start, end
+    return ChangelogDocument.load(changelog_path).release_notes(version)
 
 
 def has_release_intro(changelog_path: Path, version: str) -> bool:
     """Report whether a version's section opens with a plain-language intro.
 
-    The maintenance note requires one casual, human-facing line before the
-    `### Added` / `### Changed` subsections. We scan the section head (above the
-    first `###`) for a non-empty line that is neither the `[log]` link nor a
-    bullet — that line is the intro. Returns False when the section is missing
-    or contains only the log link / bullets.
+    See `ChangelogDocument.has_release_intro`.
     """
     if not changelog_path.exists():
         return False
-
-    content = changelog_path.read_text(encoding="utf-8")
-    bounds = _release_section_bounds(content, version)
-    if bounds is None:
-        return False
-
-    body = content[bounds[0] : bounds[1]]
-    # Only the text above the first `### ` subsection can hold the intro.
-    sub = re.search(r"\n###\s", body)
-    head = body[: sub.start()] if sub else body
-
-    for line in head.splitlines():
-        stripped = line.strip()
-        if not stripped:
-            continue
-        # The log link and bullet entries are not the human intro line.
-        if stripped.startswith("[log]"):
-            continue
-        if stripped.startswith(("-", "*")):
-            continue
-        return True
-    return False
+    return ChangelogDocument.load(changelog_path).has_release_intro(version)
 
 
 def update_log_link(changelog_path: Path, version: str) -> bool:
     """Pin a version's `[log]` link to its release tag, rewriting in place.
 
-    The [Unreleased] template ships the link pointing at `main`; once the
-    section is versioned the link must point at `v<version>` so the published
-    pub.dev changelog deep-links to the tagged file. Rewrites any existing
-    `[log](<base>/.../CHANGELOG.md)` inside the section to the correct tag and
-    returns True. Returns False when no log link exists in the section (a
-    wholly missing link is the caller's to flag, not silently inserted).
+    See `ChangelogDocument.pin_log_link`. Returns False when the section has no
+    log link to pin.
     """
     if not changelog_path.exists():
         return False
+    doc = ChangelogDocument.load(changelog_path)
+    found = doc.pin_log_link(version)
+    doc.save()
+    return found
 
-    content = changelog_path.read_text(encoding="utf-8")
-    bounds = _release_section_bounds(content, version)
-    if bounds is None:
-        return False
-
-    start, end = bounds
-    body = content[start:end]
-    correct = f"[log]({LOG_LINK_BASE}/v{version}/CHANGELOG.md)"
-    # Match the whole existing log link (any ref: `main` or a stale `vA.B.C`)
-    # and replace just the link, leaving surrounding prose untouched.
-    pattern = r"\[log\]\(" + re.escape(LOG_LINK_BASE) + r"/[^)]*\)"
-    new_body, count = re.subn(pattern, correct, body, count=1)
-    if count == 0:
-        return False
-
-    if new_body != body:
-        content = content[:start] + new_body + content[end:]
-        changelog_path.write_text(content, encoding="utf-8")
-    return True
 
+def display_changelog(
+    project_dir: Path, doc: ChangelogDocument | None = None
+) -> str | None:
+    """Display the latest changelog entry.
 
-def display_changelog(project_dir: Path) -> str | None:
-    """Display the latest changelog entry."""
+    Pass an already-loaded `doc` to skip re-reading CHANGELOG.md.
+    """
     changelog_path = project_dir / "CHANGELOG.md"
 
-    if not changelog_path.exists():
-        ui.print_warning("CHANGELOG.md not found")
-        return None
+    if doc is None:
+        if not changelog_path.exists():
+            ui.print_warning("CHANGELOG.md not found")
+            return None
+        doc = ChangelogDocument.load(changelog_path)
 
-    content = changelog_path.read_text(encoding="utf-8")
-    match = re.search(
-        r"^(## \[?\d+\.\d+\.\d+\]?.*?)(?=^## |\Z)", content, re.MULTILINE | re.DOTALL
-    )
-
-    if match:
-        latest_entry = match.group(1).strip()
+    latest_entry = doc.latest_entry()
+    if latest_entry is not None:
         print()
         ui.print_colored("  CHANGELOG (latest entry):", ui.Color.WHITE)
         ui.print_colored("  " + "-" * 50, ui.Color.CYAN)
@@ -265,3 +170,298 @@ def display_changelog(project_dir: Path) -> str | None:
 
     ui.print_warning("Could not parse CHANGELOG.md")
     return None
+
+
+# -----------------------------------------------------------------------------
+# Parsed CHANGELOG document
+# -----------------------------------------------------------------------------
+
+# A top-level section header (`## ...`, never `### ...`), anchored at a line
+# start so a `##` inside prose cannot open a section.
+_SECTION_HEADER_RE = re.compile(r"^##(?!#)[ \t]*(.*)$", re.MULTILINE)
+# The version label inside a header: `[1.2.3]` or a bare `1.2.3`.
+_HEADER_VERSION_RE = re.compile(r"^\[?(\d+\.\d+\.\d+)\]?")
+_HEADER_UNRELEASED_RE = re.compile(r"^\[Unreleased\]", re.IGNORECASE)
+# A `### Added` / `### Fixed` subsection header inside a section body.
+_SUBSECTION_RE = re.compile(r"^###[ \t]+(.*)$", re.MULTILINE)
+# Any `[log](<base>/<ref>/CHANGELOG.md)` link, whatever ref it points at.
+_LOG_LINK_RE = re.compile(r"\[log\]\(" + re.escape(LOG_LINK_BASE) + r"/[^)]*\)")
+# The "- Unreleased" date-slot placeholder on a versioned header.
+_UNRELEASED_SUFFIX_RE = re.compile(r"\s*-\s*Unreleased[ \t]*", re.IGNORECASE)
+
+UNRELEASED = "Unreleased"
+
+
+@dataclass
+class ChangelogSection:
+    """One `## ` section, as absolute offsets into the document text."""
+
+    # "1.2.3", "Unreleased", or None for a header that is neither.
+    version: str | None
+    header_start: int
+    header_end: int  # end of the header text (before its newline)
+    body_start: int  # first character after the header line
+    end: int  # start of the next `## ` header, or EOF
+    # (title, offset) for each `### ` subsection, in order.
+    subsections: list[tuple[str, int]] = field(default_factory=list)
+    # Span of the section's `[log](...)` link, if any.
+    log_link: tuple[int, int] | None = None
+
+    @property
+    def intro_end(self) -> int:
+        """Where the intro area ends: the first subsection, else the section end."""
+        return self.subsections[0][1] if self.subsections else self.end
+
+
+class ChangelogDocument:
+    """CHANGELOG.md parsed once into an ordered, version-keyed section index.
+
+    Every query is a dict lookup plus a slice of the in-memory text instead of
+    a fresh file read and a regex pass over the whole file. Edits update the
+    text in memory and re-index it; `save()` flushes them all with one atomic
+    write (temp file + `os.replace`), so the release pre-checks that used to
+    re-read and rewrite the file a dozen times now read it once and write it
+    at most once.
+    """
+
+    def __init__(self, text: str, path: Path | None = None) -> None:
+        self.path = path
+        self._text = text
+        self._dirty = False
+        self._sections: list[ChangelogSection] = []
+        self._by_version: dict[str, ChangelogSection] = {}
+        self._parse()
+
+    @classmethod
+    def load(cls, path: Path) -> ChangelogDocument:
+        """Read and parse `path`."""
+        return cls(path.read_text(encoding="utf-8"), path)
+
+    def reload(self) -> ChangelogDocument:
+        """A fresh document from disk (e.g. after an operator's manual edit)."""
+        if self.path is None:
+            raise ValueError("ChangelogDocument has no backing path to reload")
+        return ChangelogDocument.load(self.path)
+
+    # -- parsing ---------------------------------------------------------------
+
+    def _parse(self) -> None:
+        """Index every `## ` section in one pass over the text."""
+        text = self._text
+        headers = list(_SECTION_HEADER_RE.finditer(text))
+        sub_matches = list(_SUBSECTION_RE.finditer(text))
+        sub_starts = [m.start() for m in sub_matches]
+        link_matches = list(_LOG_LINK_RE.finditer(text))
+        link_starts = [m.start() for m in link_matches]
+
+        sections: list[ChangelogSection] = []
+        by_version: dict[str, ChangelogSection] = {}
+        for i, header in enumerate(headers):
+            label = header.group(1).strip()
+            version: str | None = None
+            vm = _HEADER_VERSION_RE.match(label)
+            if vm:
+                version = vm.group(1)
+            elif _HEADER_UNRELEASED_RE.match(label):
+                version = UNRELEASED
+            newline = text.find("\n", header.end())
+            body_start = len(text) if newline < 0 else newline + 1
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+
+            # Subsections and log links are pre-scanned once for the whole
+            # file; bisect hands each section its own slice of them.
+            lo = bisect.bisect_left(sub_starts, body_start)
+            hi = bisect.bisect_left(sub_starts, end)
+            subsections = [
+                (sub_matches[k].group(1).strip(), sub_matches[k].start())
+                for k in range(lo, hi)
+            ]
+            k = bisect.bisect_left(link_starts, body_start)
+            log_link = None
+            if k < len(link_matches) and link_matches[k].start() < end:
+                log_link = link_matches[k].span()
+
+            section = ChangelogSection(
+                version=version,
+                header_start=header.start(),
+                header_end=header.end(),
+                body_start=body_start,
+                end=end,
+                subsections=subsections,
+                log_link=log_link,
+            )
+            sections.append(section)
+            # The first section for a version wins, as the old first-match
+            # regexes did.
+            if version is not None and version not in by_version:
+                by_version[version] = section
+        self._sections = sections
+        self._by_version = by_version
+
+    def _replace(self, start: int, end: int, new: str) -> None:
+        """Splice `new` over text[start:end] and re-index."""
+        self._text = self._text[:start] + new + self._text[end:]
+        self._dirty = True
+        self._parse()
+
+    # -- queries ---------------------------------------------------------------
+
+    @property
+    def text(self) -> str:
+        """The current (possibly edited, unsaved) document text."""
+        return self._text
+
+    @property
+    def dirty(self) -> bool:
+        """True when there are edits not yet written by `save()`."""
+        return self._dirty
+
+    @property
+    def sections(self) -> list[ChangelogSection]:
+        """All `## ` sections in file order."""
+        return list(self._sections)
+
+    def section(self, version: str) -> ChangelogSection | None:
+        """The section for `version` (or "Unreleased"), or None."""
+        return self._by_version.get(version)
+
+    @property
+    def has_unreleased(self) -> bool:
+        """True when there is a `## [Unreleased]` section."""
+        return UNRELEASED in self._by_version
+
+    @property
+    def latest_version(self) -> str | None:
+        """The first versioned section's version, or None."""
+        for section in self._sections:
+            if section.version not in (None, UNRELEASED):
+                return section.version
+        return None
+
+    def body(self, version: str) -> str | None:
+        """A section's raw body (everything below its header), or None."""
+        section = self.section(version)
+        if section is None:
+            return None
+        return self._text[section.body_start : section.end]
+
+    def release_notes(self, version: str) -> str | None:
+        """The stripped release notes for `version`; None when the header is
+        absent, "" when it has no content."""
+        body = self.body(version)
+        return None if body is None else body.strip()
+
+    def has_release_intro(self, version: str) -> bool:
+        """Report whether a version's section opens with a plain-language intro.
+
+        The maintenance note requires one casual, human-facing line before the
+        `### Added` / `### Changed` subsections. We scan the section head (above
+        the first `###`) for a non-empty line that is neither the `[log]` link
+        nor a bullet — that line is the intro. Returns False when the section is
+        missing or contains only the log link / bullets.
+        """
+        section = self.section(version)
+        if section is None:
+            return False
+        head = self._text[section.body_start : section.intro_end]
+        for line in head.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+            # The log link and bullet entries are not the human intro line.
+            if stripped.startswith("[log]"):
+                continue
+            if stripped.startswith(("-", "*")):
+                continue
+            return True
+        return False
+
+    def latest_entry(self) -> str | None:
+        """The first versioned section, header included, stripped."""
+        for section in self._sections:
+            if section.version not in (None, UNRELEASED):
+                return self._text[section.header_start : section.end].strip()
+        return None
+
+    # -- edits (in memory until save) -----------------------------------------
+
+    def release_unreleased(self, new_version: str) -> bool:
+        """Turn `## [Unreleased]` into `## [new_version] - <today>`.
+
+        Returns False when there is no [Unreleased] section.
+        """
+        section = self.section(UNRELEASED)
+        if section is None:
+            return False
+        header = self._text[section.header_start : section.header_end]
+        today = datetime.now().strftime("%Y-%m-%d")
+        new_header = re.sub(
+            r"(##\s*)\[Unreleased\]",
+            rf"\g<1>[{new_version}] - {today}",
+            header,
+            count=1,
+            flags=re.IGNORECASE,
+        )
+        self._replace(section.header_start, section.header_end, new_header)
+        return True
+
+    def strip_unreleased_suffix(self, version: str) -> bool:
+        """Remove a trailing "- Unreleased" placeholder from a version's header.
+
+        This handles a header shape distinct from `## [Unreleased]` (covered by
+        `release_unreleased`): the in-flight section is written as
+        `## [1.1.1] - Unreleased`, where "Unreleased" is a placeholder sitting
+        in the date slot. `latest_version` reads `1.1.1` straight through that
+        suffix, so without this step the placeholder reaches pub.dev and labels
+        a shipped release as unreleased.
+
+        Targets only the header for `version`, leaving older dated entries
+        intact, and drops the entire " - Unreleased" run (separator included)
+        so the header reads `## [1.1.1]`. Returns True when a placeholder was
+        removed.
+        """
+        section = self.section(version)
+        if section is None:
+            return False
+        header = self._text[section.header_start : section.header_end]
+        version_match = re.search(rf"\[?{re.escape(version)}\]?", header)
+        if version_match is None:
+            return False
+        rest = header[version_match.end() :]
+        suffix = _UNRELEASED_SUFFIX_RE.match(rest)
+        if suffix is None:
+            return False
+        start = section.header_start + version_match.end()
+        self._replace(start, start + suffix.end(), "")
+        return True
+
+    def pin_log_link(self, version: str) -> bool:
+        """Pin a version's `[log]` link to its release tag.
+
+        The [Unreleased] template ships the link pointing at `main`; once the
+        section is versioned the link must point at `v<version>` so the
+        published pub.dev changelog deep-links to the tagged file. Rewrites the
+        existing link (any ref: `main` or a stale `vA.B.C`) and returns True.
+        Returns False when no log link exists in the section (a wholly missing
+        link is the caller's to flag, not silently inserted).
+        """
+        section = self.section(version)
+        if section is None or section.log_link is None:
+            return False
+        correct = f"[log]({LOG_LINK_BASE}/v{version}/CHANGELOG.md)"
+        start, end = section.log_link
+        if self._text[start:end] != correct:
+            self._replace(start, end, correct)
+        return True
+
+    def save(self) -> bool:
+        """Write pending edits with one atomic replace. Returns True if written."""
+        if not self._dirty:
+            return False
+        if self.path is None:
+            raise ValueError("ChangelogDocument has no backing path to save to")
+        # A crash mid-write never leaves a truncated file, and the file keeps
+        # its permission bits.
+        atomic_file.write_text(self.path, self._text)
+        self._dirty = False
+        return True
@@ -3,6 +3,7 @@
 import json
 import re
 import shutil
+import sqlite3
 import subprocess
 import tempfile
 import time
@@ -10,35 +11,42 @@ import urllib.error
 import urllib.request
 from pathlib import Path
 
+from . import analysis_server
+from . import benchmarks
 from . import platform as platform_mod
+from . import preflight as preflight_mod
+from . import report_store
 from . import run as run_mod
+from . import test_timings
 from . import ui
 from . import version_changelog as vc
 
 
-def check_prerequisites(project_dir: Path) -> bool:
-    """Check that required tools are available and authenticated."""
+def check_prerequisites(
+    project_dir: Path, preflight: preflight_mod.PreflightResult | None = None
+) -> bool:
+    """Check that required tools are available and authenticated.
+
+    Reads the concurrent preflight probes when `preflight` is given (running
+    them here otherwise) and reports every failure, not just the first, so one
+    rerun can fix them all.
+    """
     ui.print_header("STEP 1: CHECKING PREREQUISITES")
 
-    tools = [
-        ("flutter", "Install from https://flutter.dev"),
-        ("git", "Install from https://git-scm.com"),
-        ("gh", "Install from https://cli.github.com"),
-    ]
+    if preflight is None:
+        preflight = preflight_mod.run_preflight(project_dir)
 
-    all_found = True
-    for tool, hint in tools:
-        if run_mod.command_exists(tool):
-            ui.print_success(f"{tool} found")
-        else:
+    all_ok = True
+    missing = {tool for tool, _hint in preflight.missing_tools}
+    for tool, hint in preflight_mod.REQUIRED_TOOLS:
+        if tool in missing:
             ui.print_error(f"{tool} not found. {hint}")
-            all_found = False
-
-    if not all_found:
-        return False
+            all_ok = False
+        else:
+            ui.print_success(f"{tool} found")
 
-    result = run_mod.run_capture(["gh", "auth", "status"], project_dir)
-    if result.returncode != 0:
+    result = preflight.gh_auth
+    if result is not None and result.returncode != 0:
         ui.print_error("GitHub CLI is not authenticated.")
         ui.print_info("Run 'gh auth login' to authenticate.")
         error_output = (result.stderr or "") + (result.stdout or "")
@@ -48,8 +56,9 @@ def check_prerequisites(project_dir: Path) -> bool:
                 '      PowerShell: $env:GITHUB_TOKEN = ""\n'
                 "      Bash: unset GITHUB_TOKEN"
             )
-        return False
-    ui.print_success("gh authenticated")
+        all_ok = False
+    elif result is not None:
+        ui.print_success("gh authenticated")
 
     workflow_path = project_dir / ".github" / "workflows" / "publish.yml"
     if not workflow_path.exists():
@@ -61,13 +70,19 @@ def check_prerequisites(project_dir: Path) -> bool:
         ui.print_info(
             "Publishing relies on GitHub Actions. Add a publish workflow before releasing."
         )
-        return False
+        all_ok = False
 
-    return True
+    return all_ok
 
 
-def check_working_tree(project_dir: Path) -> tuple[bool, bool]:
-    """Check working tree status. Returns (ok, has_uncommitted_changes)."""
+def check_working_tree(
+    project_dir: Path, assume_yes: bool | None = None
+) -> tuple[bool, bool]:
+    """Check working tree status. Returns (ok, has_uncommitted_changes).
+
+    `assume_yes` answers the continue prompt without asking (headless runs);
+    None prompts the operator.
+    """
     ui.print_header("STEP 2: CHECKING WORKING TREE")
 
     result = run_mod.run_capture(["git", "status", "--porcelain"], project_dir)
@@ -76,13 +91,16 @@ def check_working_tree(project_dir: Path) -> tuple[bool, bool]:
         ui.print_warning("You have uncommitted changes:")
         ui.print_colored(result.stdout, ui.Color.YELLOW)
         print()
-        response = (
-            input(
-                "  These changes will be included in the release commit. Continue? [Y/n] "
+        if assume_yes is not None:
+            response = "y" if assume_yes else "n"
+        else:
+            response = (
+                input(
+                    "  These changes will be included in the release commit. Continue? [Y/n] "
+                )
+                .strip()
+                .lower()
             )
-            .strip()
-            .lower()
-        )
         # Default to Yes: an empty (bare-Enter) response proceeds; only an
         # explicit "n"/"no" aborts. The release workflow always commits the
         # working tree anyway, so proceeding is the expected path.
@@ -94,36 +112,40 @@ def check_working_tree(project_dir: Path) -> tuple[bool, bool]:
     return True, False
 
 
-def check_remote_sync(project_dir: Path, branch: str) -> bool:
-    """Check if local branch is in sync with remote."""
+def check_remote_sync(
+    project_dir: Path,
+    branch: str,
+    preflight: preflight_mod.PreflightResult | None = None,
+) -> bool:
+    """Check if local branch is in sync with remote.
+
+    Uses the fetch and ahead/behind counts gathered by the preflight stage when
+    given; otherwise fetches and counts now. Callers pass `preflight` only when
+    nothing ran in between: the audit can take minutes, during which the
+    operator may pull or commit.
+    """
     ui.print_header("STEP 3: CHECKING REMOTE SYNC")
 
-    result = run_mod.run_capture(["git", "fetch", "origin", branch], project_dir)
-    if result.returncode != 0:
+    if preflight is not None and preflight.branch == branch:
+        sync = preflight.sync
+    else:
+        sync = preflight_mod.probe_remote_sync(project_dir, branch)
+
+    if not sync.fetched:
         ui.print_warning(
             "Could not fetch from remote. Proceeding anyway (remote branch may not exist yet)."
         )
         return True
 
-    result = run_mod.run_capture(
-        ["git", "rev-list", "--count", f"HEAD..origin/{branch}"], project_dir
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        behind_count = int(result.stdout.strip())
-        if behind_count > 0:
-            ui.print_error(f"Local branch is behind remote by {behind_count} commit(s).")
-            ui.print_info(f"Pull changes first with: git pull origin {branch}")
-            return False
+    if sync.behind > 0:
+        ui.print_error(f"Local branch is behind remote by {sync.behind} commit(s).")
+        ui.print_info(f"Pull changes first with: git pull origin {branch}")
+        return False
 
-    result = run_mod.run_capture(
-        ["git", "rev-list", "--count", f"origin/{branch}..HEAD"], project_dir
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        ahead_count = int(result.stdout.strip())
-        if ahead_count > 0:
-            ui.print_warning(f"You have {ahead_count} unpushed commit(s) that will be included.")
-            ui.print_success("Local branch is ahead of remote (will push with release)")
-            return True
+    if sync.ahead > 0:
+        ui.print_warning(f"You have {sync.ahead} unpushed commit(s) that will be included.")
+        ui.print_success("Local branch is ahead of remote (will push with release)")
+        return True
 
     ui.print_success("Local branch is in sync with remote")
     return True
@@ -153,8 +175,28 @@ def format_code(project_dir: Path) -> bool:
     return True
 
 
-def run_tests(project_dir: Path) -> bool:
-    """Run flutter test. Retries once on Flutter cache lock (file in use)."""
+def _print_tail(result: run_mod.StreamResult) -> None:
+    """Print a streamed command's retained output tail for error display."""
+    hidden = result.line_count - len(result.tail)
+    if hidden > 0:
+        ui.print_colored(
+            f"      ... {hidden} earlier line(s) omitted; last {len(result.tail)}:",
+            ui.Color.WHITE,
+        )
+    if result.tail:
+        print(result.output)
+
+
+def run_tests(project_dir: Path, timings: bool = False) -> bool:
+    """Run flutter test. Retries once on Flutter cache lock (file in use).
+
+    Output is streamed: the latest line is shown live on one progress line, and
+    only a bounded tail is kept for the failure display and the lock check.
+
+    With `timings` the suite runs under `--reporter json` and the event stream
+    is folded into per-test and per-file durations (`test_timings`); see
+    `_report_test_timings` for what is written.
+    """
     ui.print_header("STEP 5: RUNNING TESTS")
 
     test_dir = project_dir / "test"
@@ -167,67 +209,189 @@ def run_tests(project_dir: Path) -> bool:
         "Another process is using Flutter's cache (e.g. flutter_tester.exe). "
         "Close other Flutter/Dart processes or IDE test runs and retry."
     )
+    cmd = ["flutter", "test"]
+    if timings:
+        cmd += ["--reporter", "json"]
 
     for attempt in range(1, max_attempts + 1):
-        result = run_mod.run_command(
-            ["flutter", "test"], project_dir, "Running unit tests", capture_output=True
+        ui.print_info("Running unit tests...")
+        ui.print_colored(f"      $ {' '.join(cmd)}", ui.Color.WHITE)
+        progress = run_mod.ProgressLine()
+        # JSON events are unreadable on a progress line; the collector reports
+        # a per-test status line instead.
+        collector = (
+            test_timings.TimingCollector(project_dir, progress) if timings else None
         )
+        # The lock error can scroll out of the tail on a long run, so watch for
+        # it as lines arrive rather than searching the retained output later.
+        lock_seen = False
+
+        def on_line(line: str) -> None:
+            nonlocal lock_seen
+            if "being used by another process" in line or "PathAccessException" in line:
+                lock_seen = True
+            if collector is not None:
+                collector(line)
+            else:
+                progress(line)
+
+        result = run_mod.run_streaming(cmd, project_dir, on_line)
+        progress.finish()
+        if collector is not None:
+            _report_test_timings(project_dir, collector, result.returncode == 0)
         if result.returncode == 0:
+            ui.print_success("Running unit tests completed")
             return True
 
-        out = (result.stdout or "") + (result.stderr or "")
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+        if collector is not None and collector.failures:
+            # The tail is raw JSON events; the collected messages read better.
+            for failure in collector.failures:
+                ui.print_colored(f"      {failure}", ui.Color.WHITE)
+            hidden = collector.failure_count - len(collector.failures)
+            if hidden > 0:
+                ui.print_colored(f"      ... and {hidden} more", ui.Color.WHITE)
+        else:
+            _print_tail(result)
+        ui.print_error(f"Running unit tests failed (exit code {result.returncode})")
 
-        is_lock = "being used by another process" in out or "PathAccessException" in out
-        if is_lock and attempt < max_attempts:
+        if lock_seen and attempt < max_attempts:
             ui.print_warning(lock_hint)
             ui.print_info(f"Retrying in 5 seconds (attempt {attempt + 1}/{max_attempts})...")
             time.sleep(5)
             continue
 
-        if is_lock:
+        if lock_seen:
             ui.print_error(lock_hint)
         return False
 
     return False
 
 
-def run_analysis(project_dir: Path) -> bool:
-    """Run flutter analyze. Fails only on errors, warns on warnings/infos."""
-    ui.print_header("STEP 6: RUNNING STATIC ANALYSIS")
+def _report_test_timings(
+    project_dir: Path, collector: test_timings.TimingCollector, passed: bool
+) -> None:
+    """Write the slowest-tests report and JSON, and record a passing run.
 
-    result = run_mod.run_command(
-        ["flutter", "analyze"],
-        project_dir,
-        "Analyzing code",
-        capture_output=True,
-        allow_failure=True,
-    )
+    The text report goes through `report_store` as kind "test_timings" (next to
+    the audit reports, same retention); the JSON artifact beside it is named
+    as its own kind, "test_timings_data", so the size budget, which keeps the
+    newest file of each kind, protects both.
+    Only a passing run is recorded in the timing history: a failed test's
+    duration says little about how long it takes when it works. Timing is
+    diagnostic, so a failure here warns and never fails the test step.
+    """
+    if not collector.tests:
+        return
+    try:
+        version = vc.get_version_from_pubspec(project_dir / "pubspec.yaml")
+    except (OSError, ValueError):
+        version = None
+    try:
+        slower = None
+        if passed:
+            head = run_mod.run_capture(["git", "rev-parse", "HEAD"], project_dir)
+            git_sha = head.stdout.strip() if head.returncode == 0 else None
+            with test_timings.connect(project_dir) as conn:
+                run_id = test_timings.record_run(conn, collector, version, git_sha)
+                slower = test_timings.slower_tests(conn, run_id)
+        lines = test_timings.report_lines(collector, slower)
+        reports_root = project_dir / "reports"
+        report_path, written = report_store.write_report(
+            reports_root, "test_timings", "\n".join(lines), version=version
+        )
+        if written:
+            data_path = report_path.with_name(f"{report_path.stem}_data.json")
+            test_timings.write_json(data_path, collector)
+    except (OSError, sqlite3.Error) as e:
+        ui.print_warning(f"Could not record test timings: {e}")
+        return
+
+    ui.print_info(f"Test timings: {report_path}")
+    for test in collector.slowest()[:5]:
+        ui.print_colored(f"      {test.seconds:7.2f}s  {test.name}", ui.Color.WHITE)
+    if slower:
+        ui.print_warning(f"{len(slower)} test(s) notably slower than their recent runs:")
+        for test in slower[:5]:
+            ui.print_colored(
+                f"      {test.seconds:7.2f}s (was {test.median:.2f}s)  {test.name}",
+                ui.Color.WHITE,
+            )
 
-    output = (result.stdout or "") + (result.stderr or "")
 
-    if result.returncode == 0:
-        ui.print_success("No analysis issues found")
-        return True
+class AnalyzerSeverityCounter:
+    """`on_line` callback that tallies analyzer findings as lines stream in.
+
+    Understands both output shapes: the human `flutter analyze` format, whose
+    finding lines start with the severity word (`error • ...`), and the
+    pipe-delimited `--format machine` format (`ERROR|LINT|...`).
+    """
 
-    # Count severity levels from analyzer output lines
-    error_count = 0
-    warning_count = 0
-    info_count = 0
-    for line in output.splitlines():
+    def __init__(self) -> None:
+        self.errors = 0
+        self.warnings = 0
+        self.infos = 0
+
+    def __call__(self, line: str) -> None:
         stripped = line.strip().lower()
         if stripped.startswith("error"):
-            error_count += 1
+            self.errors += 1
         elif stripped.startswith("warning"):
-            warning_count += 1
+            self.warnings += 1
         elif stripped.startswith("info"):
-            info_count += 1
+            self.infos += 1
+
+
+def run_analysis(project_dir: Path, warm: bool = True) -> bool:
+    """Run flutter analyze. Fails on errors and warnings; infos only warn.
+
+    With `warm`, the shared `analysis_server` session answers instead (only
+    files changed since the audit are re-analyzed); the cold CLI runs when the
+    session is unavailable.
+    """
+    ui.print_header("STEP 6: RUNNING STATIC ANALYSIS")
+
+    found = analysis_server.diagnostics(project_dir) if warm else None
+    if found is not None:
+        ui.print_info("Analyzing code (warm analysis server)...")
+        counter = AnalyzerSeverityCounter()
+        for diagnostic in found:
+            counter(diagnostic.severity)
+        details = [d.detail for d in found]
+
+        def show_findings() -> None:
+            # Same bound as the CLI's retained tail.
+            for detail in details[: run_mod.STREAM_TAIL_LINES]:
+                print(detail)
+            if len(details) > run_mod.STREAM_TAIL_LINES:
+                ui.print_colored(
+                    f"      ... {len(details) - run_mod.STREAM_TAIL_LINES} more",
+                    ui.Color.WHITE,
+                )
+
+        clean = not details
+    else:
+        ui.print_info("Analyzing code...")
+        ui.print_colored("      $ flutter analyze", ui.Color.WHITE)
+        # Severities are counted while the analyzer prints, so a huge finding list
+        # is never held in memory just to be re-split afterwards.
+        counter = AnalyzerSeverityCounter()
+        result = run_mod.run_streaming(["flutter", "analyze"], project_dir, counter)
+
+        def show_findings() -> None:
+            _print_tail(result)
+
+        clean = result.returncode == 0
+
+    if clean:
+        ui.print_success("No analysis issues found")
+        return True
+
+    error_count = counter.errors
+    warning_count = counter.warnings
+    info_count = counter.infos
 
     if error_count > 0:
-        print(output)
+        show_findings()
         ui.print_error(
             f"Analysis found {error_count} error(s), "
             f"{warning_count} warning(s), {info_count} info(s)"
@@ -236,7 +400,7 @@ def run_analysis(project_dir: Path) -> bool:
 
     # Non-zero exit but no issues parsed — flutter itself errored
     if warning_count == 0 and info_count == 0:
-        print(output)
+        show_findings()
         ui.print_error("Analyzer exited with an error (not a lint issue)")
         return False
 
@@ -248,7 +412,7 @@ def run_analysis(project_dir: Path) -> bool:
     # warnings to match the publish semantics. Infos stay non-blocking, since
     # the dry-run does not fail on them.
     if warning_count > 0:
-        print(output)
+        show_findings()
         ui.print_error(
             f"Analysis found {warning_count} warning(s) and "
             f"{info_count} info(s). Warnings fail `dart pub publish` (exit 65) "
@@ -261,8 +425,78 @@ def run_analysis(project_dir: Path) -> bool:
     return True
 
 
-def validate_changelog(project_dir: Path, version: str) -> tuple[bool, str]:
-    """Validate version exists in CHANGELOG and get release notes."""
+def benchmark_gate(project_dir: Path, version: str) -> bool:
+    """Run benchmark/ and block on significant regressions (opt-in step).
+
+    Each case is compared to the most recent JIT baseline of another version
+    in benchmark/baselines.json (`benchmarks.select_baseline`); AOT baselines
+    from `benchmark.py --aot --save` are not comparable and are skipped. A
+    baseline from another machine is compared and reported, but its
+    regressions do not block the release. A clean run is
+    saved as the baseline for `version`, so the release commit carries it and
+    the next release is measured against this one. With no benchmarks or no
+    earlier baseline there is nothing to gate on and the step passes.
+    """
+    ui.print_header("BENCHMARK REGRESSION GATE")
+
+    files = benchmarks.discover(project_dir)
+    if not files:
+        ui.print_warning("No benchmark/*_benchmark.dart files; skipping")
+        return True
+
+    ui.print_info(f"Running {len(files)} benchmark file(s)...")
+    results, failures = benchmarks.run_all(
+        project_dir,
+        files,
+        on_result=lambda r: ui.print_colored(
+            f"      {r.name}: median {r.median:.3f} {r.unit}/call", ui.Color.WHITE
+        ),
+    )
+    if failures:
+        for path, tail in failures:
+            ui.print_error(f"{path.name} failed:")
+            print("\n".join(tail))
+        return False
+
+    # The gate always runs the JIT (`dart run`), so it only compares to JIT baselines.
+    mode = "jit"
+    selected = benchmarks.select_baseline(
+        benchmarks.load_baselines(project_dir), current=version, mode=mode
+    )
+    if selected is not None:
+        base_version, entry = selected
+        ui.print_info(f"Comparing to the {base_version} baseline...")
+        comparisons = benchmarks.compare(entry, results)
+        print("\n".join(benchmarks.format_comparisons(comparisons)))
+        regressions = [c for c in comparisons if c.verdict == "regression"]
+        if regressions and not benchmarks.same_machine(entry):
+            ui.print_warning(
+                f"{len(regressions)} apparent regression(s), but the baseline was taken "
+                f"on '{entry.get('machine')}'; not blocking on another machine's timings."
+            )
+        elif regressions:
+            ui.print_error(
+                f"{len(regressions)} significant regression(s) since {base_version}. "
+                "Fix them, or re-record with `python scripts/benchmark.py --save` "
+                "if the slowdown is intended."
+            )
+            return False
+    else:
+        ui.print_info(f"No earlier {mode} baseline; recording the first one.")
+
+    path = benchmarks.save_baseline(project_dir, version, results, mode)
+    ui.print_success(f"No regressions; baseline for {version} saved to {path.name}")
+    return True
+
+
+def validate_changelog(
+    project_dir: Path, version: str, assume_yes: bool | None = None
+) -> tuple[bool, str]:
+    """Validate version exists in CHANGELOG and get release notes.
+
+    `assume_yes` answers the generic-notes prompt without asking (headless
+    runs); None prompts the operator.
+    """
     ui.print_header("STEP 7: VALIDATING CHANGELOG")
 
     release_notes = vc.validate_changelog_version(project_dir, version)
@@ -276,9 +510,12 @@ def validate_changelog(project_dir: Path, version: str) -> tuple[bool, str]:
 
     if not release_notes:
         ui.print_warning("Version header found but no release notes content.")
-        response = (
-            input(f"  Use generic message 'Release {version}'? [y/N] ").strip().lower()
-        )
+        if assume_yes is not None:
+            response = "y" if assume_yes else "n"
+        else:
+            response = (
+                input(f"  Use generic message 'Release {version}'? [y/N] ").strip().lower()
+            )
         if not response.startswith("y"):
             return False, ""
         release_notes = f"Release {version}"
@@ -398,24 +635,32 @@ def generate_docs(project_dir: Path) -> bool:
     """
     ui.print_header("STEP 8: GENERATING DOCUMENTATION")
 
-    # Use run_capture (not run_command) so we own the messaging: on the CRLF crash
-    # we suppress dartdoc's alarming stack trace and the misleading "failed" line,
-    # and explain the real, harmless cause instead.
+    # Stream (not run_command) so we own the messaging: on the CRLF crash we
+    # suppress dartdoc's alarming stack trace and the misleading "failed" line,
+    # and explain the real, harmless cause instead. The crash signature is
+    # matched per line because it may sit above the retained tail.
     ui.print_info("Generating documentation...")
     ui.print_colored("      $ dart doc", ui.Color.WHITE)
-    result = run_mod.run_capture(["dart", "doc"], project_dir)
+    progress = run_mod.ProgressLine()
+    crash_lines: list[str] = []
+
+    def on_line(line: str) -> None:
+        # Keep only the few lines that can carry the signature (bounded).
+        markers = (_DARTDOC_CRLF_FRAME, "RangeError", "documentation_comment.dart")
+        if len(crash_lines) < 20 and any(m in line for m in markers):
+            crash_lines.append(line)
+        progress(line)
+
+    result = run_mod.run_streaming(["dart", "doc"], project_dir, on_line)
+    progress.finish()
     if result.returncode == 0:
         ui.print_success("Documentation generated")
         return True
 
-    combined = f"{result.stdout or ''}\n{result.stderr or ''}"
-    if not _is_dartdoc_crlf_crash(combined):
+    if not _is_dartdoc_crlf_crash("\n".join(crash_lines)):
         # An unrecognized doc failure: surface dartdoc's output and fail hard so a
         # genuine documentation problem still blocks the release.
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+        _print_tail(result)
         ui.print_error(
             f"Documentation generation failed (exit code {result.returncode})"
         )
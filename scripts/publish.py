@@ -19,16 +19,46 @@ This script automates the complete release workflow for a Dart/Flutter package.
     - Per-parameter unit test coverage (tests vs. parameter count)
     - Recursion and bad practices (empty catch, etc.)
     - Try/catch usage per method
-    - Duplicate Dart class names
+    - Duplicate top-level symbols (classes, extensions, mixins, enums,
+      typedefs, functions) and barrel export collisions
     - Other quality checks (file length, params, TODO, exports, etc.)
+    - Hotspots: methods ranked by git churn x branch/loop complexity
+    - Near-duplicate methods grouped by winnowed fingerprint similarity
+    - Loop performance smells (nested loops over one collection, List scans
+      and String += inside loops, mid-chain .toList()), deepest first
+    - Per-call allocations: RegExp/DateFormat/NumberFormat built from constant
+      arguments (or large non-const literals) inside method bodies, with
+      per-file counts
+    - Sequential awaits: await in loops, independent back-to-back awaits, and
+      async functions that never await
+    - Benchmark coverage: benchmark files referencing each public member
+      (histogram) and the most complex members with no benchmark
+    - Findings by member: every file:line finding (analyzer diagnostics,
+      empty catches, smells, ...) attributed to its enclosing member and type
+      through a per-file interval index, with the worst members and types
+    - (optional, --coverage) Measured line coverage: runs `flutter test
+      --coverage`, maps coverage/lcov.info onto method spans, and ranks
+      barely-covered methods by churn (cached by tracefile hash)
     - Report written to reports/yyyymmdd/yyyymmdd_HHMMSS_publish_audit.txt
+      (skipped when identical to the previous report; old reports are
+      compressed and pruned) and the run's findings and per-check timings
+      recorded in reports/_cache/audit_history.sqlite3 (query with
+      scripts/audit_query.py)
     - If issues remain, prompts ignore / retry / abort:
         ignore = publish anyway, retry = re-run checks, abort = cancel
 
   Pre-checks (before numbered steps):
+    - Runs the preflight probes concurrently (tool lookups, gh auth, git fetch
+      with one ahead/behind count, remote tag list, branch, origin URL) and
+      lists every problem at once; step 1 reuses the results, and step 3
+      reuses the ahead/behind counts unless an audit ran in between (it then
+      fetches again)
     - Validates pubspec.yaml and CHANGELOG.md versions are in sync
     - If CHANGELOG.md has an [Unreleased] section, resolves it:
-      - If current version already has notes: offers patch/minor/major bump
+      - If current version already has notes: offers patch/minor/major bump,
+        defaulting to the one the public-API diff against the current version's
+        tag suggests (read from git objects via `git cat-file --batch`; also
+        scripts/api_diff.py)
       - If no versioned section yet: converts [Unreleased] to version header
     - Strips a "- Unreleased" placeholder off the current version's header
       (e.g. "## [1.1.1] - Unreleased" -> "## [1.1.1]") so the placeholder
@@ -36,7 +66,14 @@ This script automates the complete release workflow for a Dart/Flutter package.
     - Requires the release section to open with a plain-language intro line and
       pins its "[log]" link to the proposed version's tag; a missing intro
       prompts retry/ignore/abort (default retry)
-    - Fails if version tag already exists on remote
+    - Fails if version tag already exists on remote (unless --resume finds
+      that the interrupted run itself pushed it)
+
+  Checkpoints: the audit and each completed step below (except 1 and 3, which
+  always re-run) are recorded in reports/_cache/publish_checkpoint.json with
+  the version, HEAD and a working-tree fingerprint. --resume skips recorded
+  steps when all three still match; otherwise it starts over. A run that
+  reaches pub.dev clears the checkpoint.
 
   Numbered steps:
     1. Checks prerequisites (flutter, git, gh auth, publish workflow)
@@ -44,9 +81,19 @@ This script automates the complete release workflow for a Dart/Flutter package.
     3. Checks remote sync
     4. Regenerates CAPABILITIES.md (the per-symbol index) so it ships current;
        the release commit (step 11) stages it automatically. Non-fatal.
+       Skipped (header restamped only) when the public-API fingerprint stored
+       in the file matches; otherwise runs a cached native build of the tool
     5. Formats code
-    6. Runs tests
-    7. Runs static analysis
+    6. Runs tests (with --test-timings: under the JSON reporter, writing a
+       slowest-tests report and JSON next to the audit report and flagging
+       tests slower than their recent runs; history in
+       reports/_cache/test_timings.sqlite3)
+    7. Runs static analysis, reusing the audit's warm `dart language-server`
+       session so only files changed since the audit are re-analyzed (the
+       CLI runs with --cold-analysis or when the server is unavailable)
+       (optional, --benchmarks) Runs benchmark/ and blocks on significant
+       regressions against the last version's baseline (benchmark/baselines.json);
+       a clean run is saved as this version's baseline and ships in the commit
     8. Validates changelog has release notes
     9. Generates documentation with dart doc
     10. Pre-publish validation (dry-run)
@@ -59,7 +106,7 @@ This script automates the complete release workflow for a Dart/Flutter package.
         only exits 0 once pub.dev serves the new version; a workflow that reports
         success while pub.dev got nothing exits PUBLISH_FAILED.
 
-Version:   2.9
+Version:   3.0
 Author:    Saropa
 Copyright: (c) 2025 Saropa
 
@@ -67,6 +114,38 @@ Usage:
     python scripts/publish.py
     Then choose 1, 2, or 3 when prompted.
 
+Headless (no prompts, for batch jobs) — passing --mode skips every input():
+    python scripts/publish.py --mode audit --summary-json -
+    python scripts/publish.py --mode full --bump patch --on-findings fail --yes
+
+    --mode {full,audit,build}    1 / 2 / 3 above; required for headless runs
+    --bump {patch,minor,major,auto}
+                                 answers the [Unreleased] bump prompt (auto =
+                                 the public-API diff's suggestion); without
+                                 it a needed bump fails with exit 5
+    --on-findings {fail,ignore}  audit findings abort (exit 10, the default)
+                                 or are ignored
+    --yes                        accept confirmations (uncommitted changes go
+                                 into the release commit; empty release notes
+                                 use "Release X.Y.Z"); without it they decline
+    --summary-json PATH          write a JSON exit summary ("-" = stdout; all
+                                 other output then goes to stderr)
+    --benchmarks                 add the benchmark regression gate after
+                                 analysis (also works interactively)
+    --coverage                   add measured per-method line coverage to the
+                                 audit (runs the tests; also interactive)
+    --test-timings               profile per-test durations in the test step
+                                 (also interactive)
+    --cold-analysis              run the analyzer CLI for audit section 2 and
+                                 step 7 instead of the shared warm analysis
+                                 server (also interactive)
+    --resume                     continue an interrupted release of the same
+                                 version from its first incomplete step (also
+                                 interactive)
+    --project-dir PATH           publish the package at PATH instead of this
+                                 repository (used by scripts/release_train.py)
+    A missing CHANGELOG release intro fails headless runs with exit 5.
+
 Exit Codes:
     0 - Success
     1 - Prerequisites failed
@@ -79,22 +158,33 @@ Exit Codes:
     8 - Git operations failed
     9 - User cancelled
     10 - Audit had errors/warnings and user chose not to continue
+    11 - Benchmark regression gate failed (--benchmarks)
 """
 
 from __future__ import annotations
 
+import argparse
+import contextlib
+import json
+import os
 import re
 import subprocess
 import sys
 import webbrowser
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from modules import audit
 from modules import constants
 from modules import platform as platform_mod
 from modules import ui
-from modules import version_changelog as vc
-from modules import workflow
+
+if TYPE_CHECKING:
+    from modules.version_changelog import ChangelogDocument
+
+# The audit, changelog and workflow modules are imported inside the functions
+# that need them, so `--mode audit` never loads the publish workflow stack.
 
 SCRIPT_VERSION = constants.SCRIPT_VERSION
 ExitCode = constants.ExitCode
@@ -104,6 +194,149 @@ ExitCode = constants.ExitCode
 # few so the operator gets a signal without scrolling past hundreds of lines.
 TERMINAL_FINDINGS_LIMIT = 10
 
+# --mode values, mapped to the interactive menu numbers.
+MODE_CHOICES = {"full": 1, "audit": 2, "build": 3}
+MODE_NAMES = {number: name for name, number in MODE_CHOICES.items()}
+
+
+@dataclass
+class PublishOptions:
+    """Command-line options. `mode` None means the interactive menu."""
+
+    mode: int | None = None
+    bump: str | None = None
+    on_findings: str = "fail"
+    assume_yes: bool = False
+    summary_json: str | None = None
+    benchmarks: bool = False
+    coverage: bool = False
+    test_timings: bool = False
+    cold_analysis: bool = False
+    resume: bool = False
+    # None: the repository this script lives in.
+    project_dir: Path | None = None
+
+    @property
+    def headless(self) -> bool:
+        """True when every prompt must be answered from flags, never input()."""
+        return self.mode is not None
+
+
+@dataclass
+class RunSummary:
+    """Machine-readable outcome of a run, written by `--summary-json`."""
+
+    mode: str | None = None
+    package: str | None = None
+    version: str | None = None
+    report: str | None = None
+    # Audit category -> finding count, from the last audit pass.
+    findings: dict[str, int] = field(default_factory=dict)
+    published: bool | None = None
+    exit_code: int = ExitCode.SUCCESS.value
+    exit_name: str = ExitCode.SUCCESS.name
+
+    def set_exit(self, code: int) -> None:
+        """Record the process exit code and its `ExitCode` name."""
+        self.exit_code = code
+        try:
+            self.exit_name = ExitCode(code).name
+        except ValueError:
+            self.exit_name = "UNKNOWN"
+
+    def write(self, target: str) -> None:
+        """Write the summary as JSON to `target` ("-" for stdout)."""
+        text = json.dumps(asdict(self), indent=2, sort_keys=True)
+        if target == "-":
+            print(text)
+        else:
+            Path(target).write_text(text + "\n", encoding="utf-8")
+
+
+def parse_args(argv: list[str] | None = None) -> PublishOptions:
+    """Parse the command line; with no arguments the script stays interactive."""
+    parser = argparse.ArgumentParser(
+        description="Audit and publish saropa_dart_utils (interactive by default)."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=sorted(MODE_CHOICES),
+        help="run headless: full = audit + build, audit = audit only, build = build only",
+    )
+    parser.add_argument(
+        "--bump",
+        choices=["patch", "minor", "major", "auto"],
+        help="version bump when CHANGELOG has [Unreleased] beyond the current version "
+        "(auto = suggested by the public-API diff since the last tag)",
+    )
+    parser.add_argument(
+        "--on-findings",
+        choices=["fail", "ignore"],
+        default="fail",
+        help="what to do when the audit reports quality issues (default: fail)",
+    )
+    parser.add_argument(
+        "--yes",
+        action="store_true",
+        help="accept confirmation prompts (uncommitted changes, generic release notes)",
+    )
+    parser.add_argument(
+        "--summary-json",
+        metavar="PATH",
+        help='write a JSON exit summary to PATH ("-" for stdout)',
+    )
+    parser.add_argument(
+        "--benchmarks",
+        action="store_true",
+        help="run benchmark/ after analysis and fail on significant regressions",
+    )
+    parser.add_argument(
+        "--coverage",
+        action="store_true",
+        help="run the tests with --coverage during the audit for per-method line coverage",
+    )
+    parser.add_argument(
+        "--test-timings",
+        action="store_true",
+        help="record per-test durations in the test step and report the slowest",
+    )
+    parser.add_argument(
+        "--cold-analysis",
+        action="store_true",
+        help="use the dart/flutter analyze CLI instead of a warm analysis-server session",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the steps an interrupted run of this version already completed",
+    )
+    parser.add_argument(
+        "--project-dir",
+        type=Path,
+        help="package root to publish (default: this script's repository)",
+    )
+    args = parser.parse_args(argv)
+    # The answer flags only mean something when nothing is prompted for.
+    if args.mode is None and (
+        args.bump or args.yes or args.on_findings != "fail" or args.summary_json
+    ):
+        parser.error("--bump, --on-findings, --yes and --summary-json require --mode")
+    if args.resume and args.mode == "audit":
+        parser.error("--resume applies to the publish workflow, not --mode audit")
+    return PublishOptions(
+        mode=MODE_CHOICES[args.mode] if args.mode else None,
+        bump=args.bump,
+        on_findings=args.on_findings,
+        assume_yes=args.yes,
+        summary_json=args.summary_json,
+        benchmarks=args.benchmarks,
+        coverage=args.coverage,
+        test_timings=args.test_timings,
+        cold_analysis=args.cold_analysis,
+        resume=args.resume,
+        project_dir=args.project_dir.resolve() if args.project_dir else None,
+    )
+
 
 def _display_findings_top10(findings: dict[str, list[str]]) -> None:
     """Print the top N detail lines of each finding category to the terminal.
@@ -124,7 +357,12 @@ def _display_findings_top10(findings: dict[str, list[str]]) -> None:
             )
 
 
-def run_audit_phase(project_dir: Path) -> None:
+def run_audit_phase(
+    project_dir: Path,
+    on_findings: str | None = None,
+    line_coverage: bool = False,
+    warm_analysis: bool = True,
+) -> tuple[dict[str, list[str]], Path]:
     """Run the pre-publish quality audit and act on the operator's choice.
 
     Loops so "retry" can re-run every check after the operator fixes issues in
@@ -134,14 +372,22 @@ def run_audit_phase(project_dir: Path) -> None:
       - ignore: proceed with publishing despite the findings.
       - retry:  re-run all checks (pick this after fixing issues).
       - abort:  cancel publication (the default, since it is the safe choice).
-    Returns normally only when the audit is clean or the operator ignores it;
-    aborting exits the process via `ui.exit_with_error`.
+    A headless run passes `on_findings` ("fail" or "ignore") instead, which
+    answers the prompt without asking. Returns the last pass's
+    (findings, report_path) when the audit is clean or the findings are
+    ignored; aborting exits the process via `ui.exit_with_error`.
+    `line_coverage` (`--coverage`) and `warm_analysis` (off with
+    `--cold-analysis`) are passed through to `audit.run_audit`.
     """
+    from modules import audit
+
     while True:
-        findings, report_path = audit.run_audit(project_dir)
+        findings, report_path = audit.run_audit(
+            project_dir, line_coverage, warm_analysis
+        )
         if not findings:
             ui.print_success("Audit found no quality issues.")
-            return
+            return findings, report_path
 
         print()
         ui.print_colored(
@@ -152,19 +398,24 @@ def run_audit_phase(project_dir: Path) -> None:
         print()
         ui.print_info(f"Full report: {report_path}")
 
-        ui.print_colored("  Choose an action:", ui.Color.WHITE)
-        ui.print_colored("    i = ignore (publish anyway)", ui.Color.CYAN)
-        ui.print_colored(
-            "    r = retry  (re-run checks after you fix the issues)",
-            ui.Color.CYAN,
-        )
-        ui.print_colored("    a = abort  (cancel publication)", ui.Color.CYAN)
-        # Default to abort: an empty Enter must not silently ship a flagged build.
-        action = input("  Enter i, r, or a [a]: ").strip().lower() or "a"
+        if on_findings is not None:
+            # Headless: retry is meaningless without an operator, so the flag
+            # maps straight onto ignore or abort.
+            action = "i" if on_findings == "ignore" else "a"
+        else:
+            ui.print_colored("  Choose an action:", ui.Color.WHITE)
+            ui.print_colored("    i = ignore (publish anyway)", ui.Color.CYAN)
+            ui.print_colored(
+                "    r = retry  (re-run checks after you fix the issues)",
+                ui.Color.CYAN,
+            )
+            ui.print_colored("    a = abort  (cancel publication)", ui.Color.CYAN)
+            # Default to abort: an empty Enter must not silently ship a flagged build.
+            action = input("  Enter i, r, or a [a]: ").strip().lower() or "a"
 
         if action.startswith("i"):
             ui.print_success("Ignoring audit findings; continuing with publish.")
-            return
+            return findings, report_path
         if action.startswith("r"):
             ui.print_info("Re-running quality checks...")
             continue
@@ -174,31 +425,61 @@ def run_audit_phase(project_dir: Path) -> None:
         )
 
 
-def validate_release_intro_phase(changelog_path: Path, version: str) -> None:
+def suggest_bump_phase(project_dir: Path, version: str) -> str | None:
+    """Print the public-API diff since tag v{version} and return its bump.
+
+    None when the tag is not in the local clone (nothing to diff against);
+    the prompt then defaults to patch as before.
+    """
+    from modules import api_diff
+
+    tag_name = f"v{version}"
+    try:
+        diff = api_diff.diff_revisions(project_dir, tag_name)
+    except ValueError:
+        ui.print_info(f"No local tag {tag_name}; no public-API bump suggestion.")
+        return None
+    for line in api_diff.report_lines(diff, limit=10):
+        ui.print_colored(f"  {line}", ui.Color.WHITE)
+    suggested = api_diff.suggest_bump(diff, version)
+    ui.print_info(f"Suggested bump from the public-API diff: {suggested}")
+    return suggested
+
+
+def validate_release_intro_phase(
+    doc: ChangelogDocument, version: str, headless: bool = False
+) -> ChangelogDocument:
     """Ensure the release section has a human intro and a version-pinned log link.
 
     The CHANGELOG maintenance note requires every release to open with one
     plain-language line and close with `[log](.../v<version>/CHANGELOG.md)`.
     Two distinct treatments:
-      - Log link: mechanical. `update_log_link` rewrites an existing link
+      - Log link: mechanical. `pin_log_link` rewrites an existing link
         (the [Unreleased] template ships it pointing at `main`) to v{version},
         so only a wholly missing link is flagged here.
       - Intro line: hand-written prose the script cannot synthesize. A missing
         one loops on retry / ignore / abort, defaulting to retry so the operator
         can add it in an editor and re-check without restarting the run.
-    Returns when both are present (or the operator ignores); abort exits via
-    `ui.exit_with_error`.
+    Every pending edit on `doc` (including the caller's earlier header fixes)
+    is flushed in one write before the check can prompt, so the operator edits
+    the current file; a retry re-reads it. Returns the document that reflects
+    the file on disk once both are present (or the operator ignores); abort
+    exits via `ui.exit_with_error`. A headless run cannot wait for an edit, so
+    a missing intro or link fails immediately.
     """
+    from modules import version_changelog as vc
+
     while True:
         # Pin the log link first so a re-check sees the corrected URL; the call
         # also tells us whether any log link exists to pin.
-        link_ok = vc.update_log_link(changelog_path, version)
-        intro_ok = vc.has_release_intro(changelog_path, version)
+        link_ok = doc.pin_log_link(version)
+        intro_ok = doc.has_release_intro(version)
+        doc.save()
         if intro_ok and link_ok:
             ui.print_success(
                 f"Release intro and v{version} log link present in CHANGELOG.md."
             )
-            return
+            return doc
 
         print()
         if not intro_ok:
@@ -213,6 +494,11 @@ def validate_release_intro_phase(changelog_path: Path, version: str) -> None:
             "Each release opens with one casual, user-facing line, then ends with:"
         )
         ui.print_info(f"  [log]({vc.LOG_LINK_BASE}/v{version}/CHANGELOG.md)")
+        if headless:
+            ui.exit_with_error(
+                "CHANGELOG release intro/log link missing (headless run).",
+                ExitCode.CHANGELOG_FAILED,
+            )
 
         ui.print_colored("  Choose an action:", ui.Color.WHITE)
         ui.print_colored(
@@ -226,36 +512,53 @@ def validate_release_intro_phase(changelog_path: Path, version: str) -> None:
 
         if action.startswith("i"):
             ui.print_warning("Ignoring missing intro/log link; continuing with publish.")
-            return
+            return doc
         if action.startswith("a"):
             ui.exit_with_error(
                 "User aborted publication: CHANGELOG release intro/log link missing.",
                 ExitCode.CHANGELOG_FAILED,
             )
-        # Anything else (including the default) re-runs the check.
+        # Anything else (including the default) re-runs the check against the
+        # operator's edited file.
         ui.print_info("Re-checking CHANGELOG.md...")
+        doc = doc.reload()
 
 
 def regenerate_capabilities(project_dir: Path) -> None:
-    """Regenerate CAPABILITIES.md so the published index reflects the current
-    public API.
-
-    Run unconditionally (no staleness gate): any change is picked up by the
-    release commit (`git add -A`), so the index can never ship stale. Failure is
-    non-fatal — a hiccup in a docs-index regen must not block a release; it is
-    surfaced as a warning instead.
-
-    Uses the AST-based `tool/gen_capabilities.dart` (run via `dart run`): the
-    Dart analyzer enumerates EVERY public declaration, not just doc-commented
-    ones, so the catalog is complete and correctly labeled.
+    """Bring CAPABILITIES.md up to date with the current public API.
+
+    Any change is picked up by the release commit (`git add -A`), so the index
+    can never ship stale. Failure is non-fatal — a hiccup in a docs-index regen
+    must not block a release; it is surfaced as a warning instead.
+
+    Uses the AST-based `tool/gen_capabilities.dart`: the Dart analyzer
+    enumerates EVERY public declaration, not just doc-commented ones, so the
+    catalog is complete and correctly labeled. It only runs when the public-API
+    fingerprint recorded in the file no longer matches (`capabilities`);
+    otherwise just the release/date header is restamped. When it does run, it
+    runs from a cached `dart compile exe` build of the tool.
     """
-    script = project_dir / "tool" / "gen_capabilities.dart"
+    from modules import capabilities
+    from modules import version_changelog as vc
+
+    script = project_dir / capabilities.TOOL_RELATIVE_PATH
     if not script.exists():
         ui.print_warning("tool/gen_capabilities.dart not found; skipping index regen.")
         return
+    output = project_dir / capabilities.OUTPUT_NAME
+    fingerprint = capabilities.api_fingerprint(project_dir)
+    if output.exists() and capabilities.stored_fingerprint(output) == fingerprint:
+        try:
+            version = vc.get_version_from_pubspec(project_dir / "pubspec.yaml")
+        except (OSError, ValueError):
+            version = None
+        capabilities.stamp(output, fingerprint, version)
+        ui.print_success("Public API unchanged; CAPABILITIES.md header restamped.")
+        return
+
     ui.print_info("Regenerating CAPABILITIES.md index...")
     res = subprocess.run(
-        ["dart", "run", "tool/gen_capabilities.dart"],
+        capabilities.tool_command(project_dir),
         cwd=project_dir,
         capture_output=True,
         text=True,
@@ -266,11 +569,51 @@ def regenerate_capabilities(project_dir: Path) -> None:
     if res.returncode != 0:
         ui.print_warning(f"Index regeneration failed (continuing): {res.stderr.strip()}")
         return
+    # The tool wrote a fresh header; only the fingerprint needs recording.
+    capabilities.stamp(output, fingerprint, None)
     ui.print_success(res.stdout.strip() or "CAPABILITIES.md regenerated.")
 
 
-def main() -> int:
-    """Main entry point."""
+@contextlib.contextmanager
+def _stdout_to_stderr() -> Iterator[None]:
+    """Point file descriptor 1 at stderr for the duration, then restore it.
+
+    Redirecting the descriptor rather than `sys.stdout` also covers the tools
+    the steps run (flutter, dart, git), which inherit it.
+    """
+    sys.stdout.flush()
+    saved = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Main entry point: parse options, run, and emit the exit summary."""
+    options = parse_args(argv)
+    summary = RunSummary()
+    # With `--summary-json -` stdout carries only the JSON, so a caller can
+    # parse it; the logo, banners and step output go to stderr.
+    redirect = _stdout_to_stderr() if options.summary_json == "-" else contextlib.nullcontext()
+    with redirect:
+        try:
+            code = _run(options, summary)
+        except SystemExit as exc:
+            # `ui.exit_with_error` exits from deep inside a step; catch it here
+            # so the summary still records how (and where) the run ended.
+            code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    summary.set_exit(code)
+    if options.summary_json:
+        summary.write(options.summary_json)
+    return code
+
+
+def _run(options: PublishOptions, summary: RunSummary) -> int:
+    """Run the chosen mode; returns the exit code (or exits via `ui`)."""
     ui.enable_ansi_support()
     ui.show_saropa_logo()
     ui.print_colored(
@@ -279,7 +622,7 @@ def main() -> int:
     print()
 
     script_dir = Path(__file__).parent
-    project_dir = script_dir.parent
+    project_dir = options.project_dir or script_dir.parent
 
     pubspec_path = project_dir / "pubspec.yaml"
     if not pubspec_path.exists():
@@ -288,21 +631,40 @@ def main() -> int:
         )
 
     # Mode: 1 = audit + build, 2 = audit only, 3 = build only
-    ui.print_colored("  Choose mode:", ui.Color.WHITE)
-    ui.print_colored("    1 = Audit + build (audit then full publish workflow)", ui.Color.CYAN)
-    ui.print_colored("    2 = Audit only (run audit, write report, exit)", ui.Color.CYAN)
-    ui.print_colored("    3 = Build only (skip audit, run publish workflow)", ui.Color.CYAN)
-    raw = input("  Enter 1, 2, or 3 [1]: ").strip() or "1"
-    if raw not in ("1", "2", "3"):
-        ui.exit_with_error("Invalid choice. Enter 1, 2, or 3.", ExitCode.USER_CANCELLED)
-    mode = int(raw)
+    if options.mode is not None:
+        mode = options.mode
+    else:
+        ui.print_colored("  Choose mode:", ui.Color.WHITE)
+        ui.print_colored("    1 = Audit + build (audit then full publish workflow)", ui.Color.CYAN)
+        ui.print_colored("    2 = Audit only (run audit, write report, exit)", ui.Color.CYAN)
+        ui.print_colored("    3 = Build only (skip audit, run publish workflow)", ui.Color.CYAN)
+        raw = input("  Enter 1, 2, or 3 [1]: ").strip() or "1"
+        if raw not in ("1", "2", "3"):
+            ui.exit_with_error("Invalid choice. Enter 1, 2, or 3.", ExitCode.USER_CANCELLED)
+        mode = int(raw)
+    summary.mode = MODE_NAMES[mode]
 
     if mode == 2:
-        # Audit only: run audit and exit
-        audit.run_audit(project_dir)
+        # Audit only: run audit and exit. Imported here so this path never
+        # loads the workflow stack.
+        from modules import audit
+
+        findings, report_path = audit.run_audit(
+            project_dir, options.coverage, not options.cold_analysis
+        )
+        summary.report = str(report_path)
+        summary.findings = {k: len(v) for k, v in findings.items()}
         ui.print_success("Audit complete. Report path is shown above.")
+        # A headless audit is a gate: findings fail it unless told to ignore.
+        if options.headless and findings and options.on_findings == "fail":
+            ui.print_error("Audit reported quality issues (--on-findings=fail).")
+            return ExitCode.AUDIT_FAILED.value
         return ExitCode.SUCCESS.value
 
+    from modules import preflight as preflight_mod
+    from modules import version_changelog as vc
+    from modules import workflow
+
     changelog_path = project_dir / "CHANGELOG.md"
     if not changelog_path.exists():
         ui.exit_with_error(
@@ -312,8 +674,17 @@ def main() -> int:
 
     package_name = vc.get_package_name(pubspec_path)
     version = vc.get_version_from_pubspec(pubspec_path)
-    branch = workflow.get_current_branch(project_dir)
-    remote_url = workflow.get_remote_url(project_dir)
+    summary.package = package_name
+    summary.version = version
+
+    # Launch the network-bound probes (gh auth, git fetch + ahead/behind, remote
+    # tag list, branch, origin URL) together now, before any prompt, so every
+    # problem is reported in one go and the steps below read cached results.
+    ui.print_info("Running preflight checks (tools, gh auth, remote sync, tags)...")
+    preflight = preflight_mod.run_preflight(project_dir)
+    preflight_mod.report_preflight(preflight)
+    branch = preflight.branch
+    remote_url = preflight.remote_url
 
     if not re.match(r"^\d+\.\d+\.\d+$", version):
         ui.exit_with_error(
@@ -321,7 +692,10 @@ def main() -> int:
             ExitCode.VALIDATION_FAILED,
         )
 
-    changelog_version = vc.get_latest_changelog_version(changelog_path)
+    # Parse CHANGELOG.md once; the pre-checks below query and edit this
+    # document and it is written back once, in validate_release_intro_phase.
+    changelog = vc.ChangelogDocument.load(changelog_path)
+    changelog_version = changelog.latest_version
     if changelog_version is None:
         ui.exit_with_error(
             "Could not extract version from CHANGELOG.md", ExitCode.CHANGELOG_FAILED
@@ -340,6 +714,7 @@ def main() -> int:
             )
             vc.update_pubspec_version(pubspec_path, changelog_version)
             version = changelog_version
+            summary.version = version
             ui.print_success(f"pubspec.yaml updated to {version}")
         else:
             ui.exit_with_error(
@@ -350,8 +725,8 @@ def main() -> int:
             )
 
     # Handle [Unreleased] section before proceeding
-    if vc.has_unreleased_section(changelog_path):
-        existing_notes = vc.validate_changelog_version(project_dir, version)
+    if changelog.has_unreleased:
+        existing_notes = changelog.release_notes(version)
         if existing_notes is not None:
             # Version already has a CHANGELOG section, so [Unreleased] is for
             # a newer version — offer to bump
@@ -366,7 +741,17 @@ def main() -> int:
             ui.print_colored(f"    2 = minor  → {minor_v}", ui.Color.CYAN)
             ui.print_colored(f"    3 = major  → {major_v}", ui.Color.CYAN)
             ui.print_colored("    n = cancel", ui.Color.CYAN)
-            choice = input("  Enter 1, 2, 3, or n [1]: ").strip() or "1"
+            bump_choices = {"patch": "1", "minor": "2", "major": "3"}
+            suggested = suggest_bump_phase(project_dir, version)
+            if options.headless:
+                # No --bump (or auto without a suggestion) means the run cannot
+                # pick a version: cancel ("n").
+                bump = suggested if options.bump == "auto" else options.bump
+                choice = bump_choices.get(bump or "", "n")
+                ui.print_info(f"Headless bump choice: {bump or 'none'}")
+            else:
+                default = bump_choices.get(suggested or "patch", "1")
+                choice = input(f"  Enter 1, 2, 3, or n [{default}]: ").strip() or default
             if choice == "1":
                 next_version = patch_v
             elif choice == "2":
@@ -379,14 +764,15 @@ def main() -> int:
                     "before publishing.",
                     ExitCode.CHANGELOG_FAILED,
                 )
-            vc.update_changelog_unreleased(changelog_path, next_version)
+            changelog.release_unreleased(next_version)
             ui.print_success(f"CHANGELOG.md: [Unreleased] → [{next_version}]")
             vc.update_pubspec_version(pubspec_path, next_version)
             ui.print_success(f"pubspec.yaml: {version} → {next_version}")
             version = next_version
+            summary.version = version
         else:
             # No versioned section yet — [Unreleased] IS the release notes
-            vc.update_changelog_unreleased(changelog_path, version)
+            changelog.release_unreleased(version)
             ui.print_success(f"CHANGELOG.md: [Unreleased] → [{version}]")
 
     # Resolve the other unreleased shape: a versioned header that still carries
@@ -394,26 +780,40 @@ def main() -> int:
     # past has_unreleased_section (which only matches a bare `[Unreleased]`), so
     # without this strip the placeholder would publish to pub.dev labelling the
     # release as unreleased. Strip it to leave `## [1.1.1]`.
-    if vc.strip_unreleased_suffix(changelog_path, version):
+    if changelog.strip_unreleased_suffix(version):
         ui.print_success(f"CHANGELOG.md: stripped '- Unreleased' from [{version}]")
 
     # With the header now pinned to a concrete version, require the release
     # section's human intro line and pin its [log] link to v{version} (the
     # [Unreleased] template ships the link pointing at `main`). A missing intro
     # loops on retry/ignore/abort; the log link is rewritten automatically.
-    validate_release_intro_phase(changelog_path, version)
+    changelog = validate_release_intro_phase(changelog, version, options.headless)
+
+    from modules import checkpoint as checkpoint_mod
+
+    # The pre-checks above are idempotent, so a resumed run reaches this point
+    # with the tree exactly as the interrupted run left it.
+    resumed = None
+    if options.resume:
+        resumed, reason = checkpoint_mod.resume(project_dir, version)
+        if resumed is None:
+            ui.print_warning(f"Cannot resume ({reason}); starting from step 1.")
+        else:
+            ui.print_info(f"Resuming v{version}; completed: {', '.join(resumed.steps) or 'none'}")
+    checkpoint = resumed or checkpoint_mod.start(project_dir, version)
+
+    def skip(step: str) -> bool:
+        """True (and say so) when the interrupted run completed `step`."""
+        if checkpoint.done(step):
+            ui.print_info(f"Resume: {step} already done, skipping.")
+            return True
+        return False
 
     tag_name = f"v{version}"
-    res = subprocess.run(
-        ["git", "ls-remote", "--tags", "origin", f"refs/tags/{tag_name}"],
-        cwd=project_dir,
-        capture_output=True,
-        text=True,
-        shell=platform_mod.get_shell_mode(),
-        encoding="utf-8",
-        errors="replace",
-    )
-    if res.returncode == 0 and res.stdout.strip():
+    # The preflight listed every v* tag on origin, so the guard is a lookup that
+    # also works for a version the [Unreleased] bump above just chose. A tag
+    # the interrupted run pushed itself is the resume case, not a conflict.
+    if preflight.tag_on_remote(tag_name) and not checkpoint.done("tag"):
         ui.exit_with_error(
             f"Tag {tag_name} already exists on remote. "
             "This version has already been released.\n"
@@ -431,87 +831,143 @@ def main() -> int:
     ui.print_colored(f"      Repository: {remote_url}", ui.Color.CYAN)
     print()
 
-    vc.display_changelog(project_dir)
+    vc.display_changelog(project_dir, changelog)
 
     # =========================================================================
     # AUDIT PHASE (mode 1 only: run quality checks, then ignore/retry/abort)
     # =========================================================================
-    if mode == 1:
-        run_audit_phase(project_dir)
+    audit_ran = False
+    if mode == 1 and skip("audit"):
+        summary.report = checkpoint.data.get("report")
+    elif mode == 1:
+        audit_ran = True
+        findings, report_path = run_audit_phase(
+            project_dir,
+            options.on_findings if options.headless else None,
+            options.coverage,
+            not options.cold_analysis,
+        )
+        summary.report = str(report_path)
+        summary.findings = {k: len(v) for k, v in findings.items()}
+        checkpoint.complete("audit", project_dir, report=str(report_path))
 
     # =========================================================================
     # WORKFLOW STEPS (mode 1 and 3)
     # =========================================================================
-    if not workflow.check_prerequisites(project_dir):
+    if not workflow.check_prerequisites(project_dir, preflight):
         ui.exit_with_error("Prerequisites check failed", ExitCode.PREREQUISITES_FAILED)
 
-    ok, _ = workflow.check_working_tree(project_dir)
-    if not ok:
-        ui.exit_with_error(
-            "Aborted by user. Commit or stash your changes first.",
-            ExitCode.USER_CANCELLED,
-        )
+    # Headless runs answer confirmations from --yes; None keeps the prompt.
+    assume_yes = options.assume_yes if options.headless else None
 
-    if not workflow.check_remote_sync(project_dir, branch):
+    if not skip("working_tree"):
+        ok, _ = workflow.check_working_tree(project_dir, assume_yes)
+        if not ok:
+            ui.exit_with_error(
+                "Aborted by user. Commit or stash your changes first.",
+                ExitCode.USER_CANCELLED,
+            )
+        checkpoint.complete("working_tree", project_dir)
+
+    # The preflight fetch predates the audit (minutes, with retry prompts);
+    # re-probe after one rather than act on stale ahead/behind counts.
+    if not workflow.check_remote_sync(project_dir, branch, None if audit_ran else preflight):
         ui.exit_with_error("Remote sync check failed", ExitCode.WORKING_TREE_FAILED)
 
     # Regenerate the per-symbol index now (tree is already clean past the
     # working-tree check); the release commit below stages it via `git add -A`.
-    regenerate_capabilities(project_dir)
+    if not skip("capabilities"):
+        regenerate_capabilities(project_dir)
+        checkpoint.complete("capabilities", project_dir)
 
-    if not workflow.format_code(project_dir):
-        ui.exit_with_error("Code formatting failed", ExitCode.VALIDATION_FAILED)
+    if not skip("format"):
+        if not workflow.format_code(project_dir):
+            ui.exit_with_error("Code formatting failed", ExitCode.VALIDATION_FAILED)
+        checkpoint.complete("format", project_dir)
 
-    if not workflow.run_tests(project_dir):
-        ui.exit_with_error(
-            "Tests failed. Fix test failures before publishing.", ExitCode.TEST_FAILED
-        )
+    if not skip("tests"):
+        if not workflow.run_tests(project_dir, options.test_timings):
+            ui.exit_with_error(
+                "Tests failed. Fix test failures before publishing.", ExitCode.TEST_FAILED
+            )
+        checkpoint.complete("tests", project_dir)
 
     # run_analysis now fails on WARNING-severity findings, not just errors:
     # `dart pub publish` runs `dart analyze` internally and exits 65 on a single
     # warning, so a warning that passed here previously still blocked the
     # tag-triggered publish (the v1.6.0 whack-a-mole). Matching the semantics
     # locally catches it before the irreversible tag.
-    if not workflow.run_analysis(project_dir):
-        ui.exit_with_error(
-            "Static analysis failed. Fix issues before publishing.",
-            ExitCode.ANALYSIS_FAILED,
-        )
+    if not skip("analysis"):
+        if not workflow.run_analysis(project_dir, not options.cold_analysis):
+            ui.exit_with_error(
+                "Static analysis failed. Fix issues before publishing.",
+                ExitCode.ANALYSIS_FAILED,
+            )
+        checkpoint.complete("analysis", project_dir)
 
-    ok, release_notes = workflow.validate_changelog(project_dir, version)
-    if not ok:
-        ui.exit_with_error("CHANGELOG validation failed", ExitCode.CHANGELOG_FAILED)
+    if options.benchmarks and not skip("benchmarks"):
+        if not workflow.benchmark_gate(project_dir, version):
+            ui.exit_with_error(
+                "Benchmark regressions found. Fix them before publishing.",
+                ExitCode.BENCHMARK_REGRESSION,
+            )
+        checkpoint.complete("benchmarks", project_dir)
 
-    if not workflow.generate_docs(project_dir):
-        ui.exit_with_error(
-            "Documentation generation failed", ExitCode.VALIDATION_FAILED
-        )
+    if skip("changelog"):
+        release_notes = checkpoint.data.get("release_notes", "")
+    else:
+        ok, release_notes = workflow.validate_changelog(project_dir, version, assume_yes)
+        if not ok:
+            ui.exit_with_error("CHANGELOG validation failed", ExitCode.CHANGELOG_FAILED)
+        checkpoint.complete("changelog", project_dir, release_notes=release_notes)
 
-    if not workflow.pre_publish_validation(project_dir):
-        ui.exit_with_error(
-            "Pre-publish validation failed", ExitCode.VALIDATION_FAILED
-        )
+    if not skip("docs"):
+        if not workflow.generate_docs(project_dir):
+            ui.exit_with_error(
+                "Documentation generation failed", ExitCode.VALIDATION_FAILED
+            )
+        checkpoint.complete("docs", project_dir)
+
+    if not skip("dry_run"):
+        if not workflow.pre_publish_validation(project_dir):
+            ui.exit_with_error(
+                "Pre-publish validation failed", ExitCode.VALIDATION_FAILED
+            )
+        checkpoint.complete("dry_run", project_dir)
 
-    if not workflow.git_commit_and_push(project_dir, version, branch):
-        ui.exit_with_error("Git operations failed", ExitCode.GIT_FAILED)
+    if not skip("commit"):
+        if not workflow.git_commit_and_push(project_dir, version, branch):
+            ui.exit_with_error("Git operations failed", ExitCode.GIT_FAILED)
+        checkpoint.complete("commit", project_dir)
 
-    if not workflow.create_git_tag(project_dir, version):
-        ui.exit_with_error("Git tag creation failed", ExitCode.GIT_FAILED)
+    if not skip("tag"):
+        if not workflow.create_git_tag(project_dir, version):
+            ui.exit_with_error("Git tag creation failed", ExitCode.GIT_FAILED)
+        checkpoint.complete("tag", project_dir)
 
-    if not workflow.publish_to_pubdev(project_dir):
-        ui.exit_with_error(
-            "Failed to trigger GitHub Actions publish", ExitCode.PUBLISH_FAILED
-        )
+    if not skip("publish"):
+        if not workflow.publish_to_pubdev(project_dir):
+            ui.exit_with_error(
+                "Failed to trigger GitHub Actions publish", ExitCode.PUBLISH_FAILED
+            )
+        checkpoint.complete("publish", project_dir)
 
-    gh_success, gh_error = workflow.create_github_release(
-        project_dir, version, release_notes
-    )
+    if skip("github_release"):
+        gh_success, gh_error = True, None
+    else:
+        gh_success, gh_error = workflow.create_github_release(
+            project_dir, version, release_notes
+        )
+        # A failed release is only a warning below; leave it for a resume.
+        if gh_success:
+            checkpoint.complete("github_release", project_dir)
 
     # Block until pub.dev actually serves the new version. Pushing the tag only
     # triggers publishing; a green workflow does NOT prove the package landed
     # (the masked exit-65 bug reported success while pub.dev stayed at 1.0.6).
     # This is the gate that makes the script's exit code reflect reality.
     published = workflow.verify_published(project_dir, package_name, version)
+    summary.published = published
 
     repo_path = workflow.extract_repo_path(remote_url)
 
@@ -534,6 +990,11 @@ def main() -> int:
             f"    2. Re-run it: gh run rerun --failed (or push tag v{version} again).",
             ui.Color.CYAN,
         )
+        ui.print_colored(
+            "    3. Then `python scripts/publish.py --resume` re-checks pub.dev "
+            "without repeating the finished steps.",
+            ui.Color.CYAN,
+        )
         ui.print_colored(
             f"      Actions: https://github.com/{repo_path}/actions", ui.Color.YELLOW
         )
@@ -541,12 +1002,15 @@ def main() -> int:
             f"      Package: https://pub.dev/packages/{package_name}", ui.Color.YELLOW
         )
         print()
-        try:
-            webbrowser.open(f"https://github.com/{repo_path}/actions")
-        except Exception:
-            pass
+        # Nobody is at the screen in a headless run; don't spawn a browser.
+        if not options.headless:
+            try:
+                webbrowser.open(f"https://github.com/{repo_path}/actions")
+            except Exception:
+                pass
         return ExitCode.PUBLISH_FAILED.value
 
+    checkpoint_mod.clear(project_dir)
     ui.print_colored("=" * 70, ui.Color.GREEN)
     ui.print_colored(f"  RELEASE v{version} PUBLISHED!", ui.Color.GREEN)
     ui.print_colored("=" * 70, ui.Color.GREEN)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Publish several interdependent packages, upstreams first, in parallel.
+
+Usage:
+    python scripts/release_train.py ROOT [ROOT ...] [--plan]
+    python scripts/release_train.py --packages packages.txt
+        [--mode full|build] [--bump patch|minor|major|auto]
+        [--on-findings fail|ignore] [--yes] [--jobs N]
+
+ROOTs are package directories (each with a pubspec.yaml); `--packages` reads
+them one per line (blank lines and `#` comments ignored, relative paths
+resolved against the file). `--plan` prints the dependency waves and exits.
+
+Every package runs a headless publish (see modules/release_train.py); a
+package starts once all of its in-train dependencies are confirmed on
+pub.dev. Logs and JSON summaries go to reports/release_train/<timestamp>/.
+Exits 0 when every package published, 1 otherwise, 2 on a bad package list.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from modules import release_train
+
+
+def _read_roots(list_path: Path) -> list[Path]:
+    roots = []
+    for raw in list_path.read_text(encoding="utf-8").splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if line:
+            roots.append((list_path.parent / line).resolve())
+    return roots
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("roots", nargs="*", type=Path, help="package root directories")
+    parser.add_argument("--packages", type=Path, help="file listing package roots")
+    parser.add_argument("--plan", action="store_true", help="print the waves and exit")
+    parser.add_argument("--mode", choices=["full", "build"], default="full")
+    parser.add_argument(
+        "--bump", choices=["patch", "minor", "major", "auto"], default="auto",
+        help="bump for packages with [Unreleased] changes (default: auto)",
+    )
+    parser.add_argument("--on-findings", choices=["fail", "ignore"], default="fail")
+    parser.add_argument("--yes", action="store_true", help="accept confirmations")
+    parser.add_argument("--jobs", type=int, help="concurrent publishes (default: all ready)")
+    args = parser.parse_args(argv)
+
+    roots = [root.resolve() for root in args.roots]
+    if args.packages:
+        roots += _read_roots(args.packages)
+    if not roots:
+        parser.error("give package roots or --packages FILE")
+    try:
+        packages = [release_train.read_package(root) for root in roots]
+        graph = release_train.build_graph(packages)
+        waves = release_train.waves(graph)
+    except ValueError as e:
+        print(f"Bad package list: {e}")
+        return 2
+
+    for number, wave in enumerate(waves, 1):
+        print(f"Wave {number}: {', '.join(wave)}")
+    if args.plan:
+        return 0
+
+    publish_args = ["--mode", args.mode, "--bump", args.bump, "--on-findings", args.on_findings]
+    if args.yes:
+        publish_args.append("--yes")
+    project_dir = Path(__file__).resolve().parent.parent
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_dir = project_dir / "reports" / "release_train" / stamp
+    print()
+    results = release_train.run_train(
+        packages, publish_args, log_dir, args.jobs, on_event=lambda message: print(message, flush=True)
+    )
+
+    print()
+    failed = [name for name, result in results.items() if not result.ok]
+    for name, result in results.items():
+        version = result.summary.get("version") or "-"
+        state = "published" if result.ok else (
+            "skipped" if result.exit_code is None else f"exit {result.exit_code}"
+        )
+        print(f"  {name:30} {version:12} {state}")
+    print(f"\nLogs: {log_dir}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())